@@ -0,0 +1,199 @@
+"""
+Compare per-section parsing with the single-pass parser.
+
+Generates a directory of migration files and parses every file twice: once
+with the per-section parser DBWarden shipped before parse_migration_file
+(header, upgrade and rollback each read and scanned the file), copied below,
+and once with parse_migration_file. File opens are counted by wrapping
+``open``.
+
+Usage:
+    python benchmarks/bench_file_parser.py [--files 5000]
+"""
+
+import argparse
+import builtins
+import json
+import os
+import re
+import tempfile
+import time
+
+from dbwarden.engine import file_parser
+
+MIGRATION_TEMPLATE = """-- depends_on: ["{previous:04d}"]
+-- description: Create table {number}
+
+-- upgrade
+
+CREATE TABLE table_{number} (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX ix_table_{number}_name ON table_{number} (name);
+
+-- rollback
+
+DROP INDEX ix_table_{number}_name;
+
+DROP TABLE table_{number};
+"""
+
+
+def write_migrations(directory: str, count: int) -> list[str]:
+    """Write ``count`` migration files and return their paths."""
+    filepaths = []
+    for number in range(1, count + 1):
+        filepath = os.path.join(directory, f"{number:04d}_table_{number}.sql")
+        with open(filepath, "w") as f:
+            f.write(MIGRATION_TEMPLATE.format(number=number, previous=number - 1))
+        filepaths.append(filepath)
+    return filepaths
+
+
+def parse_per_section(filepath: str) -> None:
+    """Parse a file with the baseline parser, one read per section."""
+    baseline_parse_migration_header(filepath)
+    baseline_parse_upgrade_statements(filepath)
+    baseline_parse_rollback_statements(filepath)
+
+
+def baseline_parse_migration_header(file_path: str) -> dict:
+    """Baseline ``parse_migration_header``, returning the metadata as a dict."""
+    with open(file_path, "r") as f:
+        lines = f.readlines()
+
+    metadata = {"depends_on": [], "is_seed": False, "description": None}
+
+    for line in lines:
+        stripped = line.strip()
+
+        if stripped == "-- upgrade" or stripped == "-- rollback":
+            break
+
+        seed_match = re.match(r"^--\s*seed\s*$", stripped, re.IGNORECASE)
+        if seed_match:
+            metadata["is_seed"] = True
+            continue
+
+        depends_match = re.match(r"^--\s*depends_on:\s*(.+)$", stripped, re.IGNORECASE)
+        if depends_match:
+            try:
+                deps = json.loads(depends_match.group(1))
+                if isinstance(deps, list):
+                    metadata["depends_on"] = [str(d) for d in deps]
+            except (json.JSONDecodeError, TypeError):
+                pass
+            continue
+
+        desc_match = re.match(r"^--\s*description:\s*(.+)$", stripped, re.IGNORECASE)
+        if desc_match:
+            metadata["description"] = desc_match.group(1).strip()
+            continue
+
+    return metadata
+
+
+def baseline_parse_upgrade_statements(file_path: str) -> list[str]:
+    """Baseline ``parse_upgrade_statements``."""
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    return baseline_extract_section_statements(content, "-- upgrade")
+
+
+def baseline_parse_rollback_statements(file_path: str) -> list[str]:
+    """Baseline ``parse_rollback_statements``."""
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    return baseline_extract_section_statements(content, "-- rollback")
+
+
+def baseline_extract_section_statements(content: str, section_marker: str) -> list[str]:
+    """Baseline ``_extract_section_statements``."""
+    lines = content.split("\n")
+    statements: list[str] = []
+    current_statement: list[str] = []
+    in_section = False
+
+    for line in lines:
+        stripped = line.strip()
+
+        if stripped == section_marker:
+            in_section = True
+            continue
+
+        if stripped == "-- rollback" and in_section:
+            if current_statement:
+                statement = "\n".join(current_statement).strip()
+                if statement:
+                    statements.append(statement)
+                current_statement = []
+            in_section = False
+            continue
+
+        if in_section:
+            if stripped and not stripped.startswith("--"):
+                current_statement.append(line)
+            elif current_statement and not stripped:
+                statement = "\n".join(current_statement).strip()
+                if statement:
+                    statements.append(statement)
+                current_statement = []
+
+    if current_statement:
+        statement = "\n".join(current_statement).strip()
+        if statement:
+            statements.append(statement)
+
+    return statements
+
+
+def parse_single_pass(filepath: str) -> None:
+    """Parse a file with a single read."""
+    file_parser.parse_migration_file(filepath)
+
+
+def measure(parse, filepaths: list[str]) -> tuple[float, int]:
+    """Return the wall time and number of file opens for parsing all files."""
+    opens = 0
+    real_open = builtins.open
+
+    def counting_open(*args, **kwargs):
+        nonlocal opens
+        opens += 1
+        return real_open(*args, **kwargs)
+
+    builtins.open = counting_open
+    try:
+        start = time.perf_counter()
+        for filepath in filepaths:
+            parse(filepath)
+        elapsed = time.perf_counter() - start
+    finally:
+        builtins.open = real_open
+
+    return elapsed, opens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = write_migrations(directory, args.files)
+
+        for name, parse in (
+            ("per-section", parse_per_section),
+            ("single-pass", parse_single_pass),
+        ):
+            elapsed, opens = measure(parse, filepaths)
+            print(f"{name:>12}: {elapsed:.3f}s, {opens} file opens")
+
+
+if __name__ == "__main__":
+    main()
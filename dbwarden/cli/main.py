@@ -10,6 +10,7 @@ from dbwarden.commands import (
     handle_lock_status,
     handle_make_migrations,
     handle_migrate,
+    handle_migrate_targets,
     handle_new,
     handle_rollback,
     handle_squash,
@@ -39,10 +40,23 @@ def make_migrations(
     verbose: bool = typer.Option(
         False, "--verbose", "-v", help="Enable verbose logging"
     ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Reflect the database instead of using the cache"
+    ),
+    schema_source: str = typer.Option(
+        "database",
+        "--schema-source",
+        help="Compare models with the database or the migrations (database, migrations, sqlite)",
+    ),
 ):
     """Auto-generate SQL migration from SQLAlchemy models."""
     validate_directory()
-    handle_make_migrations(description=description, verbose=verbose)
+    handle_make_migrations(
+        description=description,
+        verbose=verbose,
+        refresh=refresh,
+        schema_source=schema_source,
+    )
 
 
 @app.command()
@@ -75,9 +89,43 @@ def migrate(
     backup_dir: str = typer.Option(
         None, "--backup-dir", help="Directory for backup files"
     ),
+    jobs: int = typer.Option(
+        1, "--jobs", "-j", help="Number of independent migrations to run at once"
+    ),
+    target: list[str] = typer.Option(
+        None, "--target", help="Migrate a configured target (repeatable)"
+    ),
+    all_targets: bool = typer.Option(
+        False, "--all-targets", help="Migrate every target in warden.toml"
+    ),
+    target_jobs: int = typer.Option(
+        None, "--target-jobs", help="Number of targets to migrate at once"
+    ),
+    if_needed: bool = typer.Option(
+        False,
+        "--if-needed",
+        help="Skip locking and parsing when the database is already up to date",
+    ),
 ):
     """Apply pending migrations to the database."""
     validate_directory()
+    if target or all_targets:
+        succeeded = handle_migrate_targets(
+            target_names=target or None,
+            count=count,
+            to_version=to_version,
+            verbose=verbose,
+            baseline=baseline,
+            with_backup=with_backup,
+            backup_dir=backup_dir,
+            jobs=jobs,
+            target_jobs=target_jobs,
+            if_needed=if_needed,
+        )
+        if not succeeded:
+            raise typer.Exit(code=1)
+        return
+
     handle_migrate(
         count=count,
         to_version=to_version,
@@ -85,6 +133,8 @@ def migrate(
         baseline=baseline,
         with_backup=with_backup,
         backup_dir=backup_dir,
+        jobs=jobs,
+        if_needed=if_needed,
     )
 
 
@@ -124,10 +174,13 @@ def check_db(
     output: str = typer.Option(
         "txt", "--out", "-o", help="Output format (json, yaml, sql, txt)"
     ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Reflect the database instead of using the cache"
+    ),
 ):
     """Inspect the live database schema."""
     validate_directory()
-    handle_check_db(output_format=output)
+    handle_check_db(output_format=output, refresh=refresh)
 
 
 @app.command()
@@ -138,10 +191,23 @@ def diff(
     verbose: bool = typer.Option(
         False, "--verbose", "-v", help="Enable verbose logging"
     ),
+    schema_source: str = typer.Option(
+        "database",
+        "--schema-source",
+        help="Compare models with the database or the migrations (database, migrations, sqlite)",
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Reflect the database instead of using the cache"
+    ),
 ):
     """Show structural differences between models and database."""
     validate_directory()
-    handle_diff(diff_type=diff_type, verbose=verbose)
+    handle_diff(
+        diff_type=diff_type,
+        verbose=verbose,
+        schema_source=schema_source,
+        refresh=refresh,
+    )
 
 
 @app.command()
@@ -183,10 +249,13 @@ def unlock():
 
 def main() -> None:
     """Main entry point for DBWarden CLI."""
-    from dbwarden.database import reset_connection_logging
+    from dbwarden.database import dispose_engines, reset_connection_logging
 
     reset_connection_logging()
-    app()
+    try:
+        app()
+    finally:
+        dispose_engines()
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ from dbwarden.commands.extra import diff_cmd, lock_status_cmd, squash_cmd, unloc
 from dbwarden.commands.history import history_cmd
 from dbwarden.commands.init import init_cmd
 from dbwarden.commands.make_migrations import make_migrations_cmd, new_migration_cmd
-from dbwarden.commands.migrate import migrate_cmd
+from dbwarden.commands.migrate import migrate_cmd, migrate_targets_cmd
 from dbwarden.commands.rollback import rollback_cmd
 from dbwarden.commands.status import status_cmd
 from dbwarden.commands.utils import config_cmd, version_cmd
@@ -15,9 +15,19 @@ def handle_init() -> None:
     init_cmd()
 
 
-def handle_make_migrations(description: str | None, verbose: bool) -> None:
+def handle_make_migrations(
+    description: str | None,
+    verbose: bool,
+    refresh: bool = False,
+    schema_source: str = "database",
+) -> None:
     """Handle make-migrations command."""
-    make_migrations_cmd(description=description, verbose=verbose)
+    make_migrations_cmd(
+        description=description,
+        verbose=verbose,
+        refresh=refresh,
+        schema_source=schema_source,
+    )
 
 
 def handle_new(description: str, version: str | None) -> None:
@@ -32,6 +42,8 @@ def handle_migrate(
     baseline: bool = False,
     with_backup: bool = False,
     backup_dir: str | None = None,
+    jobs: int = 1,
+    if_needed: bool = False,
 ) -> None:
     """Handle migrate command."""
     migrate_cmd(
@@ -41,9 +53,57 @@ def handle_migrate(
         baseline=baseline,
         with_backup=with_backup,
         backup_dir=backup_dir,
+        jobs=jobs,
+        if_needed=if_needed,
     )
 
 
+def handle_migrate_targets(
+    target_names: list[str] | None,
+    count: int | None,
+    to_version: str | None,
+    verbose: bool,
+    baseline: bool = False,
+    with_backup: bool = False,
+    backup_dir: str | None = None,
+    jobs: int = 1,
+    target_jobs: int | None = None,
+    if_needed: bool = False,
+) -> bool:
+    """
+    Handle migrate command for multiple targets.
+
+    Returns:
+        bool: True if every target was migrated successfully.
+    """
+    results = migrate_targets_cmd(
+        target_names=target_names,
+        count=count,
+        to_version=to_version,
+        verbose=verbose,
+        baseline=baseline,
+        with_backup=with_backup,
+        backup_dir=backup_dir,
+        jobs=jobs,
+        target_jobs=target_jobs,
+        if_needed=if_needed,
+    )
+
+    width = max(len(result.name) for result in results)
+    for result in results:
+        status = "OK" if result.ok else "FAILED"
+        detail = (
+            result.message
+            if result.ok
+            else (result.error.splitlines() or [result.error])[0]
+        )
+        print(f"{result.name:<{width}}  {status:<6}  {result.duration:6.2f}s  {detail}")
+
+    failed = sum(1 for result in results if not result.ok)
+    print(f"{len(results) - failed} of {len(results)} targets migrated successfully.")
+    return failed == 0
+
+
 def handle_rollback(
     count: int | None,
     to_version: str | None,
@@ -63,14 +123,24 @@ def handle_status() -> None:
     status_cmd()
 
 
-def handle_check_db(output_format: str) -> None:
+def handle_check_db(output_format: str, refresh: bool = False) -> None:
     """Handle check-db command."""
-    check_db_cmd(output_format=output_format)
+    check_db_cmd(output_format=output_format, refresh=refresh)
 
 
-def handle_diff(diff_type: str, verbose: bool) -> None:
+def handle_diff(
+    diff_type: str,
+    verbose: bool,
+    schema_source: str = "database",
+    refresh: bool = False,
+) -> None:
     """Handle diff command."""
-    diff_cmd(diff_type=diff_type, verbose=verbose)
+    diff_cmd(
+        diff_type=diff_type,
+        verbose=verbose,
+        schema_source=schema_source,
+        refresh=refresh,
+    )
 
 
 def handle_squash(verbose: bool) -> None:
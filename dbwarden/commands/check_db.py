@@ -1,58 +1,37 @@
+import json
+from dataclasses import asdict
 from typing import Any
 
+import yaml
 from rich.console import Console
-from sqlalchemy import inspect
 
 from dbwarden.config import get_config
-from dbwarden.database.connection import get_db_connection
+from dbwarden.engine.schema_snapshot import get_schema_snapshot
 from dbwarden.engine.version import get_migrations_directory
 from dbwarden.logging import get_logger
 
 
-def check_db_cmd(output_format: str = "txt") -> None:
+def check_db_cmd(output_format: str = "txt", refresh: bool = False) -> None:
     """
     Inspect the live database schema.
 
+    The schema reflected by the last run is reused until a migration is
+    applied or rolled back, see ``get_schema_snapshot``.
+
     Args:
         output_format: Output format (json, yaml, sql, txt).
+        refresh: Reflect the database instead of using the cached schema.
     """
     logger = get_logger()
     config = get_config()
 
-    with get_db_connection() as connection:
-        inspector = inspect(connection)
-        tables = inspector.get_table_names()
-
-        schema_info = {}
-        for table in tables:
-            columns = inspector.get_columns(table)
-            indexes = inspector.get_indexes(table)
-            foreign_keys = inspector.get_foreign_keys(table)
+    tables = get_schema_snapshot(config, get_migrations_directory(), refresh=refresh)
 
-            schema_info[table] = {
-                "columns": [
-                    {
-                        "name": col["name"],
-                        "type": str(col["type"]),
-                        "nullable": col["nullable"],
-                        "default": str(col.get("default", None)),
-                    }
-                    for col in columns
-                ],
-                "indexes": [
-                    {"name": idx["name"], "columns": idx["column_names"]}
-                    for idx in indexes
-                ],
-                "foreign_keys": [
-                    {
-                        "name": fk["name"],
-                        "columns": fk["constrained_columns"],
-                        "referred_table": fk["referred_table"],
-                        "referred_columns": fk["referred_columns"],
-                    }
-                    for fk in foreign_keys
-                ],
-            }
+    schema_info = {}
+    for name, table in tables.items():
+        info = asdict(table)
+        del info["name"]
+        schema_info[name] = info
 
     if output_format == "json":
         print(json.dumps(schema_info, indent=2, default=str))
@@ -1,27 +1,102 @@
+from dbwarden.config import get_config
+from dbwarden.constants import SCHEMA_SOURCES
+from dbwarden.engine.model_discovery import (
+    auto_discover_model_paths,
+    extract_tables_from_migrations,
+    get_all_model_tables,
+)
+from dbwarden.engine.schema_snapshot import compare_schemas, get_schema_snapshot
 from dbwarden.engine.version import get_migrations_directory
 from dbwarden.logging import get_logger
+from dbwarden.models import SchemaDifference, TableSnapshot
 from dbwarden.repositories import get_migration_records, migrations_table_exists
 
 
-def diff_cmd(diff_type: str = "all", verbose: bool = False) -> None:
+def diff_cmd(
+    diff_type: str = "all",
+    verbose: bool = False,
+    schema_source: str = "database",
+    refresh: bool = False,
+) -> None:
     """
     Show structural differences between models and database or migrations and database.
 
+    ``models`` compares the models with the schema from ``schema_source``;
+    ``migrations`` compares the schema the migrations produce, replayed
+    without a database, with the database; ``all`` does both. The
+    migrations are replayed on a scratch SQLite database if
+    ``schema_source`` is ``sqlite``, and in memory otherwise.
+
     Args:
         diff_type: Type of diff (models, migrations, all).
         verbose: Enable verbose logging.
+        schema_source: Schema the models are compared with (database,
+            migrations, sqlite).
+        refresh: Reflect the database instead of using the cached schema.
     """
     logger = get_logger(verbose=verbose)
 
-    if not migrations_table_exists():
-        print("No migrations table found. Run 'dbwarden migrate' first.")
+    if diff_type not in ("models", "migrations", "all"):
+        raise ValueError(f"Unknown diff type: {diff_type}")
+    if schema_source not in SCHEMA_SOURCES:
+        raise ValueError(f"Unknown schema source: {schema_source}")
+
+    migrations_dir = get_migrations_directory()
+    schemas: dict[str, dict[str, TableSnapshot]] = {}
+
+    def schema(source: str) -> dict[str, TableSnapshot]:
+        if source not in schemas:
+            if source in ("migrations", "sqlite"):
+                schemas[source] = extract_tables_from_migrations(
+                    migrations_dir, scratch_sqlite=source == "sqlite"
+                )
+            else:
+                schemas[source] = get_schema_snapshot(
+                    directory=migrations_dir, refresh=refresh
+                )
+        return schemas[source]
+
+    if diff_type in ("models", "all"):
+        config = get_config()
+        model_paths = config.model_paths
+        if model_paths is None:
+            model_paths = auto_discover_model_paths()
+
+        model_tables = get_all_model_tables(model_paths) if model_paths else []
+        if not model_tables:
+            print("No SQLAlchemy models found. Set model_paths in warden.toml.")
+        else:
+            logger.info(
+                f"Comparing {len(model_tables)} model tables with the {schema_source}"
+            )
+            _print_differences(
+                f"Models vs {schema_source}",
+                compare_schemas(
+                    {table.name: table.to_snapshot() for table in model_tables},
+                    schema(schema_source),
+                ),
+            )
+
+    if diff_type in ("migrations", "all"):
+        replayed = "sqlite" if schema_source == "sqlite" else "migrations"
+        _print_differences(
+            "Migrations vs database",
+            compare_schemas(schema(replayed), schema("database")),
+        )
+
+
+def _print_differences(title: str, differences: list[SchemaDifference]) -> None:
+    """Print the differences between two schemas."""
+    print(f"{title}:")
+    if not differences:
+        print("  No differences")
         return
 
-    print("Diff functionality - compares database schema with models/migrations")
-    print("\nThis feature requires:")
-    print("  1. SQLAlchemy model definitions")
-    print("  2. model_paths in warden.toml")
-    print("\nFor now, use 'dbwarden check-db' to inspect the current database schema.")
+    for difference in differences:
+        target = difference.table_name
+        if difference.column_name:
+            target = f"{target}.{difference.column_name}"
+        print(f"  {difference.type}: {target}")
 
 
 def squash_cmd(verbose: bool = False) -> None:
@@ -68,12 +143,24 @@ def _get_pending_count() -> int:
 
 def lock_status_cmd() -> None:
     """Check if migration is currently locked."""
-    from dbwarden.repositories import check_lock
+    from dbwarden.repositories import check_lock, get_lock_info
 
     is_locked = check_lock()
+    info = get_lock_info()
     if is_locked:
         print("Migration lock: ACTIVE")
         print("Another migration process may be running.")
+        if info is not None and info.holder:
+            print(f"Held by: {info.holder}")
+        if info is not None and info.expires_at is not None:
+            print(f"Lease expires at: {info.expires_at:%Y-%m-%d %H:%M:%S} UTC")
+    elif info is not None and info.locked and info.expires_at is not None:
+        print("Migration lock: EXPIRED")
+        print(
+            f"The lease held by {info.holder} expired at "
+            f"{info.expires_at:%Y-%m-%d %H:%M:%S} UTC and will be taken over "
+            "by the next migration."
+        )
     else:
         print("Migration lock: INACTIVE")
 
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Optional
 
 from dbwarden.config import get_config
-from dbwarden.engine.file_parser import parse_upgrade_statements
+from dbwarden.constants import SCHEMA_SOURCES
 from dbwarden.engine.model_discovery import (
     get_all_model_tables,
     auto_discover_model_paths,
@@ -16,6 +16,7 @@ from dbwarden.engine.model_discovery import (
     extract_tables_from_database,
     ModelTable,
 )
+from dbwarden.engine.parse_cache import get_migration_cache
 from dbwarden.engine.version import (
     get_migrations_directory,
     get_next_migration_number,
@@ -38,15 +39,17 @@ def get_pending_migration_statements(migrations_dir: str) -> set[str]:
     if not os.path.exists(migrations_dir):
         return all_statements
 
+    cache = get_migration_cache(migrations_dir)
     for filename in os.listdir(migrations_dir):
         if not filename.endswith(".sql"):
             continue
         filepath = os.path.join(migrations_dir, filename)
-        statements = parse_upgrade_statements(filepath)
+        statements = cache.get(filepath).upgrade_statements
         for stmt in statements:
             normalized = stmt.strip()
             if normalized:
                 all_statements.add(normalized)
+    cache.save()
 
     return all_statements
 
@@ -54,6 +57,8 @@ def get_pending_migration_statements(migrations_dir: str) -> set[str]:
 def make_migrations_cmd(
     description: str | None = None,
     verbose: bool = False,
+    refresh: bool = False,
+    schema_source: str = "database",
 ) -> None:
     """
     Auto-generate SQL migration from SQLAlchemy models.
@@ -61,9 +66,17 @@ def make_migrations_cmd(
     Args:
         description: Description for the migration.
         verbose: Enable verbose logging.
+        refresh: Reflect the database instead of using the cached schema.
+        schema_source: Schema the models are compared with: the database,
+            or the schema the existing migrations produce, which needs no
+            database connection, replayed in memory (``migrations``) or
+            on a scratch SQLite database (``sqlite``).
     """
     logger = get_logger(verbose=verbose)
 
+    if schema_source not in SCHEMA_SOURCES:
+        raise ValueError(f"Unknown schema source: {schema_source}")
+
     config = get_config()
     model_paths = config.model_paths
 
@@ -77,7 +90,7 @@ def make_migrations_cmd(
         print("  2. Or set model_paths in warden.toml")
         return
 
-    logger.info(f"Discovering models in: {model_paths}")
+    logger.info(f"Discovering models in: {', '.join(model_paths)}")
     tables = get_all_model_tables(model_paths)
 
     if not tables:
@@ -92,7 +105,9 @@ def make_migrations_cmd(
     safe_desc = re.sub(r"[^a-zA-Z0-9]", "_", description or "auto_generated").lower()
     filename = f"{next_number}_{safe_desc}.sql"
 
-    upgrade_sql, rollback_sql = generate_migration_sql(tables, migrations_dir)
+    upgrade_sql, rollback_sql = generate_migration_sql(
+        tables, migrations_dir, refresh=refresh, schema_source=schema_source
+    )
 
     if not upgrade_sql.strip():
         print(
@@ -120,33 +135,54 @@ def make_migrations_cmd(
 
 
 def generate_migration_sql(
-    tables: list, migrations_dir: str | None = None
+    tables: list,
+    migrations_dir: str | None = None,
+    refresh: bool = False,
+    schema_source: str = "database",
 ) -> tuple[str, str]:
     """
     Generate upgrade and rollback SQL from table definitions.
 
-    Compares model tables with the actual database schema to generate:
+    Compares model tables with the existing schema to generate:
     - CREATE TABLE for new tables
     - ALTER TABLE ADD COLUMN for new columns in existing tables
 
     Args:
         tables: List of ModelTable objects.
-        migrations_dir: Path to migrations directory (unused, kept for compatibility).
+        migrations_dir: Path to migrations directory, where the reflected
+            database schema is cached.
+        refresh: Reflect the database instead of using the cached schema.
+        schema_source: ``database`` to compare with the reflected database,
+            ``migrations`` or ``sqlite`` to compare with the schema the
+            migrations in ``migrations_dir`` produce, replayed in memory or
+            on a scratch SQLite database.
 
     Returns:
         Tuple of (upgrade_sql, rollback_sql).
     """
-    try:
-        config = get_config()
-        existing_tables = extract_tables_from_database(config.sqlalchemy_url)
-    except Exception:
-        existing_tables = {}
+    if schema_source in ("migrations", "sqlite"):
+        existing_tables = (
+            extract_tables_from_migrations(
+                migrations_dir, scratch_sqlite=schema_source == "sqlite"
+            )
+            if migrations_dir
+            else {}
+        )
+    else:
+        try:
+            config = get_config()
+            existing_tables = extract_tables_from_database(
+                config, migrations_dir, refresh=refresh
+            )
+        except Exception:
+            existing_tables = {}
 
     upgrade_parts = []
     rollback_parts = []
 
     for table in tables:
-        existing_columns = existing_tables.get(table.name, set())
+        existing = existing_tables.get(table.name)
+        existing_columns = existing.column_names() if existing else set()
 
         if not existing_columns:
             create_sql = generate_create_table_sql(table)
@@ -1,28 +1,56 @@
+import asyncio
+import itertools
 import os
 import shutil
 import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from dbwarden.config import DbwardenConfig, MigrationTarget, get_config
 from dbwarden.constants import RUNS_ALWAYS_FILE_PREFIX, RUNS_ON_CHANGE_FILE_PREFIX
-from dbwarden.engine.file_parser import parse_upgrade_statements
+from dbwarden.database.connection import (
+    get_async_db_session,
+    get_db_session,
+    get_sync_url,
+    is_async_enabled,
+    run_in_session,
+)
+from dbwarden.database.session import get_active_session
+from dbwarden.engine.dependency_graph import MigrationGraph
+from dbwarden.engine.file_parser import ParsedMigration, iter_upgrade_statements
+from dbwarden.engine.fingerprint import get_migrations_fingerprint
+from dbwarden.engine.lock import (
+    async_migration_lock,
+    check_migration_lease,
+    get_active_lease,
+    migration_lock,
+)
+from dbwarden.engine.parse_cache import get_migration_cache
 from dbwarden.engine.version import (
     get_migrations_directory,
+    get_changed_runs_on_change_migrations,
+    get_migration_filepaths_by_version,
     get_runs_always_filepaths,
     get_runs_on_change_filepaths,
     resolve_migration_order,
 )
-from dbwarden.logging import get_logger
+from dbwarden.exceptions import ConfigurationError
+from dbwarden.logging import DBWardenLogger, get_logger
+from dbwarden.models import TargetResult
 from dbwarden.repositories import (
     create_migrations_table_if_not_exists,
-    create_lock_table_if_not_exists,
     fetch_latest_versioned_migration,
-    get_existing_runs_always_filenames,
-    get_existing_runs_on_change_filenames_to_checksums,
     get_migrated_versions,
+    get_next_execution_seq,
+    get_stored_fingerprint,
+    record_migrations,
     run_migration,
     run_repeatable_migration,
+    run_streaming_migration,
+    store_fingerprint,
 )
 
 
@@ -38,6 +66,7 @@ def create_backup(sqlalchemy_url: str, backup_dir: str) -> str:
         str: Path to the backup file.
     """
     os.makedirs(backup_dir, exist_ok=True)
+    sqlalchemy_url = get_sync_url(sqlalchemy_url)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = os.path.join(backup_dir, f"backup_{timestamp}.db")
@@ -53,37 +82,41 @@ def create_backup(sqlalchemy_url: str, backup_dir: str) -> str:
     return backup_path
 
 
-def set_baseline_migration(migrations_dir: str, version: str) -> None:
+def set_baseline_migration(migrations_dir: str, version: str) -> list[str]:
     """
     Mark all migrations up to and including the specified version as applied.
 
+    Nothing is executed: the migrations are only recorded. Their checksums
+    are computed in parallel, and the rows are inserted in a single
+    transaction. Versions that are already recorded are left as they are.
+
     Args:
         migrations_dir: Path to migrations directory.
         version: Version to set as baseline.
-    """
-    from dbwarden.engine.file_parser import parse_migration_header
-    from dbwarden.engine.checksum import calculate_checksum
-    from dbwarden.engine.version import get_migration_filepaths_by_version
 
-    filepaths = get_migration_filepaths_by_version(migrations_dir)
-
-    applied = []
-    for v, fp in sorted(filepaths.items()):
-        if v <= version:
-            statements = parse_upgrade_statements(fp)
-            checksum = calculate_checksum(statements)
-            filename = fp.split("/")[-1]
-            description = parse_migration_header(fp).description or filename
-
-            run_migration(
-                sql_statements=statements,
-                version=v,
-                migration_operation="upgrade",
-                filename=filename,
-            )
-            applied.append(v)
+    Returns:
+        list[str]: Versions that were recorded.
+    """
+    applied_versions = set(get_migrated_versions())
+    filepaths = [
+        (v, fp)
+        for v, fp in sorted(get_migration_filepaths_by_version(migrations_dir).items())
+        if v <= version and v not in applied_versions
+    ]
+    if not filepaths:
+        return []
+
+    cache = get_migration_cache(migrations_dir)
+    with ThreadPoolExecutor() as pool:
+        checksums = list(pool.map(lambda item: cache.get(item[1]).checksum, filepaths))
+    cache.save()
+
+    record_migrations(
+        (v, os.path.basename(fp), checksum)
+        for (v, fp), checksum in zip(filepaths, checksums)
+    )
 
-    return applied
+    return [v for v, _ in filepaths]
 
 
 def migrate_cmd(
@@ -93,6 +126,9 @@ def migrate_cmd(
     baseline: bool = False,
     with_backup: bool = False,
     backup_dir: str | None = None,
+    jobs: int = 1,
+    if_needed: bool = False,
+    config: DbwardenConfig | None = None,
 ) -> None:
     """
     Apply pending migrations to the database.
@@ -104,29 +140,392 @@ def migrate_cmd(
         baseline: Mark migrations as applied without executing.
         with_backup: Create a backup before migrating.
         backup_dir: Directory for backup files.
+        jobs: Number of migrations to run concurrently, following the
+            ``depends_on`` graph. SQLite always runs serially.
+        if_needed: Return without locking or parsing anything when
+            ``migrations_up_to_date()`` reports the database is current.
+        config: Configuration to use instead of discovering warden.toml.
     """
     logger = get_logger(verbose=verbose)
+    _validate_migrate_options(count, to_version, jobs)
+
+    if config is None:
+        config = get_config()
+
+    if is_async_enabled(config):
+        if jobs > 1:
+            logger.warning("--jobs is not supported in async mode; ignoring it.")
+        message = asyncio.run(
+            migrate_async(
+                count=count,
+                to_version=to_version,
+                verbose=verbose,
+                baseline=baseline,
+                with_backup=with_backup,
+                backup_dir=backup_dir,
+                if_needed=if_needed,
+                config=config,
+            )
+        )
+        print(message)
+        return
+
+    logger.log_execution_mode("sync")
+    migrations_dir = get_migrations_directory()
+
+    if if_needed and migrations_up_to_date(config, migrations_dir):
+        logger.debug("Migrations fingerprint matches the database")
+        print("Migrations are up to date.")
+        return
+
+    if with_backup:
+        backup_directory = backup_dir or os.path.join(os.getcwd(), "backups")
+        backup_path = create_backup(config.sqlalchemy_url, backup_directory)
+        logger.log_backup_created(backup_path)
+
+    message = _migrate_database(
+        config=config,
+        migrations_dir=migrations_dir,
+        count=count,
+        to_version=to_version,
+        baseline=baseline,
+        jobs=jobs,
+        logger=logger,
+    )
+    print(message)
+
+
+async def migrate_async(
+    count: int | None = None,
+    to_version: str | None = None,
+    verbose: bool = False,
+    baseline: bool = False,
+    with_backup: bool = False,
+    backup_dir: str | None = None,
+    if_needed: bool = False,
+    config: DbwardenConfig | None = None,
+) -> str:
+    """
+    Apply pending migrations through an asyncio engine.
+
+    Meant for the startup of async applications. Every query is awaited
+    on a connection from ``create_async_engine``, and the lock backoff and
+    lease heartbeat use asyncio, so the event loop keeps running while
+    migrations are applied or another process holds the lock. Migration
+    files are read and parsed in a worker thread, and the migrations are
+    applied by the same code as ``migrate_cmd()``.
+
+    A URL naming a synchronous driver is given the backend's asyncio
+    driver, e.g. ``asyncpg`` for PostgreSQL and ``aiosqlite`` for SQLite.
+
+    Args:
+        count: Number of migrations to apply.
+        to_version: Apply migrations up to this version.
+        verbose: Enable verbose logging.
+        baseline: Mark migrations as applied without executing.
+        with_backup: Create a backup before migrating.
+        backup_dir: Directory for backup files.
+        if_needed: Return without locking or parsing anything when the
+            migrations fingerprint matches the one recorded in the database.
+        config: Configuration to use instead of discovering warden.toml.
+
+    Returns:
+        str: Outcome message.
+    """
+    logger = get_logger(verbose=verbose)
+    _validate_migrate_options(count, to_version, 1)
+    logger.log_execution_mode("async")
+
+    if config is None:
+        config = get_config()
+    migrations_dir = get_migrations_directory()
+    fingerprint = await asyncio.to_thread(get_migrations_fingerprint, migrations_dir)
+
+    async with get_async_db_session(config) as connection:
+
+        async def run(function, /, *args, **kwargs):
+            return await run_in_session(connection, config, function, *args, **kwargs)
+
+        if if_needed and fingerprint is not None:
+            if await run(get_stored_fingerprint) == fingerprint:
+                logger.debug("Migrations fingerprint matches the database")
+                return "Migrations are up to date."
+
+        if with_backup:
+            backup_directory = backup_dir or os.path.join(os.getcwd(), "backups")
+            backup_path = await asyncio.to_thread(
+                create_backup, config.sqlalchemy_url, backup_directory
+            )
+            logger.log_backup_created(backup_path)
+
+        await asyncio.to_thread(_warm_migration_cache, migrations_dir)
+
+        async with async_migration_lock(connection, config) as lock_stats:
+            logger.debug(
+                f"Lock wait: {lock_stats.waited:.3f}s, "
+                f"{lock_stats.attempts} attempt(s) via {lock_stats.backend}"
+            )
+            message = await run(
+                _apply_migrations,
+                migrations_dir=migrations_dir,
+                count=count,
+                to_version=to_version,
+                baseline=baseline,
+                logger=logger,
+            )
+            if count is None and to_version is None and not baseline:
+                await run(store_fingerprint, fingerprint)
+
+    return message
+
+
+def migrate_targets_cmd(
+    target_names: list[str] | None = None,
+    count: int | None = None,
+    to_version: str | None = None,
+    verbose: bool = False,
+    baseline: bool = False,
+    with_backup: bool = False,
+    backup_dir: str | None = None,
+    jobs: int = 1,
+    target_jobs: int | None = None,
+    if_needed: bool = False,
+    config: DbwardenConfig | None = None,
+) -> list[TargetResult]:
+    """
+    Apply pending migrations to several configured targets at once.
+
+    Targets come from ``[[warden.targets]]`` in warden.toml and are migrated
+    by a thread pool in a single process, sharing the parsed migration
+    files and one engine per database URL. A failing target does not stop
+    the others. Targets always use synchronous engines; async mode is
+    ignored with a warning.
+
+    Args:
+        target_names: Names of the targets to migrate; all targets if None.
+        count: Number of migrations to apply per target.
+        to_version: Apply migrations up to this version.
+        verbose: Enable verbose logging.
+        baseline: Mark migrations as applied without executing.
+        with_backup: Create a backup of every target before migrating.
+        backup_dir: Directory for backup files; one subdirectory per target.
+        jobs: Number of migrations to run concurrently within a target.
+        target_jobs: Number of targets migrated at once; defaults to
+            ``target_concurrency`` from warden.toml.
+        if_needed: Skip every target that ``migrations_up_to_date()``
+            reports as current.
+        config: Configuration to use instead of discovering warden.toml.
+
+    Returns:
+        list[TargetResult]: One result per target, in configuration order.
+
+    Raises:
+        ConfigurationError: If no targets are configured or a name is unknown.
+    """
+    logger = get_logger(verbose=verbose)
+    _validate_migrate_options(count, to_version, jobs, target_jobs)
+
+    if config is None:
+        config = get_config()
+    if not config.targets:
+        raise ConfigurationError(
+            "No migration targets configured. Add [[warden.targets]] to warden.toml."
+        )
+
+    targets = config.targets
+    if target_names:
+        known = {target.name: target for target in targets}
+        unknown = [name for name in target_names if name not in known]
+        if unknown:
+            raise ConfigurationError(f"Unknown targets: {', '.join(unknown)}")
+        targets = [known[name] for name in dict.fromkeys(target_names)]
+
+    if is_async_enabled(config):
+        logger.warning(
+            "Async mode is not supported for migration targets; "
+            "migrating them with synchronous engines."
+        )
+
+    migrations_dir = get_migrations_directory()
+    if not if_needed:
+        _warm_migration_cache(migrations_dir)
+
+    def migrate_target(target: MigrationTarget) -> TargetResult:
+        start_time = time.time()
+        target_config = config.for_target(target)
+        try:
+            if if_needed and migrations_up_to_date(target_config, migrations_dir):
+                return TargetResult(
+                    name=target.name,
+                    message="Migrations are up to date.",
+                    duration=time.time() - start_time,
+                )
+
+            if with_backup:
+                backup_directory = os.path.join(
+                    backup_dir or os.path.join(os.getcwd(), "backups"), target.name
+                )
+                backup_path = create_backup(target.sqlalchemy_url, backup_directory)
+                logger.log_backup_created(backup_path)
+
+            message = _migrate_database(
+                config=target_config,
+                migrations_dir=migrations_dir,
+                count=count,
+                to_version=to_version,
+                baseline=baseline,
+                jobs=jobs,
+                logger=logger,
+            )
+            error = None
+        except Exception as exc:
+            logger.error(f"Target {target.name} failed: {exc}")
+            message, error = "Failed", str(exc) or type(exc).__name__
+
+        return TargetResult(
+            name=target.name,
+            message=message,
+            duration=time.time() - start_time,
+            error=error,
+        )
+
+    if target_jobs is None:
+        target_jobs = config.target_concurrency
+    max_workers = min(target_jobs, len(targets))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(migrate_target, targets))
+
+
+def migrations_up_to_date(
+    config: DbwardenConfig | None = None,
+    migrations_dir: str | None = None,
+) -> bool:
+    """
+    Check whether a database has every migration in the directory applied.
+
+    Compares the migrations directory fingerprint with the one recorded by
+    the last complete migrate, in a single query and without taking the
+    migration lock or parsing any migration file. Meant for application
+    startup, where the database is almost always current.
+
+    A False result only means the fast check could not confirm the
+    database is current, e.g. because files changed, a rollback ran or
+    the directory has runs-always migrations; a normal migrate decides
+    what is actually pending.
+
+    Args:
+        config: Configuration to connect with instead of warden.toml.
+        migrations_dir: Path to migrations directory; found from the
+            current directory if None.
 
+    Returns:
+        bool: True if the recorded fingerprint matches the directory.
+    """
+    if migrations_dir is None:
+        migrations_dir = get_migrations_directory()
+
+    fingerprint = get_migrations_fingerprint(migrations_dir)
+    if fingerprint is None:
+        return False
+
+    with get_db_session(config=config):
+        return get_stored_fingerprint() == fingerprint
+
+
+def _validate_migrate_options(
+    count: int | None,
+    to_version: str | None,
+    jobs: int,
+    target_jobs: int | None = None,
+) -> None:
+    """Reject invalid combinations of migrate options."""
     if count is not None and to_version is not None:
         raise ValueError("Cannot specify both 'count' and 'to_version'.")
 
     if count is not None and count < 1:
         raise ValueError("'count' must be a positive integer.")
 
-    from dbwarden.config import get_config
+    if jobs < 1:
+        raise ValueError("'jobs' must be a positive integer.")
+
+    if target_jobs is not None and target_jobs < 1:
+        raise ValueError("'target_jobs' must be a positive integer.")
+
+
+def _warm_migration_cache(migrations_dir: str) -> None:
+    """Parse every migration file once before targets are migrated."""
+    cache = get_migration_cache(migrations_dir)
+    for filepath in get_migration_filepaths_by_version(migrations_dir).values():
+        cache.get(filepath)
+    for filepath in get_runs_always_filepaths(migrations_dir):
+        cache.get(filepath)
+    for filepath in get_runs_on_change_filepaths(migrations_dir, changed_only=False):
+        cache.get(filepath)
+    cache.save()
+
+
+def _migrate_database(
+    config: DbwardenConfig,
+    migrations_dir: str,
+    count: int | None,
+    to_version: str | None,
+    baseline: bool,
+    jobs: int,
+    logger: DBWardenLogger,
+) -> str:
+    """
+    Migrate one database in its own session.
 
-    config = get_config()
-    sqlalchemy_url = config.sqlalchemy_url
+    After a migrate that was not limited by ``count``, ``to_version`` or
+    ``baseline`` the migrations directory fingerprint is recorded, so that
+    ``migrations_up_to_date()`` can tell the database is current.
 
-    if with_backup:
-        backup_directory = backup_dir or os.path.join(os.getcwd(), "backups")
-        backup_path = create_backup(sqlalchemy_url, backup_directory)
-        logger.log_backup_created(backup_path)
-
-    migrations_dir = get_migrations_directory()
+    Returns:
+        str: Outcome message for the user.
+    """
+    fingerprint = get_migrations_fingerprint(migrations_dir)
+
+    with get_db_session(config=config) as session:
+        if jobs > 1 and session.connection.dialect.name == "sqlite":
+            logger.warning("SQLite does not support concurrent DDL; ignoring --jobs.")
+            jobs = 1
+
+        try:
+            with migration_lock() as lock_stats:
+                logger.debug(
+                    f"Lock wait: {lock_stats.waited:.3f}s, "
+                    f"{lock_stats.attempts} attempt(s) via {lock_stats.backend}"
+                )
+                message = _apply_migrations(
+                    migrations_dir=migrations_dir,
+                    count=count,
+                    to_version=to_version,
+                    baseline=baseline,
+                    logger=logger,
+                    jobs=jobs,
+                )
+                if count is None and to_version is None and not baseline:
+                    store_fingerprint(fingerprint)
+                return message
+        finally:
+            logger.debug(session.summary())
+
+
+def _apply_migrations(
+    migrations_dir: str,
+    count: int | None,
+    to_version: str | None,
+    baseline: bool,
+    logger: DBWardenLogger,
+    jobs: int = 1,
+) -> str:
+    """
+    Apply pending migrations using the active database session.
 
+    Returns:
+        str: Outcome message for the user.
+    """
     create_migrations_table_if_not_exists()
-    create_lock_table_if_not_exists()
 
     applied_versions = set(get_migrated_versions())
 
@@ -136,8 +535,7 @@ def migrate_cmd(
 
         set_baseline_migration(migrations_dir, to_version)
         logger.log_baseline_set(to_version)
-        print(f"Baseline set at version: {to_version}")
-        return
+        return f"Baseline set at version: {to_version}"
 
     filepaths_by_version = _get_filepaths_by_version(
         count=count,
@@ -147,77 +545,80 @@ def migrate_cmd(
     )
 
     runs_always_filepaths = get_runs_always_filepaths(migrations_dir)
-    runs_on_change_filepaths = get_runs_on_change_filepaths(
-        migrations_dir, changed_only=True
-    )
+    runs_on_change_migrations = get_changed_runs_on_change_migrations(migrations_dir)
 
     if (
         not filepaths_by_version
         and not runs_always_filepaths
-        and not runs_on_change_filepaths
+        and not runs_on_change_migrations
     ):
-        print("Migrations are up to date.")
-        return
+        return "Migrations are up to date."
 
     if filepaths_by_version:
         logger.log_pending_migrations(list(filepaths_by_version.keys()))
 
-    versioned_count = 0
-    seed_count = 0
+    cache = get_migration_cache(migrations_dir)
+    migrations = {
+        version: cache.get(filepath)
+        for version, filepath in filepaths_by_version.items()
+    }
 
-    for version, filepath in filepaths_by_version.items():
-        filename = filepath.split("/")[-1]
-        sql_statements = parse_upgrade_statements(filepath)
+    if jobs > 1 and len(migrations) > 1:
+        graph = _build_migration_graph(migrations)
 
-        for sql in sql_statements:
-            logger.log_sql_statement(sql)
+        config = get_active_session().config
 
-        start_time = time.time()
-        logger.log_migration_start(version, filename)
+        # Workers record their migrations concurrently, so they take their
+        # execution sequence numbers from here in completion order instead
+        # of reading the same MAX(execution_seq) from the database.
+        execution_seqs = itertools.count(get_next_execution_seq())
+        execution_seqs_lock = threading.Lock()
 
-        run_migration(
-            sql_statements=sql_statements,
-            version=version,
-            migration_operation="upgrade",
-            filename=filename,
-        )
+        def next_execution_seq() -> int:
+            with execution_seqs_lock:
+                return next(execution_seqs)
 
-        duration = time.time() - start_time
-        logger.log_migration_end(version, filename, duration)
-        versioned_count += 1
+        # Workers run in threads of their own, outside the lock's context.
+        lease = get_active_lease()
 
-    existing_runs_always = get_existing_runs_always_filenames()
-    existing_runs_on_change = get_existing_runs_on_change_filenames_to_checksums()
+        def apply(version: str) -> None:
+            if lease is not None:
+                lease.check()
+            with get_db_session(config=config) as session:
+                session.execution_seqs = next_execution_seq
+                _run_versioned_migration(version, migrations[version], logger)
+
+        completed = graph.run_parallel(apply, jobs, satisfied=applied_versions)
+        logger.debug(f"Completion order with {jobs} jobs: {', '.join(completed)}")
+    else:
+        for version, migration in migrations.items():
+            check_migration_lease()
+            _run_versioned_migration(version, migration, logger)
+
+    seed_count = sum(1 for m in migrations.values() if m.metadata.is_seed)
+    versioned_count = len(migrations) - seed_count
 
     for filepath in runs_always_filepaths:
         filename = filepath.split("/")[-1]
-        sql_statements = parse_upgrade_statements(filepath)
+        sql_statements = cache.get_upgrade_statements(filepath)
 
+        check_migration_lease()
         start_time = time.time()
         logger.log_migration_start("RA", filename)
 
-        if filename in existing_runs_always:
-            run_repeatable_migration(
-                sql_statements=sql_statements,
-                filename=filename,
-                migration_type="runs_always",
-            )
-        else:
-            run_migration(
-                sql_statements=sql_statements,
-                version=None,
-                migration_operation="upgrade",
-                filename=filename,
-                migration_type="runs_always",
-            )
+        run_repeatable_migration(
+            sql_statements=sql_statements,
+            filename=filename,
+            migration_type="runs_always",
+        )
 
         duration = time.time() - start_time
         logger.log_migration_end("RA", filename, duration)
 
-    for filepath in runs_on_change_filepaths:
+    for filepath, sql_statements in runs_on_change_migrations:
         filename = filepath.split("/")[-1]
-        sql_statements = parse_upgrade_statements(filepath)
 
+        check_migration_lease()
         start_time = time.time()
         logger.log_migration_start("ROC", filename)
 
@@ -230,11 +631,83 @@ def migrate_cmd(
         duration = time.time() - start_time
         logger.log_migration_end("ROC", filename, duration)
 
+    cache.save()
+
     total = versioned_count + seed_count
     if total > 0:
-        print(f"Migrations completed successfully: {total} migrations applied.")
-    else:
-        print("No migrations to apply.")
+        return f"Migrations completed successfully: {total} migrations applied."
+    return "No migrations to apply."
+
+
+def _run_versioned_migration(
+    version: str, migration: ParsedMigration, logger: DBWardenLogger
+) -> None:
+    """Apply a single versioned migration, streaming it if it is a seed."""
+    filepath = migration.filepath
+    filename = filepath.split("/")[-1]
+
+    if migration.metadata.is_seed:
+        start_time = time.time()
+        logger.log_migration_start(version, filename)
+
+        executed = run_streaming_migration(
+            sql_statements=iter_upgrade_statements(filepath, use_mmap=True),
+            version=version,
+            filename=filename,
+        )
+
+        duration = time.time() - start_time
+        logger.debug(f"Streamed {executed} statements from {filename}")
+        logger.log_migration_end(version, filename, duration)
+        logger.log_seed_migration(filename)
+        return
+
+    sql_statements = migration.upgrade_statements
+
+    for sql in sql_statements:
+        logger.log_sql_statement(sql)
+
+    start_time = time.time()
+    logger.log_migration_start(version, filename)
+
+    run_migration(
+        sql_statements=sql_statements,
+        version=version,
+        migration_operation="upgrade",
+        filename=filename,
+    )
+
+    duration = time.time() - start_time
+    logger.log_migration_end(version, filename, duration)
+
+
+def _build_migration_graph(migrations: dict[str, ParsedMigration]) -> MigrationGraph:
+    """
+    Build the dependency graph used by ``migrate --jobs``.
+
+    A migration with a ``depends_on`` header depends only on the versions it
+    lists. A migration without one keeps the serial semantics: it runs after
+    every earlier pending migration, and later migrations without a header
+    run after it.
+
+    Args:
+        migrations: Pending migrations by version, in version order.
+
+    Returns:
+        MigrationGraph: The dependency graph.
+    """
+    graph = MigrationGraph()
+    since_barrier: list[str] = []
+
+    for version, migration in migrations.items():
+        if migration.metadata.depends_on:
+            graph.add(version, migration.metadata.depends_on)
+            since_barrier.append(version)
+        else:
+            graph.add(version, since_barrier)
+            since_barrier = [version]
+
+    return graph
 
 
 def _get_filepaths_by_version(
@@ -1,13 +1,17 @@
 import time
 
-from dbwarden.engine.file_parser import parse_rollback_statements
+from dbwarden.config import DbwardenConfig
+from dbwarden.database.connection import get_db_session
+from dbwarden.engine.lock import check_migration_lease, migration_lock
+from dbwarden.engine.parse_cache import get_migration_cache
 from dbwarden.engine.version import get_migrations_directory
-from dbwarden.logging import get_logger
+from dbwarden.exceptions import VersionNotFoundError
+from dbwarden.logging import DBWardenLogger, get_logger
 from dbwarden.repositories import (
-    create_lock_table_if_not_exists,
     create_migrations_table_if_not_exists,
     get_latest_versions,
     run_migration,
+    store_fingerprint,
 )
 
 
@@ -15,6 +19,7 @@ def rollback_cmd(
     count: int | None = None,
     to_version: str | None = None,
     verbose: bool = False,
+    config: DbwardenConfig | None = None,
 ) -> None:
     """
     Rollback the last applied migration.
@@ -23,6 +28,7 @@ def rollback_cmd(
         count: Number of migrations to rollback.
         to_version: Rollback to a specific version.
         verbose: Enable verbose logging.
+        config: Configuration to use instead of discovering warden.toml.
     """
     logger = get_logger(verbose=verbose)
 
@@ -31,8 +37,27 @@ def rollback_cmd(
 
     migrations_dir = get_migrations_directory()
 
+    with get_db_session(config=config) as session:
+        try:
+            with migration_lock():
+                _rollback_migrations(
+                    count=count,
+                    to_version=to_version,
+                    migrations_dir=migrations_dir,
+                    logger=logger,
+                )
+        finally:
+            logger.debug(session.summary())
+
+
+def _rollback_migrations(
+    count: int | None,
+    to_version: str | None,
+    migrations_dir: str,
+    logger: DBWardenLogger,
+) -> None:
+    """Roll back migrations using the active database session."""
     create_migrations_table_if_not_exists()
-    create_lock_table_if_not_exists()
 
     if count is None and to_version is None:
         count = 1
@@ -43,18 +68,22 @@ def rollback_cmd(
         print("Nothing to rollback.")
         return
 
+    store_fingerprint(None)
+
     versions_to_rollback = _get_versions_to_rollback(
         latest_versions=latest_versions,
         migrations_dir=migrations_dir,
     )
 
-    for version, filepath in reversed(list(versions_to_rollback.items())):
+    cache = get_migration_cache(migrations_dir)
+    for version, filepath in versions_to_rollback.items():
         filename = filepath.split("/")[-1]
-        sql_statements = parse_rollback_statements(filepath)
+        sql_statements = cache.get(filepath).rollback_statements
 
         for sql in sql_statements:
             logger.log_sql_statement(sql)
 
+        check_migration_lease()
         start_time = time.time()
         logger.info(f"Rolling back migration: {filename} (version: {version})")
 
@@ -68,6 +97,8 @@ def rollback_cmd(
         duration = time.time() - start_time
         logger.info(f"Rollback completed: {filename} in {duration:.2f}s")
 
+    cache.save()
+
     print(
         f"Rollback completed successfully: {len(versions_to_rollback)} migrations reverted."
     )
@@ -77,16 +108,30 @@ def _get_versions_to_rollback(
     latest_versions: list[str],
     migrations_dir: str,
 ) -> dict[str, str]:
-    """Get migration file paths for versions to rollback."""
+    """
+    Get migration file paths for versions to rollback.
+
+    Args:
+        latest_versions: Versions to roll back, most recently applied first.
+        migrations_dir: Path to migrations directory.
+
+    Returns:
+        dict[str, str]: Mapping of version to file path, in rollback order.
+
+    Raises:
+        VersionNotFoundError: If the file of a version no longer exists.
+    """
     from dbwarden.engine.version import get_migration_filepaths_by_version
 
     if not latest_versions:
         return {}
 
-    filepaths = get_migration_filepaths_by_version(
-        directory=migrations_dir,
-        version_to_start_from=None,
-        end_version=latest_versions[-1],
-    )
+    filepaths = get_migration_filepaths_by_version(directory=migrations_dir)
+
+    missing = [version for version in latest_versions if version not in filepaths]
+    if missing:
+        raise VersionNotFoundError(
+            f"Cannot roll back {', '.join(missing)}: migration file not found."
+        )
 
-    return dict(reversed(list(filepaths.items())))
+    return {version: filepaths[version] for version in latest_versions}
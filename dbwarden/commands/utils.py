@@ -37,6 +37,12 @@ def config_cmd() -> None:
         if schema:
             print(f"postgres_schema: {schema}")
 
+    engine = warden_config.get("engine")
+    if isinstance(engine, dict):
+        for name, value in engine.items():
+            if name != "connect_args":
+                print(f"engine.{name}: {value}")
+
     print()
     print(f"Config file: {toml_path}")
 
@@ -3,10 +3,19 @@ from typing import Final
 
 MIGRATIONS_DIR: Final[str] = "migrations"
 TOML_FILE: Final[str] = "warden.toml"
+CACHE_DIR: Final[str] = ".dbwarden_cache"
 RUNS_ALWAYS_FILE_PREFIX: Final[str] = "RA__"
 RUNS_ON_CHANGE_FILE_PREFIX: Final[str] = "ROC__"
 VERSION_FILE_PREFIX: Final[str] = "V"
 DEFAULT_DELIMITER: Final[str] = ";"
+SEED_BATCH_SIZE: Final[int] = 500
+LOCK_TIMEOUT: Final[float] = 300.0
+LOCK_INITIAL_BACKOFF: Final[float] = 0.05
+LOCK_MAX_BACKOFF: Final[float] = 2.0
+LOCK_LEASE_DURATION: Final[float] = 30.0
+LOCK_HEARTBEAT_INTERVAL: Final[float] = 10.0
+ASYNC_ENV_VAR: Final[str] = "DBWARDEN_ASYNC"
+SCHEMA_SOURCES: Final[tuple[str, ...]] = ("database", "migrations", "sqlite")
 
 DBWARDEN_VERSION: Final[str] = version("dbwarden")
 
@@ -1,11 +1,34 @@
 from dbwarden.database.connection import (
+    dispose_async_engines,
+    dispose_engines,
+    get_async_db_connection,
+    get_async_db_session,
+    get_async_engine,
     get_db_connection,
+    get_db_session,
+    get_engine,
+    get_mode,
+    is_async_enabled,
     reset_connection_logging,
+    run_in_session,
 )
 from dbwarden.database.queries import QueryMethod, get_query
+from dbwarden.database.session import MigrationSession, get_active_session
 
 __all__ = [
+    "dispose_async_engines",
+    "dispose_engines",
+    "get_async_db_connection",
+    "get_async_db_session",
+    "get_async_engine",
     "get_db_connection",
+    "get_db_session",
+    "get_engine",
+    "get_mode",
+    "is_async_enabled",
+    "run_in_session",
+    "get_active_session",
+    "MigrationSession",
     "reset_connection_logging",
     "QueryMethod",
     "get_query",
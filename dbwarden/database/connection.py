@@ -1,49 +1,434 @@
 import logging
-from contextlib import contextmanager
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
 from functools import lru_cache
-from typing import Any, Generator
+from typing import Any, AsyncGenerator, Callable, Generator, TypeVar
 
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
 
-from dbwarden.config import get_config
+from dbwarden.config import DbwardenConfig, EngineOptions, get_config
+from dbwarden.constants import ASYNC_ENV_VAR
+from dbwarden.exceptions import ConfigurationError
+from dbwarden.database.session import (
+    MigrationSession,
+    bind_session,
+    get_active_session,
+)
 from dbwarden.logging import get_logger
 
 
-@lru_cache(maxsize=1)
-def _get_engine(url: str) -> Engine:
-    return create_engine(url=url)
+# Key of the schema last applied to a DBAPI connection in its ``info``.
+SEARCH_PATH_INFO_KEY = "dbwarden_search_path"
+
+# Driver used in async mode when sqlalchemy_url names a synchronous one.
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+}
+
+T = TypeVar("T")
+
+# Every engine handed out by _get_engine() and _get_async_engine(), so that
+# their pools can be disposed even after the caches were cleared.
+_engines: list[Engine] = []
+_async_engines: list[AsyncEngine] = []
+_engines_lock = threading.Lock()
+
+
+def is_async_enabled(config: DbwardenConfig | None = None) -> bool:
+    """
+    Check whether migrations run through an asyncio engine.
+
+    The ``DBWARDEN_ASYNC`` environment variable takes precedence over the
+    ``async`` option of warden.toml.
+
+    Args:
+        config: Configuration to check instead of warden.toml.
+
+    Returns:
+        bool: True in async mode.
+    """
+    env_value = os.environ.get(ASYNC_ENV_VAR, "").strip().lower()
+    if env_value:
+        return env_value in ("1", "true", "yes", "on")
+    if config is None:
+        config = get_config()
+    return config.async_mode
+
+
+def get_mode(config: DbwardenConfig | None = None) -> str:
+    """
+    Get the execution mode.
+
+    Args:
+        config: Configuration to check instead of warden.toml.
+
+    Returns:
+        str: ``"async"`` or ``"sync"``.
+    """
+    return "async" if is_async_enabled(config) else "sync"
+
+
+def get_sync_url(url: str) -> str:
+    """
+    Get the URL for a synchronous engine.
+
+    An asyncio driver such as ``sqlite+aiosqlite`` is replaced by the
+    default driver of its backend, so commands without an async
+    implementation work in async mode too.
+
+    Args:
+        url: Database URL from the configuration.
+
+    Returns:
+        str: URL with a synchronous driver.
+    """
+    parsed = make_url(url)
+    if not parsed.get_dialect().is_async:
+        return url
+    return parsed.set(drivername=parsed.get_backend_name()).render_as_string(
+        hide_password=False
+    )
+
+
+def get_async_url(url: str) -> str:
+    """
+    Get the URL for an asyncio engine.
+
+    A URL naming a synchronous driver gets the backend's asyncio driver
+    from ``ASYNC_DRIVERS``.
+
+    Args:
+        url: Database URL from the configuration.
+
+    Returns:
+        str: URL with an asyncio driver.
+
+    Raises:
+        ConfigurationError: If no asyncio driver is known for the backend.
+    """
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ConfigurationError(
+            f"No asyncio driver is known for {backend}; "
+            "name one in sqlalchemy_url or disable async mode."
+        )
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_engine(url: str, options: EngineOptions | None = None) -> Engine:
+    """
+    Get the engine for a URL and engine options, creating it once.
+
+    Engines are kept per URL and options for the life of the process, so
+    targets on different databases each keep their own pool.
+    """
+    url = get_sync_url(url)
+    kwargs = options.engine_kwargs(url) if options is not None else {}
+    engine = create_engine(url=url, **kwargs)
+    with _engines_lock:
+        _engines.append(engine)
+    return engine
+
+
+def get_engine(config: DbwardenConfig) -> Engine:
+    """
+    Get the shared engine for a configuration.
+
+    Args:
+        config: Configuration with the database URL and engine options.
+
+    Returns:
+        Engine: The engine for the URL and ``[warden.engine]`` options.
+    """
+    return _get_engine(config.sqlalchemy_url, config.engine)
+
+
+@lru_cache(maxsize=None)
+def _get_async_engine(url: str, options: EngineOptions | None = None) -> AsyncEngine:
+    """Get the asyncio engine for a URL and engine options, creating it once."""
+    url = get_async_url(url)
+    kwargs = (
+        options.engine_kwargs(url, asynchronous=True) if options is not None else {}
+    )
+    engine = create_async_engine(url, **kwargs)
+    with _engines_lock:
+        _async_engines.append(engine)
+    return engine
+
+
+def get_async_engine(config: DbwardenConfig) -> AsyncEngine:
+    """
+    Get the shared asyncio engine for a configuration.
+
+    Args:
+        config: Configuration with the database URL and engine options.
+
+    Returns:
+        AsyncEngine: The engine for the URL and ``[warden.engine]`` options.
+    """
+    return _get_async_engine(config.sqlalchemy_url, config.engine)
+
+
+def dispose_engines() -> None:
+    """
+    Close the pooled connections of every engine and forget the engines.
+
+    Long-lived processes call this after migrating, so the migration pools
+    do not hold connections open; the next connection creates new engines.
+    Asyncio engines are disposed by ``dispose_async_engines()``.
+    """
+    _get_engine.cache_clear()
+    with _engines_lock:
+        engines = list(_engines)
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+async def dispose_async_engines() -> None:
+    """Close the pooled connections of every asyncio engine and forget them."""
+    _get_async_engine.cache_clear()
+    with _engines_lock:
+        engines = list(_async_engines)
+        _async_engines.clear()
+    for engine in engines:
+        await engine.dispose()
 
 
 _connection_init_logged = False
+_connection_init_lock = threading.Lock()
 
 
 def reset_connection_logging() -> None:
     """Reset the connection init logging flag for new CLI invocations."""
     global _connection_init_logged
-    _connection_init_logged = False
+    with _connection_init_lock:
+        _connection_init_logged = False
+
+
+def _log_connection_init(mode: str) -> None:
+    """Log the connection init message once, even across worker threads."""
+    global _connection_init_logged
+    with _connection_init_lock:
+        if _connection_init_logged:
+            return
+        _connection_init_logged = True
+    get_logger().log_connection_init(mode)
 
 
 @contextmanager
 def get_db_connection() -> Generator[Any, None, None]:
     """
     Context manager that yields a database connection.
+
+    Inside an active ``get_db_session()`` block the session's connection is
+    reused and the block runs in its own transaction on it.
     """
-    global _connection_init_logged
-    logger = get_logger()
+    session = get_active_session()
+    if session is not None:
+        with session.transaction() as connection:
+            yield connection
+        return
+
     config = get_config()
 
-    engine = _get_engine(config.sqlalchemy_url)
+    engine = get_engine(config)
 
-    if not _connection_init_logged:
-        logger.log_connection_init("sync")
-        _connection_init_logged = True
+    _log_connection_init("sync")
+
+    with engine.connect() as connection:
+        _apply_search_path(connection, config)
+        with connection.begin():
+            yield connection
+
+
+@contextmanager
+def get_db_session(
+    config: DbwardenConfig | None = None,
+) -> Generator[MigrationSession, None, None]:
+    """
+    Context manager that opens a single-connection unit of work.
+
+    Every ``get_db_connection()`` call made inside the block reuses the same
+    connection, so configuration lookup, pool checkout and ``search_path``
+    setup happen once per session instead of once per repository call.
+    Nested calls join the session that is already active.
+
+    Args:
+        config: Configuration to connect with instead of warden.toml, e.g.
+            the configuration of one migration target.
+
+    Yields:
+        MigrationSession: The active session.
+    """
+    session = get_active_session()
+    if session is not None:
+        yield session
+        return
+
+    if config is None:
+        config = get_config()
+
+    engine = get_engine(config)
+
+    _log_connection_init("sync")
+
+    with engine.connect() as connection:
+        _apply_search_path(connection, config)
+        with bind_session(MigrationSession(connection, config)) as session:
+            yield session
+
+
+@asynccontextmanager
+async def get_async_db_connection(
+    config: DbwardenConfig | None = None,
+) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Async context manager that yields a database connection.
+
+    The asyncio counterpart of ``get_db_connection()``: the block runs in a
+    transaction that commits when it exits.
+
+    Args:
+        config: Configuration to connect with instead of warden.toml.
+
+    Yields:
+        AsyncConnection: A connection from the asyncio engine.
+    """
+    async with get_async_db_session(config) as connection:
+        async with connection.begin():
+            yield connection
+
+
+@asynccontextmanager
+async def get_async_db_session(
+    config: DbwardenConfig | None = None,
+) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Async context manager that holds one connection for a unit of work.
 
-    with engine.begin() as connection:
-        postgres_schema = config.postgres_schema
-        if postgres_schema:
+    The asyncio counterpart of ``get_db_session()``. The connection is not
+    in a transaction; DBWarden's repositories and commands run on it
+    through ``run_in_session()``.
+
+    Args:
+        config: Configuration to connect with instead of warden.toml.
+
+    Yields:
+        AsyncConnection: A connection from the asyncio engine.
+    """
+    if config is None:
+        config = get_config()
+
+    engine = get_async_engine(config)
+
+    _log_connection_init("async")
+
+    async with engine.connect() as connection:
+        await connection.run_sync(_apply_search_path, config)
+        yield connection
+
+
+async def run_in_session(
+    connection: AsyncConnection,
+    config: DbwardenConfig,
+    function: Callable[..., T],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """
+    Run synchronous DBWarden code on an asyncio connection.
+
+    The function runs through ``AsyncConnection.run_sync()`` with a
+    ``MigrationSession`` bound to the connection, so every
+    ``get_db_connection()`` call it makes is served from it and awaits
+    the driver instead of blocking the event loop. This lets the async
+    mode share the repositories and the migration logic with the sync one.
+
+    Args:
+        connection: Connection from ``get_async_db_session()``.
+        config: Configuration the connection was opened with.
+        function: Function to call.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        The function's return value.
+    """
+
+    def call(sync_connection: Connection) -> T:
+        with bind_session(MigrationSession(sync_connection, config)):
+            return function(*args, **kwargs)
+
+    return await connection.run_sync(call)
+
+
+def _apply_search_path(connection: Connection, config: DbwardenConfig) -> None:
+    """
+    Point ``search_path`` at the configured schema, once per DBAPI connection.
+
+    The schema last set on a pooled connection is remembered in its
+    ``info``, which lives as long as the physical connection, so a checkout
+    only pays for setting ``search_path`` when the connection is new or was
+    last used for another schema. A connection that was pointed at a
+    schema is reset when it is checked out by a configuration without one.
+    Engines are shared by every schema on a URL, so a connect event could
+    not know which schema a checkout is for.
+
+    With ``verify_search_path`` the current schema is read back on every
+    checkout, and ``search_path`` is set again if something else changed
+    it, e.g. a pooler resetting server connections.
+
+    Args:
+        connection: A connection that was just checked out.
+        config: Configuration with the schema to use.
+    """
+    schema = config.postgres_schema
+    info = connection.connection.info
+    applied = info.get(SEARCH_PATH_INFO_KEY)
+
+    if schema and applied == schema and config.verify_search_path:
+        with connection.begin():
+            current = connection.execute(text("SELECT current_schema()")).scalar()
+        if current != schema:
+            get_logger().warning(
+                f"search_path of a pooled connection was changed to {current}; "
+                f"setting it to {schema} again"
+            )
+            applied = None
+
+    if applied == schema:
+        return
+
+    # SET is transactional on PostgreSQL, so it is committed on its own
+    # before being recorded; a rolled back migration cannot undo it.
+    # set_config() takes the schema as a parameter, which SET cannot when
+    # the driver prepares statements, as asyncpg does.
+    with connection.begin():
+        if schema:
             connection.execute(
-                text("SET search_path TO :postgres_schema"),
-                parameters={"postgres_schema": postgres_schema},
+                text("SELECT set_config('search_path', :postgres_schema, false)"),
+                parameters={"postgres_schema": schema},
             )
-        yield connection
+        else:
+            connection.execute(text("SET search_path TO DEFAULT"))
+
+    if schema:
+        info[SEARCH_PATH_INFO_KEY] = schema
+    else:
+        info.pop(SEARCH_PATH_INFO_KEY, None)
@@ -1,21 +1,56 @@
+import re
 from enum import Enum
+from functools import lru_cache
+
+from sqlalchemy import DateTime, TextClause, bindparam, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.selectable import TextualSelect
+from sqlalchemy.types import TypeEngine
 
 
 class QueryMethod(Enum):
     """Database query methods."""
 
     CREATE_MIGRATIONS_TABLE = "create_migrations_table"
+    CREATE_REPEATABLE_INDEX = "create_repeatable_index"
+    ADD_EXECUTION_SEQ_COLUMN = "add_execution_seq_column"
+    BACKFILL_EXECUTION_SEQ = "backfill_execution_seq"
+    CREATE_EXECUTION_SEQ_INDEX = "create_execution_seq_index"
+    DEDUPLICATE_REPEATABLE_MIGRATIONS = "deduplicate_repeatable_migrations"
     CREATE_LOCK_TABLE = "create_lock_table"
     INSERT_VERSION = "insert_version"
+    INSERT_VERSION_AT_SEQ = "insert_version_at_seq"
+    GET_NEXT_EXECUTION_SEQ = "get_next_execution_seq"
     DELETE_VERSION = "delete_version"
     GET_ALL_MIGRATIONS = "get_all_migrations"
     GET_LATEST_VERSION = "get_latest_version"
+    GET_LATEST_VERSIONS = "get_latest_versions"
+    GET_VERSIONS_AFTER = "get_versions_after"
     GET_MIGRATED_VERSIONS = "get_migrated_versions"
+    GET_MIGRATIONS_STATE = "get_migrations_state"
     CHECK_IF_MIGRATIONS_TABLE_EXISTS = "check_if_migrations_table_exists"
     CHECK_IF_VERSION_EXISTS = "check_if_version_exists"
+    ADD_LOCK_HOLDER_COLUMN = "add_lock_holder_column"
+    ADD_LOCK_EXPIRES_AT_COLUMN = "add_lock_expires_at_column"
+    INSERT_LOCK_ROW = "insert_lock_row"
     ACQUIRE_LOCK = "acquire_lock"
+    TAKE_OVER_LOCK = "take_over_lock"
+    RENEW_LOCK = "renew_lock"
+    MARK_LOCK_HELD = "mark_lock_held"
     RELEASE_LOCK = "release_lock"
+    FORCE_RELEASE_LOCK = "force_release_lock"
     CHECK_LOCK = "check_lock"
+    GET_LOCK_INFO = "get_lock_info"
+    PG_TRY_ADVISORY_LOCK = "pg_try_advisory_lock"
+    PG_ADVISORY_UNLOCK = "pg_advisory_unlock"
+    PG_ADVISORY_LOCK_HELD = "pg_advisory_lock_held"
+    MYSQL_GET_LOCK = "mysql_get_lock"
+    MYSQL_RELEASE_LOCK = "mysql_release_lock"
+    MYSQL_IS_USED_LOCK = "mysql_is_used_lock"
+    CREATE_FINGERPRINT_TABLE = "create_fingerprint_table"
+    GET_FINGERPRINT = "get_fingerprint"
+    DELETE_FINGERPRINT = "delete_fingerprint"
+    UPSERT_FINGERPRINT = "upsert_fingerprint"
     GET_TABLE_NAMES = "get_table_names"
     GET_TABLE_COLUMNS = "get_table_columns"
     GET_TABLE_INDEXES = "get_table_indexes"
@@ -25,69 +60,162 @@ class QueryMethod(Enum):
     DELETE_REPEATABLE_BY_FILENAME = "delete_repeatable_by_filename"
 
 
+DEFAULT_DIALECT = "sqlite"
+
+DIALECT_ALIASES = {"mariadb": "mysql"}
+
+REPEATABLE_INDEX_NAME = "ux_dbwarden_migrations_type_filename"
+
+EXECUTION_SEQ_INDEX_NAME = "ix_dbwarden_migrations_execution_seq"
+
+# Next value of the execution sequence. The migration lock keeps other
+# processes out; workers of one ``migrate --jobs`` run record concurrently,
+# so they are handed their numbers instead (see INSERT_VERSION_AT_SEQ).
+_NEXT_EXECUTION_SEQ = (
+    "(SELECT COALESCE(MAX(execution_seq), 0) + 1 FROM dbwarden_migrations)"
+)
+
+
+# Queries whose SQL is the same on every supported dialect.
 SQL_QUERIES = {
-    QueryMethod.CREATE_MIGRATIONS_TABLE: """
-        CREATE TABLE IF NOT EXISTS dbwarden_migrations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            version VARCHAR(255) UNIQUE,
-            description VARCHAR(500),
-            filename VARCHAR(500),
-            migration_type VARCHAR(50),
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            checksum VARCHAR(128)
+    QueryMethod.CREATE_REPEATABLE_INDEX: f"""
+        CREATE UNIQUE INDEX {REPEATABLE_INDEX_NAME}
+        ON dbwarden_migrations (migration_type, filename)
+    """,
+    QueryMethod.ADD_EXECUTION_SEQ_COLUMN: """
+        ALTER TABLE dbwarden_migrations ADD COLUMN execution_seq BIGINT
+    """,
+    # Rows are numbered in id order, which is the order they were inserted in.
+    QueryMethod.BACKFILL_EXECUTION_SEQ: """
+        UPDATE dbwarden_migrations SET execution_seq = id WHERE execution_seq IS NULL
+    """,
+    QueryMethod.CREATE_EXECUTION_SEQ_INDEX: f"""
+        CREATE INDEX {EXECUTION_SEQ_INDEX_NAME}
+        ON dbwarden_migrations (execution_seq)
+    """,
+    QueryMethod.DEDUPLICATE_REPEATABLE_MIGRATIONS: """
+        DELETE FROM dbwarden_migrations
+        WHERE migration_type IN ('runs_always', 'runs_on_change')
+        AND id NOT IN (
+            SELECT id FROM (
+                SELECT MAX(id) AS id FROM dbwarden_migrations
+                WHERE migration_type IN ('runs_always', 'runs_on_change')
+                GROUP BY migration_type, filename
+            ) AS latest
         )
     """,
     QueryMethod.CREATE_LOCK_TABLE: """
         CREATE TABLE IF NOT EXISTS dbwarden_lock (
             id INTEGER PRIMARY KEY CHECK (id = 1),
             locked BOOLEAN DEFAULT FALSE,
-            acquired_at TIMESTAMP
+            acquired_at TIMESTAMP,
+            holder VARCHAR(255),
+            expires_at TIMESTAMP
         )
     """,
-    QueryMethod.INSERT_VERSION: """
-        INSERT INTO dbwarden_migrations (version, description, filename, migration_type, checksum)
-        VALUES (:version, :description, :filename, :migration_type, :checksum)
+    QueryMethod.ADD_LOCK_HOLDER_COLUMN: """
+        ALTER TABLE dbwarden_lock ADD COLUMN holder VARCHAR(255)
+    """,
+    QueryMethod.ADD_LOCK_EXPIRES_AT_COLUMN: """
+        ALTER TABLE dbwarden_lock ADD COLUMN expires_at TIMESTAMP
+    """,
+    QueryMethod.INSERT_VERSION: f"""
+        INSERT INTO dbwarden_migrations
+        (version, description, filename, migration_type, checksum, execution_seq)
+        VALUES (:version, :description, :filename, :migration_type, :checksum,
+            {_NEXT_EXECUTION_SEQ})
+    """,
+    QueryMethod.INSERT_VERSION_AT_SEQ: """
+        INSERT INTO dbwarden_migrations
+        (version, description, filename, migration_type, checksum, execution_seq)
+        VALUES (:version, :description, :filename, :migration_type, :checksum,
+            :execution_seq)
+    """,
+    QueryMethod.GET_NEXT_EXECUTION_SEQ: """
+        SELECT COALESCE(MAX(execution_seq), 0) + 1 FROM dbwarden_migrations
     """,
     QueryMethod.DELETE_VERSION: """
         DELETE FROM dbwarden_migrations WHERE version = :version
     """,
     QueryMethod.GET_ALL_MIGRATIONS: """
-        SELECT * FROM dbwarden_migrations ORDER BY applied_at ASC
+        SELECT * FROM dbwarden_migrations ORDER BY execution_seq ASC, id ASC
     """,
     QueryMethod.GET_LATEST_VERSION: """
         SELECT * FROM dbwarden_migrations
         WHERE version IS NOT NULL
-        ORDER BY applied_at DESC
+        ORDER BY execution_seq DESC, id DESC
         LIMIT 1
     """,
+    QueryMethod.GET_LATEST_VERSIONS: """
+        SELECT version FROM dbwarden_migrations
+        WHERE version IS NOT NULL
+        ORDER BY execution_seq DESC, id DESC
+        LIMIT :limit
+    """,
+    QueryMethod.GET_VERSIONS_AFTER: """
+        SELECT version FROM dbwarden_migrations
+        WHERE version > :starting_version AND version IS NOT NULL
+        ORDER BY execution_seq DESC, id DESC
+    """,
     QueryMethod.GET_MIGRATED_VERSIONS: """
-        SELECT version FROM dbwarden_migrations WHERE version IS NOT NULL ORDER BY applied_at ASC
+        SELECT version FROM dbwarden_migrations
+        WHERE version IS NOT NULL
+        ORDER BY execution_seq ASC, id ASC
     """,
-    QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS: """
-        SELECT name FROM sqlite_master WHERE type='table' AND name='dbwarden_migrations'
+    QueryMethod.GET_MIGRATIONS_STATE: """
+        SELECT MAX(execution_seq) AS execution_seq, COUNT(*) AS applied,
+            MAX(applied_at) AS applied_at
+        FROM dbwarden_migrations
     """,
     QueryMethod.CHECK_IF_VERSION_EXISTS: """
         SELECT COUNT(*) FROM dbwarden_migrations WHERE version = :version
     """,
     QueryMethod.ACQUIRE_LOCK: """
-        INSERT OR REPLACE INTO dbwarden_lock (id, locked, acquired_at)
-        VALUES (1, TRUE, CURRENT_TIMESTAMP)
+        UPDATE dbwarden_lock
+        SET locked = TRUE, acquired_at = CURRENT_TIMESTAMP,
+            holder = :holder, expires_at = :expires_at
+        WHERE id = 1 AND (locked = FALSE OR locked IS NULL)
+    """,
+    QueryMethod.TAKE_OVER_LOCK: """
+        UPDATE dbwarden_lock
+        SET locked = TRUE, acquired_at = CURRENT_TIMESTAMP,
+            holder = :holder, expires_at = :expires_at
+        WHERE id = 1 AND locked = TRUE AND expires_at < :now
+        AND holder = :previous_holder
+    """,
+    QueryMethod.RENEW_LOCK: """
+        UPDATE dbwarden_lock
+        SET expires_at = :expires_at
+        WHERE id = 1 AND locked = TRUE AND holder = :holder
     """,
     QueryMethod.RELEASE_LOCK: """
-        INSERT OR REPLACE INTO dbwarden_lock (id, locked, acquired_at)
-        VALUES (1, FALSE, NULL)
+        UPDATE dbwarden_lock
+        SET locked = FALSE, acquired_at = NULL, holder = NULL, expires_at = NULL
+        WHERE id = 1 AND locked = TRUE AND holder = :holder
+    """,
+    QueryMethod.FORCE_RELEASE_LOCK: """
+        UPDATE dbwarden_lock
+        SET locked = FALSE, acquired_at = NULL, holder = NULL, expires_at = NULL
+        WHERE id = 1 AND locked = TRUE
     """,
     QueryMethod.CHECK_LOCK: """
         SELECT locked FROM dbwarden_lock WHERE id = 1
     """,
-    QueryMethod.GET_TABLE_NAMES: """
-        SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name
+    QueryMethod.GET_LOCK_INFO: """
+        SELECT locked, holder, acquired_at, expires_at FROM dbwarden_lock WHERE id = 1
     """,
-    QueryMethod.GET_TABLE_COLUMNS: """
-        PRAGMA table_info(:table_name)
+    QueryMethod.CREATE_FINGERPRINT_TABLE: """
+        CREATE TABLE IF NOT EXISTS dbwarden_fingerprint (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            fingerprint VARCHAR(64),
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
     """,
-    QueryMethod.GET_TABLE_INDEXES: """
-        SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=:table_name
+    QueryMethod.GET_FINGERPRINT: """
+        SELECT fingerprint FROM dbwarden_fingerprint WHERE id = 1
+    """,
+    QueryMethod.DELETE_FINGERPRINT: """
+        DELETE FROM dbwarden_fingerprint WHERE id = 1
     """,
     QueryMethod.GET_RUNS_ON_CHANGE_CHECKSUMS: """
         SELECT filename, checksum FROM dbwarden_migrations
@@ -97,11 +225,6 @@ SQL_QUERIES = {
         SELECT filename FROM dbwarden_migrations
         WHERE migration_type = 'runs_always'
     """,
-    QueryMethod.UPSERT_REPEATABLE_MIGRATION: """
-        INSERT OR REPLACE INTO dbwarden_migrations
-        (version, description, filename, migration_type, checksum)
-        VALUES (NULL, :description, :filename, :migration_type, :checksum)
-    """,
     QueryMethod.DELETE_REPEATABLE_BY_FILENAME: """
         DELETE FROM dbwarden_migrations
         WHERE filename = :filename AND migration_type IN ('runs_always', 'runs_on_change')
@@ -109,15 +232,351 @@ SQL_QUERIES = {
 }
 
 
-def get_query(method: QueryMethod, **kwargs) -> str:
+# Queries whose SQL differs per dialect, by dialect name.
+DIALECT_QUERIES = {
+    "sqlite": {
+        QueryMethod.CREATE_MIGRATIONS_TABLE: """
+            CREATE TABLE IF NOT EXISTS dbwarden_migrations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version VARCHAR(255) UNIQUE,
+                description VARCHAR(500),
+                filename VARCHAR(500),
+                migration_type VARCHAR(50),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                checksum VARCHAR(128),
+                execution_seq BIGINT
+            )
+        """,
+        QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS: """
+            SELECT name FROM sqlite_master WHERE type='table' AND name='dbwarden_migrations'
+        """,
+        QueryMethod.INSERT_LOCK_ROW: """
+            INSERT INTO dbwarden_lock (id, locked) VALUES (1, FALSE)
+            ON CONFLICT (id) DO NOTHING
+        """,
+        QueryMethod.MARK_LOCK_HELD: """
+            INSERT INTO dbwarden_lock (id, locked, acquired_at, holder, expires_at)
+            VALUES (1, TRUE, CURRENT_TIMESTAMP, :holder, NULL)
+            ON CONFLICT (id) DO UPDATE SET
+                locked = TRUE, acquired_at = excluded.acquired_at,
+                holder = excluded.holder, expires_at = NULL
+        """,
+        QueryMethod.UPSERT_FINGERPRINT: """
+            INSERT INTO dbwarden_fingerprint (id, fingerprint, updated_at)
+            VALUES (1, :fingerprint, CURRENT_TIMESTAMP)
+            ON CONFLICT (id) DO UPDATE SET
+                fingerprint = excluded.fingerprint, updated_at = excluded.updated_at
+        """,
+        QueryMethod.UPSERT_REPEATABLE_MIGRATION: f"""
+            INSERT INTO dbwarden_migrations
+            (version, description, filename, migration_type, checksum, execution_seq)
+            VALUES (NULL, :description, :filename, :migration_type, :checksum,
+                {_NEXT_EXECUTION_SEQ})
+            ON CONFLICT (migration_type, filename) DO UPDATE SET
+                description = excluded.description, checksum = excluded.checksum,
+                applied_at = CURRENT_TIMESTAMP, execution_seq = excluded.execution_seq
+        """,
+        QueryMethod.GET_TABLE_NAMES: """
+            SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name
+        """,
+        QueryMethod.GET_TABLE_COLUMNS: """
+            SELECT name, type, "notnull", dflt_value, pk FROM pragma_table_info(:table_name)
+        """,
+        QueryMethod.GET_TABLE_INDEXES: """
+            SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=:table_name
+        """,
+    },
+    "postgresql": {
+        QueryMethod.CREATE_MIGRATIONS_TABLE: """
+            CREATE TABLE IF NOT EXISTS dbwarden_migrations (
+                id SERIAL PRIMARY KEY,
+                version VARCHAR(255) UNIQUE,
+                description VARCHAR(500),
+                filename VARCHAR(500),
+                migration_type VARCHAR(50),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                checksum VARCHAR(128),
+                execution_seq BIGINT
+            )
+        """,
+        QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS: """
+            SELECT to_regclass('dbwarden_migrations')
+        """,
+        QueryMethod.INSERT_LOCK_ROW: """
+            INSERT INTO dbwarden_lock (id, locked) VALUES (1, FALSE)
+            ON CONFLICT (id) DO NOTHING
+        """,
+        QueryMethod.MARK_LOCK_HELD: """
+            INSERT INTO dbwarden_lock (id, locked, acquired_at, holder, expires_at)
+            VALUES (1, TRUE, CURRENT_TIMESTAMP, :holder, NULL)
+            ON CONFLICT (id) DO UPDATE SET
+                locked = TRUE, acquired_at = EXCLUDED.acquired_at,
+                holder = EXCLUDED.holder, expires_at = NULL
+        """,
+        QueryMethod.UPSERT_FINGERPRINT: """
+            INSERT INTO dbwarden_fingerprint (id, fingerprint, updated_at)
+            VALUES (1, :fingerprint, CURRENT_TIMESTAMP)
+            ON CONFLICT (id) DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint, updated_at = EXCLUDED.updated_at
+        """,
+        QueryMethod.UPSERT_REPEATABLE_MIGRATION: f"""
+            INSERT INTO dbwarden_migrations
+            (version, description, filename, migration_type, checksum, execution_seq)
+            VALUES (NULL, :description, :filename, :migration_type, :checksum,
+                {_NEXT_EXECUTION_SEQ})
+            ON CONFLICT (migration_type, filename) DO UPDATE SET
+                description = EXCLUDED.description, checksum = EXCLUDED.checksum,
+                applied_at = CURRENT_TIMESTAMP, execution_seq = EXCLUDED.execution_seq
+        """,
+        QueryMethod.PG_TRY_ADVISORY_LOCK: """
+            SELECT pg_try_advisory_lock(:key)
+        """,
+        QueryMethod.PG_ADVISORY_UNLOCK: """
+            SELECT pg_advisory_unlock(:key)
+        """,
+        QueryMethod.PG_ADVISORY_LOCK_HELD: """
+            SELECT EXISTS (
+                SELECT 1 FROM pg_locks
+                WHERE locktype = 'advisory'
+                AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+                AND objsubid = 1
+                AND ((classid::bigint << 32) | objid::bigint) = :key
+            )
+        """,
+        QueryMethod.GET_TABLE_NAMES: """
+            SELECT table_name AS name FROM information_schema.tables
+            WHERE table_schema = current_schema() AND table_type = 'BASE TABLE'
+            ORDER BY table_name
+        """,
+        QueryMethod.GET_TABLE_COLUMNS: """
+            SELECT column_name AS name, data_type AS type,
+                is_nullable = 'NO' AS notnull, column_default AS dflt_value
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table_name
+            ORDER BY ordinal_position
+        """,
+        QueryMethod.GET_TABLE_INDEXES: """
+            SELECT indexname AS name, indexdef AS sql FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = :table_name
+        """,
+    },
+    "mysql": {
+        QueryMethod.CREATE_MIGRATIONS_TABLE: """
+            CREATE TABLE IF NOT EXISTS dbwarden_migrations (
+                id INTEGER PRIMARY KEY AUTO_INCREMENT,
+                version VARCHAR(255) UNIQUE,
+                description VARCHAR(500),
+                filename VARCHAR(500),
+                migration_type VARCHAR(50),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                checksum VARCHAR(128),
+                execution_seq BIGINT
+            )
+        """,
+        QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS: """
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = 'dbwarden_migrations'
+        """,
+        # DATETIME rather than TIMESTAMP: without explicit_defaults_for_timestamp
+        # a TIMESTAMP column is NOT NULL and would not accept a released lock.
+        QueryMethod.CREATE_LOCK_TABLE: """
+            CREATE TABLE IF NOT EXISTS dbwarden_lock (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                locked BOOLEAN DEFAULT FALSE,
+                acquired_at DATETIME NULL,
+                holder VARCHAR(255),
+                expires_at DATETIME(6) NULL
+            )
+        """,
+        QueryMethod.ADD_LOCK_EXPIRES_AT_COLUMN: """
+            ALTER TABLE dbwarden_lock ADD COLUMN expires_at DATETIME(6) NULL
+        """,
+        QueryMethod.INSERT_LOCK_ROW: """
+            INSERT IGNORE INTO dbwarden_lock (id, locked) VALUES (1, FALSE)
+        """,
+        QueryMethod.MARK_LOCK_HELD: """
+            INSERT INTO dbwarden_lock (id, locked, acquired_at, holder, expires_at)
+            VALUES (1, TRUE, CURRENT_TIMESTAMP, :holder, NULL)
+            ON DUPLICATE KEY UPDATE
+                locked = TRUE, acquired_at = VALUES(acquired_at),
+                holder = VALUES(holder), expires_at = NULL
+        """,
+        QueryMethod.UPSERT_FINGERPRINT: """
+            INSERT INTO dbwarden_fingerprint (id, fingerprint, updated_at)
+            VALUES (1, :fingerprint, CURRENT_TIMESTAMP)
+            ON DUPLICATE KEY UPDATE
+                fingerprint = VALUES(fingerprint), updated_at = VALUES(updated_at)
+        """,
+        # MySQL cannot read the table being inserted into from a subquery,
+        # so the next execution_seq comes from INSERT ... SELECT instead.
+        QueryMethod.INSERT_VERSION: """
+            INSERT INTO dbwarden_migrations
+            (version, description, filename, migration_type, checksum, execution_seq)
+            SELECT :version, :description, :filename, :migration_type, :checksum,
+                COALESCE(MAX(execution_seq), 0) + 1
+            FROM dbwarden_migrations
+        """,
+        QueryMethod.UPSERT_REPEATABLE_MIGRATION: """
+            INSERT INTO dbwarden_migrations
+            (version, description, filename, migration_type, checksum, execution_seq)
+            SELECT NULL, :description, :filename, :migration_type, :checksum,
+                COALESCE(MAX(execution_seq), 0) + 1
+            FROM dbwarden_migrations
+            ON DUPLICATE KEY UPDATE
+                description = VALUES(description), checksum = VALUES(checksum),
+                applied_at = CURRENT_TIMESTAMP, execution_seq = VALUES(execution_seq)
+        """,
+        QueryMethod.MYSQL_GET_LOCK: """
+            SELECT GET_LOCK(LEFT(CONCAT(:name, '@', DATABASE()), 64), 0)
+        """,
+        QueryMethod.MYSQL_RELEASE_LOCK: """
+            SELECT RELEASE_LOCK(LEFT(CONCAT(:name, '@', DATABASE()), 64))
+        """,
+        QueryMethod.MYSQL_IS_USED_LOCK: """
+            SELECT IS_USED_LOCK(LEFT(CONCAT(:name, '@', DATABASE()), 64)) IS NOT NULL
+        """,
+        QueryMethod.GET_TABLE_NAMES: """
+            SELECT table_name AS name FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_type = 'BASE TABLE'
+            ORDER BY table_name
+        """,
+        QueryMethod.GET_TABLE_COLUMNS: """
+            SELECT column_name AS name, column_type AS type,
+                is_nullable = 'NO' AS `notnull`, column_default AS dflt_value
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = :table_name
+            ORDER BY ordinal_position
+        """,
+        QueryMethod.GET_TABLE_INDEXES: """
+            SELECT DISTINCT index_name AS name, NULL AS `sql`
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = :table_name
+        """,
+    },
+}
+
+
+# Types of bound parameters that must be converted by SQLAlchemy rather than
+# passed to the driver as they are, e.g. datetimes on SQLite.
+PARAMETER_TYPES: dict[str, TypeEngine] = {
+    "now": DateTime(),
+    "expires_at": DateTime(),
+}
+
+# Types of result columns, by query.
+RESULT_TYPES: dict[QueryMethod, dict[str, TypeEngine]] = {
+    QueryMethod.GET_LOCK_INFO: {"acquired_at": DateTime(), "expires_at": DateTime()},
+}
+
+
+class QueryRegistry:
+    """
+    The bookkeeping queries for one SQL dialect.
+
+    Dialect-specific queries from ``DIALECT_QUERIES`` override the shared
+    ``SQL_QUERIES``; dialects without a query set of their own use the
+    SQLite one. Statements are built once per registry and reused, so
+    repositories do not re-wrap the SQL in ``text()`` on every call.
+
+    Attributes:
+        dialect: Name of the dialect whose queries are used.
+    """
+
+    def __init__(self, dialect: str):
+        dialect = DIALECT_ALIASES.get(dialect, dialect)
+        if dialect not in DIALECT_QUERIES:
+            dialect = DEFAULT_DIALECT
+
+        self.dialect = dialect
+        self._queries = {**SQL_QUERIES, **DIALECT_QUERIES[dialect]}
+        self._statements: dict[QueryMethod, TextClause | TextualSelect] = {}
+
+    def sql(self, method: QueryMethod) -> str:
+        """
+        Get the SQL of a query.
+
+        Args:
+            method: The query method enum value.
+
+        Returns:
+            str: The SQL query string, or an empty string if the dialect
+                does not support the query.
+        """
+        return self._queries.get(method, "")
+
+    def statement(self, method: QueryMethod) -> TextClause | TextualSelect:
+        """
+        Get a query as a reusable SQLAlchemy statement.
+
+        Args:
+            method: The query method enum value.
+
+        Returns:
+            TextClause | TextualSelect: The statement, with parameter and
+                result types applied.
+
+        Raises:
+            KeyError: If the dialect does not support the query.
+        """
+        statement = self._statements.get(method)
+        if statement is None:
+            statement = self._statements[method] = self._build(method)
+        return statement
+
+    def _build(self, method: QueryMethod) -> TextClause | TextualSelect:
+        sql = self._queries[method]
+        statement = text(sql)
+
+        typed = [
+            bindparam(name, type_=type_)
+            for name, type_ in PARAMETER_TYPES.items()
+            if re.search(rf"(?<![:\w]):{name}\b", sql)
+        ]
+        if typed:
+            statement = statement.bindparams(*typed)
+
+        if method in RESULT_TYPES:
+            return statement.columns(**RESULT_TYPES[method])
+        return statement
+
+
+@lru_cache(maxsize=None)
+def get_query_registry(dialect: str = DEFAULT_DIALECT) -> QueryRegistry:
+    """
+    Get the shared query registry of a dialect.
+
+    Args:
+        dialect: SQLAlchemy dialect name, e.g. ``connection.dialect.name``.
+
+    Returns:
+        QueryRegistry: The registry.
+    """
+    return QueryRegistry(dialect)
+
+
+def queries_for(connection: Connection) -> QueryRegistry:
+    """
+    Get the query registry matching a connection's dialect.
+
+    Args:
+        connection: The database connection.
+
+    Returns:
+        QueryRegistry: The registry.
+    """
+    return get_query_registry(connection.dialect.name)
+
+
+def get_query(method: QueryMethod, dialect: str = DEFAULT_DIALECT, **kwargs) -> str:
     """
     Get a SQL query by method.
 
     Args:
         method: The query method enum value.
+        dialect: SQLAlchemy dialect name; SQLite by default.
         **kwargs: Additional parameters for query substitution.
 
     Returns:
         str: The SQL query string.
     """
-    return SQL_QUERIES.get(method, "")
+    return get_query_registry(dialect).sql(method)
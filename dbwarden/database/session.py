@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Generator, Optional
+
+from sqlalchemy.engine import Connection
+
+from dbwarden.config import DbwardenConfig
+
+
+class MigrationSession:
+    """
+    Unit of work that reuses a single database connection.
+
+    While a session is active, every ``get_db_connection()`` call made by the
+    repositories is served from the session's connection instead of checking
+    out a new one, re-reading warden.toml and re-applying ``search_path``.
+    Each call still runs in its own transaction, so a failing migration only
+    rolls back its own statements.
+
+    Attributes:
+        connection: The connection shared by every call in the session.
+        config: The configuration the session was opened with.
+        reused_checkouts: Number of calls served from the shared connection.
+        execution_seqs: Hands out the execution sequence numbers of the
+            migrations recorded in the session, when sessions record
+            migrations concurrently; None to number them in the database.
+    """
+
+    def __init__(self, connection: Connection, config: DbwardenConfig):
+        self.connection = connection
+        self.config = config
+        self.reused_checkouts = 0
+        self.execution_seqs: Optional[Callable[[], int]] = None
+
+    @contextmanager
+    def transaction(self) -> Generator[Any, None, None]:
+        """
+        Run a unit of work on the shared connection.
+
+        Starts a transaction that commits when the block exits, or joins the
+        transaction that is already open on the connection.
+
+        Yields:
+            Connection: The shared connection.
+        """
+        self.reused_checkouts += 1
+
+        if self.connection.in_transaction():
+            yield self.connection
+            return
+
+        with self.connection.begin():
+            yield self.connection
+
+    @property
+    def checkouts_saved(self) -> int:
+        """Pool checkouts avoided compared to one connection per call."""
+        return max(self.reused_checkouts - 1, 0)
+
+    @property
+    def round_trips_saved(self) -> int:
+        """``SET search_path`` round trips avoided by the shared connection."""
+        return self.checkouts_saved if self.config.postgres_schema else 0
+
+    def summary(self) -> str:
+        """Describe the connection reuse for verbose output."""
+        return (
+            f"Session reused 1 connection for {self.reused_checkouts} calls: "
+            f"{self.checkouts_saved} connection checkouts and "
+            f"{self.round_trips_saved} search_path round trips saved"
+        )
+
+
+_active_session: ContextVar[Optional[MigrationSession]] = ContextVar(
+    "dbwarden_session", default=None
+)
+
+
+def get_active_session() -> Optional[MigrationSession]:
+    """Return the session active in the current context, if any."""
+    return _active_session.get()
+
+
+@contextmanager
+def bind_session(session: MigrationSession) -> Generator[MigrationSession, None, None]:
+    """
+    Make a session the active one for the duration of the block.
+
+    Args:
+        session: The session to activate.
+
+    Yields:
+        MigrationSession: The activated session.
+    """
+    token = _active_session.set(session)
+    try:
+        yield session
+    finally:
+        _active_session.reset(token)
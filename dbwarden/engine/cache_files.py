@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import threading
+from typing import Any
+
+
+def ensure_cache_dir(cache_dir: str) -> None:
+    """
+    Create a cache directory, kept out of version control.
+
+    Args:
+        cache_dir: Path to the directory, e.g. ``<migrations_dir>/.dbwarden_cache``.
+
+    Raises:
+        OSError: If the directory cannot be created.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    gitignore_path = os.path.join(cache_dir, ".gitignore")
+    if not os.path.exists(gitignore_path):
+        try:
+            with open(gitignore_path, "x") as f:
+                f.write("*\n")
+        except FileExistsError:
+            pass
+
+
+def temporary_path(path: str, suffix: str = ".tmp") -> str:
+    """
+    Path of a work file next to ``path``, private to this thread.
+
+    Threads of one process, e.g. ``migrate --all-targets`` workers sharing a
+    migrations directory, write the same caches, so the name includes the
+    thread as well as the process.
+    """
+    return f"{path}.{os.getpid()}.{threading.get_ident()}{suffix}"
+
+
+def write_json_atomic(path: str, data: Any, **dump_kwargs: Any) -> bool:
+    """
+    Write a JSON cache file atomically; failures are ignored.
+
+    The data is written to a temporary file that replaces ``path``, so
+    readers see the old file or the new one, never a partial write. The
+    cache directory is created if needed.
+
+    Args:
+        path: Path of the cache file.
+        data: JSON-serialisable data.
+        **dump_kwargs: Extra arguments for ``json.dump``, e.g. ``default``.
+
+    Returns:
+        bool: Whether the file was written.
+    """
+    dump_kwargs.setdefault("separators", (",", ":"))
+    tmp_path = temporary_path(path)
+    try:
+        ensure_cache_dir(os.path.dirname(path))
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, TypeError, ValueError):
+        _remove_quietly(tmp_path)
+        return False
+
+
+def copy_file_atomic(source: str, path: str) -> bool:
+    """
+    Copy a file over a cache file atomically; failures are ignored.
+
+    Args:
+        source: File to copy.
+        path: Path of the cache file.
+
+    Returns:
+        bool: Whether the file was copied.
+    """
+    tmp_path = temporary_path(path)
+    try:
+        ensure_cache_dir(os.path.dirname(path))
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        _remove_quietly(tmp_path)
+        return False
+
+
+def _remove_quietly(path: str) -> None:
+    """Remove a leftover temporary file, if there is one."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,8 +1,68 @@
 import hashlib
-from typing import List
+from typing import Iterable, Iterator
 
+FILE_HASH_BUFFER_SIZE = 256 * 1024
 
-def calculate_checksum(sql_statements: list[str]) -> str:
+
+class StatementHasher:
+    """
+    Incremental SHA256 checksum of SQL statements.
+
+    Feeding statements one at a time gives the same digest as
+    ``calculate_checksum`` on the full list, without building the joined
+    string or its encoded copy. Each hasher is independent, so parallel
+    workers can use one each; hashlib releases the GIL while hashing large
+    inputs.
+
+    Attributes:
+        count: Number of statements fed so far.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.count = 0
+
+    def update(self, statement: str) -> None:
+        """
+        Feed the next statement.
+
+        Args:
+            statement: SQL statement.
+        """
+        if self.count:
+            self._hash.update(b";")
+        self._hash.update(statement.encode())
+        self.count += 1
+
+    def update_bytes(self, data: bytes | memoryview) -> None:
+        """
+        Feed raw bytes as they are, without statement separators.
+
+        Args:
+            data: Bytes to hash.
+        """
+        self._hash.update(data)
+
+    def consume(self, statements: Iterable[str]) -> Iterator[str]:
+        """
+        Hash statements while passing them through.
+
+        Args:
+            statements: SQL statements, typically a generator.
+
+        Yields:
+            str: The same statements, after they have been hashed.
+        """
+        for statement in statements:
+            self.update(statement)
+            yield statement
+
+    def hexdigest(self) -> str:
+        """Return the checksum of everything fed so far."""
+        return self._hash.hexdigest()
+
+
+def calculate_checksum(sql_statements: Iterable[str]) -> str:
     """
     Calculate SHA256 checksum of SQL statements.
 
@@ -12,5 +72,32 @@ def calculate_checksum(sql_statements: list[str]) -> str:
     Returns:
         str: SHA256 checksum of the statements.
     """
-    content = ";".join(sql_statements)
-    return hashlib.sha256(content.encode()).hexdigest()
+    hasher = StatementHasher()
+    for statement in sql_statements:
+        hasher.update(statement)
+    return hasher.hexdigest()
+
+
+def calculate_file_checksum(file_path: str) -> str:
+    """
+    Calculate SHA256 checksum of the raw bytes of a file.
+
+    The file is hashed straight from its buffer instead of being read into
+    memory as a whole.
+
+    Args:
+        file_path: Path to the file.
+
+    Returns:
+        str: SHA256 checksum of the file content.
+    """
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        file_hash = hashlib.sha256()
+        buffer = bytearray(FILE_HASH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while size := f.readinto(buffer):
+            file_hash.update(view[:size])
+        return file_hash.hexdigest()
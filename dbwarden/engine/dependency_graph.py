@@ -0,0 +1,195 @@
+import heapq
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+from dbwarden.exceptions import MigrationDependencyError
+
+
+class MigrationGraph:
+    """
+    Dependency graph of migration versions.
+
+    Edges point from a migration to the migrations declaring it in
+    ``depends_on``. Ordering is a Kahn topological sort over a heap, so
+    among the migrations whose dependencies are met the lowest version
+    always runs first, and the sort is linear in the number of migrations
+    and dependencies (times a log factor for the heap).
+    """
+
+    def __init__(self):
+        self._dependencies: dict[str, list[str]] = {}
+        self._dependents: dict[str, list[str]] = {}
+
+    def add(self, version: str, depends_on: Iterable[str] = ()) -> None:
+        """
+        Add a migration and the versions it depends on.
+
+        Args:
+            version: Migration version.
+            depends_on: Versions that must be applied first.
+        """
+        self._dependencies[version] = list(dict.fromkeys(depends_on))
+        self._dependents.setdefault(version, [])
+
+    def __contains__(self, version: object) -> bool:
+        return version in self._dependencies
+
+    def __len__(self) -> int:
+        return len(self._dependencies)
+
+    @property
+    def versions(self) -> list[str]:
+        """All versions in the graph, in insertion order."""
+        return list(self._dependencies)
+
+    def dependencies(self, version: str) -> list[str]:
+        """Versions the given migration depends on."""
+        return self._dependencies[version]
+
+    def dependents(self, version: str) -> list[str]:
+        """Versions in the graph that depend on the given migration."""
+        return self._dependents[version]
+
+    def topological_order(self, satisfied: Iterable[str] = ()) -> list[str]:
+        """
+        Order the migrations so that every one runs after its dependencies.
+
+        Args:
+            satisfied: Versions outside the graph that are already applied.
+
+        Returns:
+            list[str]: Versions in execution order.
+
+        Raises:
+            MigrationDependencyError: If a dependency is neither in the graph
+                nor satisfied, or the dependencies form a cycle.
+        """
+        self._link(set(satisfied))
+        indegree, ready = self._initial_state()
+
+        order: list[str] = []
+        while ready:
+            version = heapq.heappop(ready)
+            order.append(version)
+            for dependent in self._dependents[version]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+
+        if len(order) < len(self._dependencies):
+            blocked = {version for version, degree in indegree.items() if degree}
+            cycle = self._find_cycle(blocked)
+            raise MigrationDependencyError(
+                f"Circular migration dependency: {' -> '.join(cycle)}",
+                cycle=cycle,
+            )
+
+        return order
+
+    def run_parallel(
+        self,
+        execute: Callable[[str], None],
+        jobs: int,
+        satisfied: Iterable[str] = (),
+    ) -> list[str]:
+        """
+        Execute the migrations on a thread pool, respecting dependencies.
+
+        A migration is submitted as soon as all of its dependencies have
+        completed, lowest version first. After the first failure no new
+        migrations are submitted; the ones already running are allowed to
+        finish and the failure is then re-raised.
+
+        Args:
+            execute: Called with a version to apply that migration.
+            jobs: Maximum number of migrations running at once.
+            satisfied: Versions outside the graph that are already applied.
+
+        Returns:
+            list[str]: Versions in the order they completed.
+
+        Raises:
+            MigrationDependencyError: If the graph cannot be ordered; raised
+                before anything is executed.
+        """
+        self.topological_order(satisfied)
+        indegree, ready = self._initial_state()
+
+        completed: list[str] = []
+        running: dict[Future, str] = {}
+        failure: BaseException | None = None
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while running or (ready and failure is None):
+                while ready and failure is None and len(running) < jobs:
+                    version = heapq.heappop(ready)
+                    running[pool.submit(execute, version)] = version
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=running.__getitem__):
+                    version = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        failure = failure or error
+                        continue
+
+                    completed.append(version)
+                    for dependent in self._dependents[version]:
+                        indegree[dependent] -= 1
+                        if indegree[dependent] == 0:
+                            heapq.heappush(ready, dependent)
+
+        if failure is not None:
+            raise failure
+        return completed
+
+    def _initial_state(self) -> tuple[dict[str, int], list[str]]:
+        """Count unmet in-graph dependencies and heap the migrations with none."""
+        indegree = {
+            version: sum(1 for d in deps if d in self._dependencies)
+            for version, deps in self._dependencies.items()
+        }
+        ready = [version for version, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        return indegree, ready
+
+    def _link(self, satisfied: set[str]) -> None:
+        """Rebuild dependent edges and reject dependencies that cannot be met."""
+        missing: dict[str, list[str]] = {}
+        for dependents in self._dependents.values():
+            dependents.clear()
+
+        for version, deps in self._dependencies.items():
+            for dependency in deps:
+                if dependency in self._dependencies:
+                    self._dependents[dependency].append(version)
+                elif dependency not in satisfied:
+                    missing.setdefault(version, []).append(dependency)
+
+        if missing:
+            details = ", ".join(
+                f"{version} (needs {', '.join(deps)})"
+                for version, deps in sorted(missing.items())
+            )
+            raise MigrationDependencyError(
+                f"Cannot resolve migration dependencies. Missing dependencies for: {details}",
+                missing=missing,
+            )
+
+    def _find_cycle(self, blocked: set[str]) -> list[str]:
+        """
+        Find a cycle among blocked versions.
+
+        Every blocked version has a blocked dependency, so following them
+        from any blocked version must eventually revisit one.
+        """
+        position: dict[str, int] = {}
+        path: list[str] = []
+        version = min(blocked)
+
+        while version not in position:
+            position[version] = len(path)
+            path.append(version)
+            version = min(d for d in self._dependencies[version] if d in blocked)
+
+        return path[position[version] :] + [version]
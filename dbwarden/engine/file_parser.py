@@ -1,6 +1,18 @@
+import codecs
+import io
+import json
+import mmap
 import os
 import re
-from typing import Optional
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+from dbwarden.engine.checksum import calculate_checksum
+from dbwarden.engine.sql_splitter import (
+    ROLLBACK_MARKER,
+    UPGRADE_MARKER,
+    StatementSplitter,
+)
 
 
 class MigrationMetadata:
@@ -11,10 +23,12 @@ class MigrationMetadata:
         depends_on: Optional[list[str]] = None,
         is_seed: bool = False,
         description: Optional[str] = None,
+        delimiter: Optional[str] = None,
     ):
         self.depends_on = depends_on or []
         self.is_seed = is_seed
         self.description = description
+        self.delimiter = delimiter
 
 
 def get_description_from_filename(filename: str) -> str:
@@ -37,14 +51,157 @@ def get_description_from_filename(filename: str) -> str:
     return name.replace("_", " ").strip()
 
 
-def parse_migration_header(file_path: str) -> MigrationMetadata:
+SEED_PATTERN = re.compile(r"^--\s*seed\s*$", re.IGNORECASE)
+DEPENDS_ON_PATTERN = re.compile(r"^--\s*depends_on:\s*(.+)$", re.IGNORECASE)
+DESCRIPTION_PATTERN = re.compile(r"^--\s*description:\s*(.+)$", re.IGNORECASE)
+DELIMITER_PATTERN = re.compile(r"^--\s*delimiter:\s*(\S+)\s*$", re.IGNORECASE)
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ParsedMigration:
     """
-    Parse metadata from a migration file header.
+    Everything parsed from a migration file in a single read.
+
+    Attributes:
+        filepath: Path to the migration file.
+        metadata: Header metadata (depends_on, seed flag, description).
+        upgrade_statements: SQL statements of the upgrade section.
+        rollback_statements: SQL statements of the rollback section.
+        checksum: Checksum of the upgrade statements.
+    """
+
+    filepath: str
+    metadata: MigrationMetadata
+    upgrade_statements: list[str]
+    rollback_statements: list[str]
+    checksum: str
+
+
+def parse_migration_file(file_path: str) -> ParsedMigration:
+    """
+    Parse a migration file in a single read.
+
+    Args:
+        file_path: Path to the migration SQL file.
+
+    Returns:
+        ParsedMigration: Header metadata, upgrade and rollback statements and
+            the upgrade checksum.
+    """
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    return parse_migration_content(content, file_path)
+
+
+def parse_migration_bytes(data: bytes, file_path: str = "") -> ParsedMigration:
+    """
+    Parse the raw bytes of a migration file.
+
+    The bytes are decoded as UTF-8 with universal newlines, as the file is
+    read in text mode.
+
+    Args:
+        data: Full content of the migration file.
+        file_path: Path the content was read from.
+
+    Returns:
+        ParsedMigration: The parsed migration.
+    """
+    content = _newline_decoder().decode(data, final=True)
+    return parse_migration_content(content, file_path)
+
+
+def parse_migration_content(content: str, file_path: str = "") -> ParsedMigration:
+    """
+    Parse the content of a migration file in a single pass.
+
+    Header lines are read until the first section marker; statements are
+    split by ``StatementSplitter`` and assigned to the section of the last
+    marker seen.
+
+    Args:
+        content: Full content of the migration file.
+        file_path: Path the content was read from.
+
+    Returns:
+        ParsedMigration: The parsed migration.
+    """
+    metadata = MigrationMetadata()
+    sections: dict[str, list[str]] = {UPGRADE_MARKER: [], ROLLBACK_MARKER: []}
+
+    splitter = StatementSplitter()
+    splitter.on_header_line = _header_parser(metadata, splitter)
+
+    for section, statement in splitter.feed(content):
+        sections[section].append(statement)
+    for section, statement in splitter.close():
+        sections[section].append(statement)
+
+    upgrade_statements = sections[UPGRADE_MARKER]
+    return ParsedMigration(
+        filepath=file_path,
+        metadata=metadata,
+        upgrade_statements=upgrade_statements,
+        rollback_statements=sections[ROLLBACK_MARKER],
+        checksum=calculate_checksum(upgrade_statements),
+    )
+
+
+def _header_parser(
+    metadata: MigrationMetadata, splitter: StatementSplitter
+) -> Callable[[str], None]:
+    """Build a header line callback that fills ``metadata``."""
+
+    def on_header_line(stripped: str) -> None:
+        _parse_header_line(stripped, metadata)
+        if metadata.delimiter:
+            splitter.set_delimiter(metadata.delimiter)
+
+    return on_header_line
+
+
+def _parse_header_line(stripped: str, metadata: MigrationMetadata) -> None:
+    """
+    Apply a single header line to the metadata.
 
     Supports:
-    - depends_on: ["0001", "0002"]
     - -- seed
     - -- depends_on: ["0001", "0002"]
+    - -- description: Free text
+    - -- delimiter: $$
+    """
+    if SEED_PATTERN.match(stripped):
+        metadata.is_seed = True
+        return
+
+    depends_match = DEPENDS_ON_PATTERN.match(stripped)
+    if depends_match:
+        try:
+            deps = json.loads(depends_match.group(1))
+            if isinstance(deps, list):
+                metadata.depends_on = [str(d) for d in deps]
+        except (json.JSONDecodeError, TypeError):
+            pass
+        return
+
+    desc_match = DESCRIPTION_PATTERN.match(stripped)
+    if desc_match:
+        metadata.description = desc_match.group(1).strip()
+        return
+
+    delimiter_match = DELIMITER_PATTERN.match(stripped)
+    if delimiter_match:
+        metadata.delimiter = delimiter_match.group(1)
+
+
+def parse_migration_header(file_path: str) -> MigrationMetadata:
+    """
+    Parse metadata from a migration file header.
+
+    Only the lines before the first section marker are read.
 
     Args:
         file_path: Path to the migration SQL file.
@@ -52,40 +209,83 @@ def parse_migration_header(file_path: str) -> MigrationMetadata:
     Returns:
         MigrationMetadata: Parsed metadata from the header.
     """
-    with open(file_path, "r") as f:
-        lines = f.readlines()
+    with open(file_path, "rb") as f:
+        metadata, _ = read_migration_header(f)
+    return metadata
 
-    metadata = MigrationMetadata()
 
-    for line in lines:
-        stripped = line.strip()
+def read_migration_header(f: BinaryIO) -> tuple[MigrationMetadata, bytes]:
+    """
+    Read the header of a migration file opened in binary mode.
+
+    Lines are read up to and including the first section marker, leaving
+    the file positioned after it.
 
-        if stripped == "-- upgrade" or stripped == "-- rollback":
+    Args:
+        f: Migration file opened in binary mode.
+
+    Returns:
+        tuple[MigrationMetadata, bytes]: Parsed metadata and the bytes read.
+    """
+    metadata = MigrationMetadata()
+    lines: list[bytes] = []
+    for line in f:
+        lines.append(line)
+        stripped = line.decode("utf-8").strip()
+        if stripped == UPGRADE_MARKER or stripped == ROLLBACK_MARKER:
             break
+        _parse_header_line(stripped, metadata)
+    return metadata, b"".join(lines)
 
-        seed_match = re.match(r"^--\s*seed\s*$", stripped, re.IGNORECASE)
-        if seed_match:
-            metadata.is_seed = True
-            continue
 
-        depends_match = re.match(r"^--\s*depends_on:\s*(.+)$", stripped, re.IGNORECASE)
-        if depends_match:
-            try:
-                import json
+def calculate_legacy_checksum(file_path: str) -> str:
+    """
+    Calculate the upgrade checksum as it was before ``StatementSplitter``.
 
-                deps = json.loads(depends_match.group(1))
-                if isinstance(deps, list):
-                    metadata.depends_on = [str(d) for d in deps]
-            except (json.JSONDecodeError, TypeError):
-                pass
-            continue
+    Earlier versions split the upgrade section at blank lines only and kept
+    each statement's trailing delimiter, so the checksums they recorded for
+    runs-on-change migrations differ from ``ParsedMigration.checksum``.
+    Comparing a stored checksum with this one tells an unchanged file from a
+    changed one, so upgrading does not run those migrations again.
 
-        desc_match = re.match(r"^--\s*description:\s*(.+)$", stripped, re.IGNORECASE)
-        if desc_match:
-            metadata.description = desc_match.group(1).strip()
+    Args:
+        file_path: Path to the migration SQL file.
+
+    Returns:
+        str: Checksum of the upgrade statements, split the old way.
+    """
+    with open(file_path, "r") as f:
+        lines = f.read().split("\n")
+
+    statements: list[str] = []
+    current: list[str] = []
+    in_section = False
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped == UPGRADE_MARKER:
+            in_section = True
+            continue
+        if stripped == ROLLBACK_MARKER and in_section:
+            in_section = False
+        elif not in_section:
+            continue
+        elif stripped and not stripped.startswith("--"):
+            current.append(line)
+            continue
+        elif stripped:
             continue
 
-    return metadata
+        statement = "\n".join(current).strip()
+        if statement:
+            statements.append(statement)
+        current = []
+
+    statement = "\n".join(current).strip()
+    if statement:
+        statements.append(statement)
+
+    return calculate_checksum(statements)
 
 
 def parse_upgrade_statements(file_path: str) -> list[str]:
@@ -98,10 +298,7 @@ def parse_upgrade_statements(file_path: str) -> list[str]:
     Returns:
         list[str]: List of SQL statements for upgrade.
     """
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    return _extract_section_statements(content, "-- upgrade")
+    return parse_migration_file(file_path).upgrade_statements
 
 
 def parse_rollback_statements(file_path: str) -> list[str]:
@@ -114,56 +311,112 @@ def parse_rollback_statements(file_path: str) -> list[str]:
     Returns:
         list[str]: List of SQL statements for rollback.
     """
-    with open(file_path, "r") as f:
-        content = f.read()
+    return parse_migration_file(file_path).rollback_statements
+
+
+def iter_migration_statements(
+    file_path: str,
+    use_mmap: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[tuple[str, str]]:
+    """
+    Stream the statements of a migration file.
 
-    return _extract_section_statements(content, "-- rollback")
+    The file is fed to ``StatementSplitter`` in chunks, so memory use is
+    bounded by the chunk size and the largest statement rather than by the
+    size of the file.
+
+    Args:
+        file_path: Path to the migration SQL file.
+        use_mmap: Read the file through a memory map instead of buffered reads.
+        chunk_size: Number of bytes or characters read at a time.
+
+    Yields:
+        tuple[str, str]: (section marker, statement) in file order.
+    """
+    yield from _split_chunks(_read_chunks(file_path, use_mmap, chunk_size))
 
 
-def _extract_section_statements(content: str, section_marker: str) -> list[str]:
+def iter_byte_statements(chunks: Iterable[bytes]) -> Iterator[tuple[str, str]]:
     """
-    Extract SQL statements from a section of a migration file.
+    Stream the statements of migration file content read in binary chunks.
+
+    Chunks are decoded as UTF-8 with universal newlines, so the caller can
+    hash the raw bytes in the same read.
 
     Args:
-        content: Full content of the migration file.
-        section_marker: Marker indicating the section start (e.g., "-- upgrade").
+        chunks: Consecutive chunks of the file, starting at its beginning.
 
-    Returns:
-        list[str]: List of SQL statements.
+    Yields:
+        tuple[str, str]: (section marker, statement) in file order.
     """
-    lines = content.split("\n")
-    statements: list[str] = []
-    current_statement: list[str] = []
-    in_section = False
+    yield from _split_chunks(_decode_chunks(chunks))
 
-    for line in lines:
-        stripped = line.strip()
 
-        if stripped == section_marker:
-            in_section = True
-            continue
+def iter_upgrade_statements(
+    file_path: str,
+    use_mmap: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Stream the upgrade statements of a migration file.
 
-        if stripped == "-- rollback" and in_section:
-            if current_statement:
-                statement = "\n".join(current_statement).strip()
-                if statement:
-                    statements.append(statement)
-                current_statement = []
-            in_section = False
-            continue
+    Args:
+        file_path: Path to the migration SQL file.
+        use_mmap: Read the file through a memory map instead of buffered reads.
+        chunk_size: Number of bytes or characters read at a time.
+
+    Yields:
+        str: Upgrade statements in file order.
+    """
+    for section, statement in iter_migration_statements(
+        file_path, use_mmap, chunk_size
+    ):
+        if section == UPGRADE_MARKER:
+            yield statement
+
+
+def _read_chunks(file_path: str, use_mmap: bool, chunk_size: int) -> Iterator[str]:
+    """Read a file as text chunks with universal newlines."""
+    if not use_mmap:
+        with open(file_path, "r") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+        return
+
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _decode_chunks(
+                mapped[offset : offset + chunk_size]
+                for offset in range(0, size, chunk_size)
+            )
+
+
+def _split_chunks(chunks: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Split text chunks into statements, parsing the header on the way."""
+    metadata = MigrationMetadata()
+    splitter = StatementSplitter()
+    splitter.on_header_line = _header_parser(metadata, splitter)
+
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def _newline_decoder() -> io.IncrementalNewlineDecoder:
+    """Incremental UTF-8 decoder translating newlines like text mode."""
+    return io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder("utf-8")(), translate=True
+    )
 
-        if in_section:
-            if stripped and not stripped.startswith("--"):
-                current_statement.append(line)
-            elif current_statement and not stripped:
-                statement = "\n".join(current_statement).strip()
-                if statement:
-                    statements.append(statement)
-                current_statement = []
-
-    if current_statement:
-        statement = "\n".join(current_statement).strip()
-        if statement:
-            statements.append(statement)
 
-    return statements
+def _decode_chunks(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode binary chunks with universal newlines."""
+    decoder = _newline_decoder()
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+from dbwarden.constants import CACHE_DIR, DBWARDEN_VERSION
+from dbwarden.engine.cache_files import write_json_atomic
+from dbwarden.engine.checksum import calculate_file_checksum
+from dbwarden.engine.version import (
+    MIGRATION_PATTERN,
+    RUNS_ALWAYS_PATTERN,
+    RUNS_ON_CHANGE_PATTERN,
+)
+
+FINGERPRINT_FILE = "fingerprint.json"
+
+
+def get_migrations_fingerprint(directory: str) -> str | None:
+    """
+    Get a fingerprint of the migrations in a directory.
+
+    The fingerprint is a SHA256 over the name and content checksum of every
+    versioned and runs-on-change migration, and the DBWarden version. It is
+    kept in ``<migrations_dir>/.dbwarden_cache`` together with the mtime and
+    size of the files, so when no file changed it is computed from a single
+    directory scan without reading any migration.
+
+    Args:
+        directory: Path to migrations directory.
+
+    Returns:
+        str | None: Hex digest, or None if the directory contains
+            runs-always migrations, which must run on every migrate.
+    """
+    files: list[tuple[str, int, int]] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if RUNS_ALWAYS_PATTERN.match(entry.name):
+                return None
+            if MIGRATION_PATTERN.match(entry.name) or RUNS_ON_CHANGE_PATTERN.match(
+                entry.name
+            ):
+                stat = entry.stat()
+                files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    files.sort()
+
+    stat_key = hashlib.sha256(json.dumps(files).encode()).hexdigest()
+    cache_path = os.path.join(directory, CACHE_DIR, FINGERPRINT_FILE)
+
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        if data.get("stat_key") == stat_key:
+            return data["fingerprint"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    digest = hashlib.sha256(DBWARDEN_VERSION.encode())
+    for filename, _, _ in files:
+        checksum = calculate_file_checksum(os.path.join(directory, filename))
+        digest.update(f"\n{filename}:{checksum}".encode())
+    fingerprint = digest.hexdigest()
+
+    write_json_atomic(cache_path, {"stat_key": stat_key, "fingerprint": fingerprint})
+    return fingerprint
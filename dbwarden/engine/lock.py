@@ -1,58 +1,509 @@
-import os
+import asyncio
+import random
+import threading
 import time
-from contextlib import contextmanager
-from typing import Optional
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Generator, TypeVar
 
-from dbwarden.config import get_config
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from dbwarden.config import DbwardenConfig
+from dbwarden.constants import (
+    LOCK_HEARTBEAT_INTERVAL,
+    LOCK_INITIAL_BACKOFF,
+    LOCK_MAX_BACKOFF,
+    LOCK_TIMEOUT,
+)
+from dbwarden.database.connection import (
+    get_async_db_session,
+    get_db_connection,
+    get_db_session,
+    run_in_session,
+)
 from dbwarden.exceptions import LockError
 from dbwarden.logging import get_logger
 from dbwarden.repositories.lock_repo import (
-    acquire_lock,
+    LockBackend,
     check_lock,
-    release_lock,
+    create_lock_table_if_not_exists,
+    get_lock_backend,
 )
 
+T = TypeVar("T")
+
+
+@dataclass
+class LockWaitStats:
+    """
+    How long it took to acquire the migration lock.
+
+    Attributes:
+        backend: Name of the lock backend that was used.
+        attempts: Number of acquisition attempts.
+        waited: Seconds spent waiting before the lock was acquired.
+        holder: Identity the lock is held under.
+        taken_over_from: Holder of the expired lease that was taken over.
+    """
+
+    backend: str
+    attempts: int
+    waited: float
+    holder: str | None = None
+    taken_over_from: str | None = None
+
+
+class _LeaseRenewal:
+    """
+    Bookkeeping shared by the lease heartbeats.
+
+    Attributes:
+        renewals: Number of successful renewals.
+        lost: Whether the lease was lost while it was being renewed.
+    """
+
+    def __init__(self, backend: LockBackend, config: DbwardenConfig, interval: float):
+        self.backend = backend
+        self.config = config
+        self.interval = interval
+        self.renewals = 0
+        self.lost = False
+
+    def _renewed(self, renewed: bool) -> float | None:
+        """
+        Record the outcome of a renewal.
+
+        Args:
+            renewed: Whether the lease was still held and was extended.
+
+        Returns:
+            float | None: Seconds until the next renewal, or None if the
+                lease was lost and the heartbeat must stop.
+        """
+        if not renewed:
+            self.lost = True
+            get_logger().error(
+                "Migration lock lease expired and was taken over by another process"
+            )
+            return None
+
+        self.renewals += 1
+        return self.interval
+
+    def _renewal_failed(self, error: DBAPIError) -> float:
+        """Record a failed renewal; returns the seconds until the retry."""
+        get_logger().warning(f"Could not renew migration lock lease: {error}")
+        return min(self.interval, 1.0)
+
+    def check(self) -> None:
+        """
+        Make sure the lease is still held before the next migration.
+
+        Raises:
+            LockError: If the lease was lost, so another process may be
+                migrating the database.
+        """
+        self._raise_if_lost()
+
+    def _raise_if_lost(self) -> None:
+        if self.lost:
+            raise LockError(
+                "Migration lock lease expired and was taken over by another "
+                "process; stopped before running further migrations."
+            )
+
+
+class SessionLeaseRenewal(_LeaseRenewal):
+    """
+    Lease renewed on the session connection between migrations.
+
+    Used on SQLite, where a heartbeat on a second connection cannot get the
+    write lock while a migration is running, so a migration longer than the
+    lease would lose it. ``check()`` renews the lease when ``interval``
+    seconds passed since the last renewal; a migration cannot be taken over
+    while it runs, since the takeover needs the same write lock.
+
+    Attributes:
+        renewals: Number of successful renewals.
+        lost: Whether the lease was lost while it was being renewed.
+    """
+
+    def __init__(
+        self,
+        backend: LockBackend,
+        config: DbwardenConfig,
+        interval: float = LOCK_HEARTBEAT_INTERVAL,
+    ):
+        super().__init__(backend, config, interval)
+        self._renewed_at = time.monotonic()
+
+    def check(self) -> None:
+        """Renew the lease if it is due, then make sure it is still held."""
+        if not self.lost and time.monotonic() - self._renewed_at >= self.interval:
+            try:
+                renewed = _with_connection(self.backend.renew)
+            except DBAPIError as e:
+                self._renewal_failed(e)
+            else:
+                if self._renewed(renewed) is not None:
+                    self._renewed_at = time.monotonic()
+
+        self._raise_if_lost()
+
+
+class LeaseHeartbeat(_LeaseRenewal):
+    """
+    Background thread that keeps a lock lease from expiring.
+
+    The lease is renewed every ``interval`` seconds on a connection of its
+    own, since the migration is using the session connection. A failed
+    renewal is retried after a second; if the lease turns out to have been
+    taken over, the heartbeat stops and sets ``lost``.
+
+    Attributes:
+        renewals: Number of successful renewals.
+        lost: Whether the lease was lost while it was being renewed.
+    """
+
+    def __init__(
+        self,
+        backend: LockBackend,
+        config: DbwardenConfig,
+        interval: float = LOCK_HEARTBEAT_INTERVAL,
+    ):
+        super().__init__(backend, config, interval)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="dbwarden-lock-heartbeat", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start renewing the lease."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop renewing the lease and wait for the thread to exit."""
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        delay = self.interval
+
+        with get_db_session(config=self.config):
+            while not self._stopped.wait(delay):
+                try:
+                    renewed = _with_connection(self.backend.renew)
+                except DBAPIError as e:
+                    delay = self._renewal_failed(e)
+                    continue
+
+                delay = self._renewed(renewed)
+                if delay is None:
+                    return
+
+
+class AsyncLeaseHeartbeat(_LeaseRenewal):
+    """
+    ``LeaseHeartbeat`` running as an asyncio task instead of a thread.
+
+    The lease is renewed on a connection of its own from the asyncio
+    engine, so the event loop is never blocked.
+
+    Attributes:
+        renewals: Number of successful renewals.
+        lost: Whether the lease was lost while it was being renewed.
+    """
+
+    def __init__(
+        self,
+        backend: LockBackend,
+        config: DbwardenConfig,
+        interval: float = LOCK_HEARTBEAT_INTERVAL,
+    ):
+        super().__init__(backend, config, interval)
+        self._stopped = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start renewing the lease."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop renewing the lease and wait for the task to exit."""
+        self._stopped.set()
+        if self._task is not None:
+            await self._task
+
+    async def _run(self) -> None:
+        delay = self.interval
+
+        async with get_async_db_session(self.config) as connection:
+            while True:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+
+                try:
+                    renewed = await run_in_session(
+                        connection, self.config, _with_connection, self.backend.renew
+                    )
+                except DBAPIError as e:
+                    delay = self._renewal_failed(e)
+                    continue
+
+                delay = self._renewed(renewed)
+                if delay is None:
+                    return
+
+
+# Lease of the migration lock held in the current context.
+_active_lease: ContextVar[_LeaseRenewal | None] = ContextVar(
+    "dbwarden_lease", default=None
+)
+
+
+class _AcquireSchedule:
+    """
+    Retry schedule for taking the migration lock.
+
+    Failed attempts are retried after an exponential backoff with jitter,
+    so many processes starting at once neither spin nor wake up in
+    lockstep, until the timeout runs out.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.start = time.monotonic()
+        self.attempts = 0
+        self._backoff = LOCK_INITIAL_BACKOFF
+
+    def retry_delay(self) -> float:
+        """
+        Count a failed attempt and get the wait before the next one.
+
+        Returns:
+            float: Seconds to wait.
+
+        Raises:
+            LockError: If the timeout has run out.
+        """
+        self.attempts += 1
+        remaining = self.timeout - (time.monotonic() - self.start)
+        if remaining <= 0:
+            raise LockError(
+                f"Could not acquire migration lock within {self.timeout:g} seconds "
+                f"after {self.attempts} attempts. Another migration process may be "
+                "running; use 'dbwarden unlock' if it is not."
+            )
+
+        delay = min(random.uniform(self._backoff / 2, self._backoff), remaining)
+        self._backoff = min(self._backoff * 2, LOCK_MAX_BACKOFF)
+        return delay
+
+    def acquired(self, backend: LockBackend) -> LockWaitStats:
+        """
+        Count the successful attempt and log the acquisition.
+
+        Args:
+            backend: Backend the lock was taken with.
+
+        Returns:
+            LockWaitStats: Wait metrics for the acquisition.
+        """
+        self.attempts += 1
+        stats = LockWaitStats(
+            backend=backend.name,
+            attempts=self.attempts,
+            waited=time.monotonic() - self.start,
+            holder=backend.holder,
+            taken_over_from=backend.taken_over_from,
+        )
+
+        logger = get_logger()
+        if stats.taken_over_from:
+            logger.warning(
+                f"Took over expired migration lock lease from {stats.taken_over_from}"
+            )
+        logger.info(
+            f"Migration lock acquired ({stats.backend}) by {stats.holder} after "
+            f"{stats.waited:.2f}s and {stats.attempts} attempt(s)"
+        )
+        return stats
+
 
 @contextmanager
-def migration_lock(timeout: int = 300):
+def migration_lock(
+    timeout: float = LOCK_TIMEOUT,
+) -> Generator[LockWaitStats, None, None]:
     """
     Context manager that provides migration locking.
 
-    Ensures only one migration process can run at a time.
+    Ensures only one migration process can run at a time. The lock is taken
+    atomically by the backend suited to the database (see
+    ``get_lock_backend``) on the connection of the current session, which
+    is held until the lock is released. While another process holds the
+    lock, attempts are retried with exponential backoff and jitter, so many
+    processes starting at once neither spin nor wake up in lockstep.
+
+    Lock rows are leases: a ``LeaseHeartbeat`` renews the lease while the
+    block runs, or ``SessionLeaseRenewal`` between migrations on SQLite,
+    and a lease left behind by a crashed process is taken over once it
+    expires. Migrations call ``check_migration_lease()`` before running,
+    and the block fails if the lease was lost.
 
     Args:
         timeout: Maximum time to wait for lock (default: 300 seconds).
 
+    Yields:
+        LockWaitStats: Wait metrics for the acquisition.
+
     Raises:
-        LockError: If lock cannot be acquired within timeout.
+        LockError: If lock cannot be acquired within timeout, or the lease
+            was lost while the block ran.
     """
-    logger = get_logger()
-    config = get_config()
+    with get_db_session() as session:
+        create_lock_table_if_not_exists()
+        backend = _with_connection(get_lock_backend)
 
-    if not check_lock():
-        raise LockError(
-            "Migration lock is already held. Another migration process may be running. "
-            "Use 'dbwarden unlock' to release the lock if necessary."
-        )
+        schedule = _AcquireSchedule(timeout)
+        while not _with_connection(backend.try_acquire):
+            time.sleep(schedule.retry_delay())
+        stats = schedule.acquired(backend)
 
-    wait_time = 0
-    while wait_time < timeout:
-        if acquire_lock():
-            logger.info("Migration lock acquired")
-            try:
-                yield
-            finally:
-                release_lock()
-                logger.info("Migration lock released")
-            return
+        heartbeat = None
+        lease = None
+        if backend.renews_lease:
+            if session.connection.dialect.name == "sqlite":
+                lease = SessionLeaseRenewal(backend, session.config)
+            else:
+                lease = heartbeat = LeaseHeartbeat(backend, session.config)
+                heartbeat.start()
+
+        token = _active_lease.set(lease)
+        try:
+            yield stats
+        finally:
+            _active_lease.reset(token)
+            if heartbeat is not None:
+                heartbeat.stop()
+            released = _with_connection(backend.release)
+            _log_release(released)
+
+        _check_released(lease, released)
+
+
+@asynccontextmanager
+async def async_migration_lock(
+    connection: AsyncConnection,
+    config: DbwardenConfig,
+    timeout: float = LOCK_TIMEOUT,
+) -> AsyncGenerator[LockWaitStats, None]:
+    """
+    Asyncio counterpart of ``migration_lock()``.
+
+    The lock is taken on ``connection`` with the same backends, and the
+    backoff between attempts and the lease heartbeat are awaited, so a
+    service waiting for the lock keeps serving requests.
+
+    Args:
+        connection: Connection from ``get_async_db_session()``; the lock is
+            held on it until the block exits.
+        config: Configuration the connection was opened with.
+        timeout: Maximum time to wait for lock (default: 300 seconds).
+
+    Yields:
+        LockWaitStats: Wait metrics for the acquisition.
+
+    Raises:
+        LockError: If lock cannot be acquired within timeout, or the lease
+            was lost while the block ran.
+    """
+
+    async def run(function: Callable[[Connection], T]) -> T:
+        return await run_in_session(connection, config, _with_connection, function)
+
+    await run_in_session(connection, config, create_lock_table_if_not_exists)
+    backend = await run(get_lock_backend)
+
+    schedule = _AcquireSchedule(timeout)
+    while not await run(backend.try_acquire):
+        await asyncio.sleep(schedule.retry_delay())
+    stats = schedule.acquired(backend)
+
+    heartbeat = None
+    lease = None
+    if backend.renews_lease:
+        if connection.dialect.name == "sqlite":
+            lease = SessionLeaseRenewal(backend, config)
         else:
-            time.sleep(1)
-            wait_time += 1
+            lease = heartbeat = AsyncLeaseHeartbeat(backend, config)
+            heartbeat.start()
+
+    token = _active_lease.set(lease)
+    try:
+        yield stats
+    finally:
+        _active_lease.reset(token)
+        if heartbeat is not None:
+            await heartbeat.stop()
+        released = await run(backend.release)
+        _log_release(released)
+
+    _check_released(lease, released)
+
+
+def _with_connection(function: Callable[[Connection], T]) -> T:
+    """Call a function with a connection from ``get_db_connection()``."""
+    with get_db_connection() as connection:
+        return function(connection)
+
+
+def get_active_lease() -> _LeaseRenewal | None:
+    """
+    Get the lease of the migration lock held in the current context.
+
+    Returns:
+        The lease, or None if no lock is held or its backend has no lease,
+        e.g. PostgreSQL advisory locks.
+    """
+    return _active_lease.get()
+
+
+def check_migration_lease() -> None:
+    """
+    Make sure the migration lock is still held before the next migration.
+
+    Renews the lease first where it is renewed between migrations. Does
+    nothing outside ``migration_lock()`` or for backends without a lease.
+
+    Raises:
+        LockError: If the lease was lost to another process.
+    """
+    lease = _active_lease.get()
+    if lease is not None:
+        lease.check()
+
+
+def _check_released(lease: _LeaseRenewal | None, released: bool) -> None:
+    """Fail a block that completed after its lease was taken over."""
+    if lease is None:
+        return
+    if not released:
+        lease.lost = True
+    lease._raise_if_lost()
+
 
-    raise LockError(
-        f"Could not acquire migration lock within {timeout} seconds. "
-        "Another migration process may be running."
-    )
+def _log_release(released: bool) -> None:
+    """Log the outcome of releasing the migration lock."""
+    if released:
+        get_logger().info("Migration lock released")
+    else:
+        get_logger().warning("Migration lock was no longer held at release")
 
 
 def is_locked() -> bool:
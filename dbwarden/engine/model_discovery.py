@@ -1,11 +1,14 @@
-import os
-import re
+import hashlib
+import importlib
 import importlib.util
+import json
+import os
 import sys
 from pathlib import Path
 from types import ModuleType
-from typing import List, Optional, Type
+from typing import List, Optional, Sequence, Type
 
+import sqlalchemy
 from sqlalchemy import (
     Column,
     Integer,
@@ -15,13 +18,28 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    MetaData,
+    Table,
 )
 from sqlalchemy.orm import declarative_base
 
-from dbwarden.models import SchemaDifference
+from dbwarden.config import DbwardenConfig
+from dbwarden.constants import CACHE_DIR, DBWARDEN_VERSION
+from dbwarden.engine.cache_files import write_json_atomic
+from dbwarden.engine.version import get_migrations_directory
+from dbwarden.exceptions import DirectoryNotFoundError
+from dbwarden.logging import get_logger
+from dbwarden.models import ColumnSnapshot, SchemaDifference, TableSnapshot
 
 Base = declarative_base()
 
+MODEL_CACHE_FILE = "model_tables.json"
+MODEL_CACHE_FORMAT_VERSION = 1
+
+# Modification time and size of the model files loaded outside a package,
+# so an edited file is executed again.
+_loaded_stats: dict[str, tuple[int, int]] = {}
+
 
 class ModelColumn:
     """Represents a column from a SQLAlchemy model."""
@@ -73,11 +91,41 @@ class ModelTable:
             "columns": [col.to_dict() for col in self.columns],
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "ModelTable":
+        """Rebuild a table from its ``to_dict()`` form."""
+        return cls(
+            name=data["name"],
+            columns=[ModelColumn(**col) for col in data["columns"]],
+        )
+
+    def to_snapshot(self) -> TableSnapshot:
+        """The table as a schema snapshot, to compare it with other schemas."""
+        return TableSnapshot(
+            name=self.name,
+            columns=[
+                ColumnSnapshot(
+                    name=col.name,
+                    type=col.type,
+                    nullable=col.nullable,
+                    default=col.default,
+                )
+                for col in self.columns
+            ],
+        )
+
 
 def load_model_from_path(filepath: str) -> Optional[ModuleType]:
     """
     Load a SQLAlchemy model from a Python file path.
 
+    A file inside a package is imported under its dotted name, the way the
+    application imports it, so modules shared by several model files, such
+    as the declarative base, are executed once. Other files are loaded
+    under a name unique to their path. Either way the module is kept in
+    ``sys.modules`` and loading it again returns the same module, unless a
+    file outside a package was modified since.
+
     Args:
         filepath: Path to the Python file containing SQLAlchemy models.
 
@@ -85,16 +133,65 @@ def load_model_from_path(filepath: str) -> Optional[ModuleType]:
         The loaded module or None if failed.
     """
     try:
-        spec = importlib.util.spec_from_file_location("models", filepath)
+        path = Path(filepath).resolve()
+        if not path.is_file():
+            return None
+
+        package_module = _package_module_name(path)
+        if package_module is not None:
+            name, root = package_module
+            if root not in sys.path:
+                sys.path.insert(0, root)
+            module = importlib.import_module(name)
+            if module.__file__ and Path(module.__file__).resolve() == path:
+                return module
+
+        digest = hashlib.sha256(str(path).encode()).hexdigest()[:12]
+        name = f"_dbwarden_models_{digest}_{path.stem}"
+        stat = path.stat()
+        module = sys.modules.get(name)
+        if module is not None and _loaded_stats.get(name) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return module
+
+        spec = importlib.util.spec_from_file_location(name, path)
         if spec is None or spec.loader is None:
             return None
 
         module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
 
+        _loaded_stats[name] = (stat.st_mtime_ns, stat.st_size)
         return module
-    except Exception:
+    except Exception as e:
+        get_logger().warning(f"Could not load models from {filepath}: {e!r}")
+        return None
+
+
+def _package_module_name(path: Path) -> Optional[tuple[str, str]]:
+    """
+    Dotted module name of a file inside a package.
+
+    Returns:
+        The module name and the directory it is importable from, or None
+        if the file is not inside a package.
+    """
+    parts = [path.stem]
+    directory = path.parent
+    while (directory / "__init__.py").exists():
+        parts.insert(0, directory.name)
+        directory = directory.parent
+
+    if len(parts) == 1 or not all(part.isidentifier() for part in parts):
         return None
+    return ".".join(parts), str(directory)
 
 
 def discover_models_in_directory(directory: str) -> List[str]:
@@ -122,20 +219,25 @@ def discover_models_in_directory(directory: str) -> List[str]:
 
 
 def get_all_model_tables(
-    model_paths: Optional[List[str]] = None,
+    model_paths: Optional[Sequence[str]] = None,
 ) -> List[ModelTable]:
     """
     Extract table definitions from SQLAlchemy models.
 
+    Every model file is loaded with ``load_model_from_path()``, and the
+    tables are read from the ``MetaData`` of the declarative bases found
+    in them, in dependency order. The result is cached in the migrations
+    directory, keyed by the mtime and size of every Python file under the
+    model paths, so as long as no model file changed the models are not
+    imported at all. Changes to modules outside the model paths are not
+    detected. Nothing is cached if a model file fails to load.
+
     Args:
         model_paths: List of paths to model files. If None, auto-discovers in models/ directory.
 
     Returns:
         List of ModelTable objects representing all tables in the models.
     """
-    tables = []
-    seen_tables = set()
-
     if model_paths is None:
         model_paths = auto_discover_model_paths()
 
@@ -149,38 +251,119 @@ def get_all_model_tables(
         if potential_root not in sys.path:
             sys.path.insert(0, potential_root)
 
+    model_files = []
     for model_path in model_paths:
         if not os.path.exists(model_path):
             continue
 
         if os.path.isdir(model_path):
-            model_files = discover_models_in_directory(model_path)
+            model_files.extend(discover_models_in_directory(model_path))
         else:
-            model_files = [model_path]
+            model_files.append(model_path)
+
+    cache_key = _model_files_key(model_paths)
+    cache_path = _model_cache_path()
+    if cache_path is not None:
+        tables = _load_model_tables(cache_path, cache_key)
+        if tables is not None:
+            return tables
+
+    metadatas: dict[int, MetaData] = {}
+    all_loaded = True
+    for model_file in model_files:
+        module = load_model_from_path(model_file)
+        if module is None:
+            all_loaded = False
+            continue
 
-        for model_file in model_files:
-            module = load_model_from_path(model_file)
-            if module is None:
-                continue
+        for metadata in _find_metadata(module):
+            metadatas.setdefault(id(metadata), metadata)
 
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if (
-                    isinstance(attr, type)
-                    and hasattr(attr, "__tablename__")
-                    and hasattr(attr, "__table__")
-                    and attr.__tablename__ is not None
-                ):
-                    if attr.__tablename__ in seen_tables:
-                        continue
-                    seen_tables.add(attr.__tablename__)
-                    table = extract_table_from_model(attr)
-                    if table:
-                        tables.append(table)
+    tables = []
+    seen_tables = set()
+    for metadata in metadatas.values():
+        for table in metadata.sorted_tables:
+            if table.name in seen_tables:
+                continue
+            seen_tables.add(table.name)
+            tables.append(extract_table_from_table(table))
 
+    # Tables of a file that failed to load would stay missing until a
+    # model file changes, so a partial result is not cached.
+    if all_loaded and cache_path is not None:
+        _save_model_tables(cache_path, cache_key, tables)
     return tables
 
 
+def _find_metadata(module: ModuleType) -> List[MetaData]:
+    """The ``MetaData`` of the declarative bases and mapped classes in a module."""
+    found = []
+    for attr in vars(module).values():
+        if isinstance(attr, MetaData):
+            found.append(attr)
+        elif isinstance(attr, type) and isinstance(
+            getattr(attr, "metadata", None), MetaData
+        ):
+            found.append(attr.metadata)
+    return found
+
+
+def _model_files_key(model_paths: Sequence[str]) -> str:
+    """Hash of the path, mtime and size of every Python file under the model paths."""
+    files = []
+    for model_path in model_paths:
+        path = Path(model_path).resolve()
+        candidates = path.rglob("*.py") if path.is_dir() else [path]
+        for candidate in candidates:
+            try:
+                stat = candidate.stat()
+            except OSError:
+                continue
+            files.append((str(candidate), stat.st_mtime_ns, stat.st_size))
+    files.sort()
+
+    key = [sqlalchemy.__version__, files]
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def _model_cache_path() -> Optional[str]:
+    """Path of the model tables cache; None without a migrations directory."""
+    try:
+        migrations_dir = get_migrations_directory()
+    except DirectoryNotFoundError:
+        return None
+    return os.path.join(migrations_dir, CACHE_DIR, MODEL_CACHE_FILE)
+
+
+def _load_model_tables(cache_path: str, cache_key: str) -> Optional[List[ModelTable]]:
+    """Read the cached model tables; None if missing or stale."""
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        if (
+            data.get("format") != MODEL_CACHE_FORMAT_VERSION
+            or data.get("dbwarden_version") != DBWARDEN_VERSION
+            or data.get("key") != cache_key
+        ):
+            return None
+        return [ModelTable.from_dict(table) for table in data["tables"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_model_tables(
+    cache_path: str, cache_key: str, tables: List[ModelTable]
+) -> None:
+    """Write the model tables cache file; failures are ignored."""
+    data = {
+        "format": MODEL_CACHE_FORMAT_VERSION,
+        "dbwarden_version": DBWARDEN_VERSION,
+        "key": cache_key,
+        "tables": [table.to_dict() for table in tables],
+    }
+    write_json_atomic(cache_path, data)
+
+
 def auto_discover_model_paths() -> List[str]:
     """
     Auto-discover model paths by looking for models/ or model/ directories.
@@ -273,19 +456,30 @@ def extract_table_from_model(model_class: type) -> Optional[ModelTable]:
         ModelTable object or None if extraction fails.
     """
     try:
-        table_name = model_class.__tablename__
-        columns = []
-
-        for column in model_class.__table__.columns:
-            col = extract_column_info(column)
-            if col:
-                columns.append(col)
-
-        return ModelTable(name=table_name, columns=columns)
+        return extract_table_from_table(model_class.__table__)
     except Exception:
         return None
 
 
+def extract_table_from_table(table: Table) -> ModelTable:
+    """
+    Extract table information from a SQLAlchemy table.
+
+    Args:
+        table: SQLAlchemy ``Table``, e.g. from a declarative base's metadata.
+
+    Returns:
+        ModelTable object.
+    """
+    columns = []
+    for column in table.columns:
+        col = extract_column_info(column)
+        if col:
+            columns.append(col)
+
+    return ModelTable(name=table.name, columns=columns)
+
+
 def extract_column_info(column) -> Optional[ModelColumn]:
     """
     Extract column information from a SQLAlchemy column.
@@ -461,91 +655,61 @@ def generate_drop_table_sql(table_name: str) -> str:
     return f"DROP TABLE {table_name}"
 
 
-def extract_tables_from_database(sqlalchemy_url: str) -> dict[str, set[str]]:
+def extract_tables_from_database(
+    config: DbwardenConfig | None = None,
+    migrations_dir: str | None = None,
+    refresh: bool = False,
+) -> dict[str, TableSnapshot]:
     """
-    Extract table names and their columns from the actual database.
+    Extract the tables of the actual database with their structure.
+
+    The schema is reflected in bulk through the shared engine and cached
+    in the migrations directory until a migration is applied or rolled
+    back, see ``get_schema_snapshot``.
 
     Args:
-        sqlalchemy_url: SQLAlchemy database URL.
+        config: Configuration to connect with instead of warden.toml.
+        migrations_dir: Migrations directory to cache the schema in; the
+            database is always reflected if None.
+        refresh: Reflect the database even if the cached schema is current.
 
     Returns:
-        Dictionary mapping table names to sets of column names.
+        Dictionary mapping table names to their snapshots; empty if the
+        database cannot be reflected.
     """
-    from sqlalchemy import create_engine, inspect
+    from sqlalchemy.exc import SQLAlchemyError
 
-    tables: dict[str, set[str]] = {}
+    from dbwarden.engine.schema_snapshot import get_schema_snapshot
 
     try:
-        engine = create_engine(sqlalchemy_url)
-        inspector = inspect(engine)
-
-        for table_name in inspector.get_table_names():
-            columns = inspector.get_columns(table_name)
-            column_names = {col["name"].lower() for col in columns}
-            tables[table_name] = column_names
+        return get_schema_snapshot(config, migrations_dir, refresh=refresh)
+    except SQLAlchemyError:
+        return {}
 
-        engine.dispose()
-    except Exception:
-        pass
-
-    return tables
 
-
-def extract_tables_from_migrations(migrations_dir: str) -> dict[str, set[str]]:
+def extract_tables_from_migrations(
+    migrations_dir: str, scratch_sqlite: bool = False
+) -> dict[str, TableSnapshot]:
     """
-    Extract table names and their columns from existing migrations.
+    Extract the tables the existing migrations create, without a database.
+
+    The DDL of the migrations is replayed in memory, see
+    ``replay_migrations``, or executed on a scratch SQLite database, see
+    ``replay_into_sqlite``.
 
     Args:
         migrations_dir: Path to migrations directory.
+        scratch_sqlite: Execute the migrations on SQLite instead of
+            replaying them in memory.
 
     Returns:
-        Dictionary mapping table names to sets of column names.
+        Dictionary mapping table names to their snapshots.
     """
-    from dbwarden.engine.file_parser import parse_upgrade_statements
-
-    tables: dict[str, set[str]] = {}
+    from dbwarden.engine.schema_replay import replay_migrations
+    from dbwarden.engine.scratch_schema import replay_into_sqlite
 
     if not os.path.exists(migrations_dir):
-        return tables
-
-    for filename in sorted(os.listdir(migrations_dir)):
-        if not filename.endswith(".sql"):
-            continue
-        filepath = os.path.join(migrations_dir, filename)
-        statements = parse_upgrade_statements(filepath)
-
-        for stmt in statements:
-            create_match = re.search(
-                r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(",
-                stmt,
-                re.IGNORECASE,
-            )
-            if create_match:
-                table_name = create_match.group(1)
-
-                columns_str_match = re.search(r"\((.+)\)", stmt, re.DOTALL)
-                if columns_str_match:
-                    columns_str = columns_str_match.group(1)
-                    column_names = set()
-
-                    column_parts = re.split(r",\s*(?![^()]*\))", columns_str)
-                    for part in column_parts:
-                        part = part.strip()
-                        col_match = re.match(r"(\w+)", part, re.IGNORECASE)
-                        if col_match:
-                            col_name = col_match.group(1).lower()
-                            if col_name not in (
-                                "primary",
-                                "foreign",
-                                "unique",
-                                "check",
-                                "constraint",
-                            ):
-                                column_names.add(col_name)
-
-                    if table_name in tables:
-                        tables[table_name].update(column_names)
-                    else:
-                        tables[table_name] = column_names
-
-    return tables
+        return {}
+    if scratch_sqlite:
+        return replay_into_sqlite(migrations_dir)
+    return replay_migrations(migrations_dir)
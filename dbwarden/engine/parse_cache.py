@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, Iterator
+
+from dbwarden.constants import CACHE_DIR, DBWARDEN_VERSION
+from dbwarden.engine.cache_files import write_json_atomic
+from dbwarden.engine.checksum import StatementHasher
+from dbwarden.engine.file_parser import (
+    STREAM_CHUNK_SIZE,
+    MigrationMetadata,
+    ParsedMigration,
+    iter_byte_statements,
+    iter_upgrade_statements,
+    parse_migration_bytes,
+    read_migration_header,
+)
+from dbwarden.engine.sql_splitter import UPGRADE_MARKER
+
+CACHE_FILE = "parsed_migrations.json"
+CACHE_FORMAT_VERSION = 3
+MAX_CACHE_ENTRIES = 20000
+
+
+class MigrationCache:
+    """
+    On-disk cache of parsed migration files.
+
+    Entries live in ``<migrations_dir>/.dbwarden_cache`` and are keyed by
+    filename. An entry is reused without reading the file when its mtime,
+    size and inode are unchanged; otherwise the file is read once, and the
+    entry is reused only if the hash of its bytes still matches. Entries for files
+    that no longer exist are evicted on save, and the cache is capped at
+    ``MAX_CACHE_ENTRIES`` by least recent use. Instances are thread-safe.
+
+    Seed migrations can be arbitrarily large, so their upgrade statements
+    are not cached: the entry keeps the metadata, rollback statements and
+    checksum, and ``upgrade_statements`` is empty. Seeds are executed with
+    ``iter_upgrade_statements()``; ``get_upgrade_statements()`` returns
+    them as a list when that is needed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.cache_dir = os.path.join(directory, CACHE_DIR)
+        self.cache_path = os.path.join(self.cache_dir, CACHE_FILE)
+        self._entries: dict[str, dict] = self._load()
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _load(self) -> dict[str, dict]:
+        """Load cache entries from disk, discarding incompatible caches."""
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if (
+            not isinstance(data, dict)
+            or data.get("format") != CACHE_FORMAT_VERSION
+            or data.get("dbwarden_version") != DBWARDEN_VERSION
+        ):
+            return {}
+        return data.get("entries", {})
+
+    def get(self, filepath: str) -> ParsedMigration:
+        """
+        Get the parsed contents of a migration file.
+
+        Args:
+            filepath: Path to the migration SQL file.
+
+        Returns:
+            ParsedMigration: The parsed migration.
+        """
+        filename = os.path.basename(filepath)
+        stat = os.stat(filepath)
+        stat_key = [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None or entry["stat"] != stat_key:
+                entry = _read_entry(filepath, entry)
+                entry["stat"] = stat_key
+                self._entries[filename] = entry
+                self._dirty = True
+
+            entry["last_used"] = time.time()
+            return _to_parsed_migration(filepath, entry)
+
+    def get_upgrade_statements(self, filepath: str) -> list[str]:
+        """
+        Get the upgrade statements of a migration file as a list.
+
+        Seed statements are not cached and are read from the file instead.
+
+        Args:
+            filepath: Path to the migration SQL file.
+
+        Returns:
+            list[str]: The upgrade statements.
+        """
+        migration = self.get(filepath)
+        if migration.metadata.is_seed:
+            return list(iter_upgrade_statements(filepath))
+        return migration.upgrade_statements
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed; failures are ignored."""
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        """Write the cache to disk; the caller holds the lock."""
+        if not self._dirty:
+            return
+
+        self._evict()
+
+        data = {
+            "format": CACHE_FORMAT_VERSION,
+            "dbwarden_version": DBWARDEN_VERSION,
+            "entries": self._entries,
+        }
+        if write_json_atomic(self.cache_path, data):
+            self._dirty = False
+
+    def _evict(self) -> None:
+        """Drop entries of deleted files and the least recently used overflow."""
+        for filename in list(self._entries):
+            if not os.path.exists(os.path.join(self.directory, filename)):
+                del self._entries[filename]
+
+        overflow = len(self._entries) - MAX_CACHE_ENTRIES
+        if overflow > 0:
+            by_age = sorted(self._entries, key=lambda f: self._entries[f]["last_used"])
+            for filename in by_age[:overflow]:
+                del self._entries[filename]
+
+
+def _read_entry(filepath: str, cached: dict | None) -> dict:
+    """
+    Read a migration file once into a cache entry.
+
+    The content hash is taken from the same bytes that are parsed. Seeds are
+    streamed; other files are read whole and parsed only if the hash differs
+    from the ``cached`` entry, which is returned unchanged otherwise.
+    """
+    with open(filepath, "rb") as f:
+        metadata, header = read_migration_header(f)
+        if metadata.is_seed:
+            content_hash, rollback, checksum = _scan_seed(f, header)
+            return _new_entry(content_hash, metadata, [], rollback, checksum)
+        data = header + f.read()
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    if cached is not None and cached["content_hash"] == content_hash:
+        return cached
+
+    parsed = parse_migration_bytes(data, filepath)
+    return _new_entry(
+        content_hash,
+        parsed.metadata,
+        parsed.upgrade_statements,
+        parsed.rollback_statements,
+        parsed.checksum,
+    )
+
+
+def _new_entry(
+    content_hash: str,
+    metadata: MigrationMetadata,
+    upgrade: list[str],
+    rollback: list[str],
+    checksum: str,
+) -> dict:
+    """Build a cache entry."""
+    return {
+        "content_hash": content_hash,
+        "depends_on": metadata.depends_on,
+        "is_seed": metadata.is_seed,
+        "description": metadata.description,
+        "delimiter": metadata.delimiter,
+        "upgrade": upgrade,
+        "rollback": rollback,
+        "checksum": checksum,
+    }
+
+
+def _scan_seed(f: BinaryIO, header: bytes) -> tuple[str, list[str], str]:
+    """
+    Stream the rest of a seed file, keeping only rollback statements.
+
+    Returns the hash of the file content, the rollback statements and the
+    checksum of the upgrade statements.
+    """
+    file_hash = hashlib.sha256(header)
+    hasher = StatementHasher()
+    rollback: list[str] = []
+
+    def chunks() -> Iterator[bytes]:
+        yield header
+        while chunk := f.read(STREAM_CHUNK_SIZE):
+            file_hash.update(chunk)
+            yield chunk
+
+    for section, statement in iter_byte_statements(chunks()):
+        if section == UPGRADE_MARKER:
+            hasher.update(statement)
+        else:
+            rollback.append(statement)
+
+    return file_hash.hexdigest(), rollback, hasher.hexdigest()
+
+
+def _to_parsed_migration(filepath: str, entry: dict) -> ParsedMigration:
+    """Build a ParsedMigration from a cache entry."""
+    return ParsedMigration(
+        filepath=filepath,
+        metadata=MigrationMetadata(
+            depends_on=list(entry["depends_on"]),
+            is_seed=entry["is_seed"],
+            description=entry["description"],
+            delimiter=entry["delimiter"],
+        ),
+        upgrade_statements=list(entry["upgrade"]),
+        rollback_statements=list(entry["rollback"]),
+        checksum=entry["checksum"],
+    )
+
+
+_caches: dict[str, MigrationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_migration_cache(directory: str) -> MigrationCache:
+    """
+    Get the parse cache for a migrations directory.
+
+    The cache is loaded from disk once per process and shared by all callers,
+    including threads migrating several targets at once.
+
+    Args:
+        directory: Path to migrations directory.
+
+    Returns:
+        MigrationCache: The cache for the directory.
+    """
+    key = os.path.abspath(directory)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = MigrationCache(key)
+            _caches[key] = cache
+    return cache
+
+
+def clear_migration_caches() -> None:
+    """Forget all in-process caches; on-disk caches are left untouched."""
+    _caches.clear()
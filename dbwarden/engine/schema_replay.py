@@ -0,0 +1,728 @@
+import json
+import os
+import re
+from dataclasses import asdict
+
+from dbwarden.constants import CACHE_DIR, DBWARDEN_VERSION
+from dbwarden.engine.cache_files import write_json_atomic
+from dbwarden.models import (
+    ColumnSnapshot,
+    ForeignKeySnapshot,
+    IndexSnapshot,
+    TableSnapshot,
+)
+
+REPLAY_CACHE_FILE = "replayed_schema.json"
+REPLAY_FORMAT_VERSION = 1
+
+_IDENT = r'(?:"[^"]+"|`[^`]+`|\[[^\]]+\]|[\w$]+)'
+_QUALIFIED = rf"{_IDENT}(?:\s*\.\s*{_IDENT})*"
+
+_CREATE_TABLE = re.compile(
+    rf"^CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(TEMP|TEMPORARY)\s+|UNLOGGED\s+)?TABLE\s+"
+    rf"(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED})\s*(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_DROP_TABLE = re.compile(
+    r"^DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(.*?)(?:\s+(?:CASCADE|RESTRICT))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_ALTER_TABLE = re.compile(
+    rf"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?({_QUALIFIED})\s+(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_RENAME_TABLE = re.compile(r"^RENAME\s+TABLE\s+(.*)$", re.IGNORECASE | re.DOTALL)
+_CREATE_INDEX = re.compile(
+    rf"^CREATE\s+(UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?:({_QUALIFIED})\s+)?ON\s+(?:ONLY\s+)?({_QUALIFIED})\s*"
+    r"(?:USING\s+\w+\s*)?(\(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_DROP_INDEX = re.compile(
+    rf"^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?(.*?)"
+    rf"(?:\s+ON\s+({_QUALIFIED}))?(?:\s+(?:CASCADE|RESTRICT))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_ALTER_INDEX = re.compile(
+    rf"^ALTER\s+INDEX\s+(?:IF\s+EXISTS\s+)?({_QUALIFIED})\s+RENAME\s+TO\s+({_IDENT})$",
+    re.IGNORECASE | re.DOTALL,
+)
+_FOREIGN_KEY = re.compile(
+    rf"^FOREIGN\s+KEY\s*\((.*?)\)\s*REFERENCES\s+({_QUALIFIED})\s*(?:\((.*?)\))?",
+    re.IGNORECASE | re.DOTALL,
+)
+_REFERENCES = re.compile(
+    rf"^({_QUALIFIED})\s*(?:\((.*?)\))?", re.IGNORECASE | re.DOTALL
+)
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Words that end the type of a column definition.
+_COLUMN_CONSTRAINTS = {
+    "NOT",
+    "NULL",
+    "PRIMARY",
+    "UNIQUE",
+    "DEFAULT",
+    "REFERENCES",
+    "CHECK",
+    "CONSTRAINT",
+    "COLLATE",
+    "GENERATED",
+    "AUTOINCREMENT",
+    "AUTO_INCREMENT",
+    "IDENTITY",
+    "COMMENT",
+    "ON",
+}
+
+# Words that start a table constraint rather than a column definition.
+_TABLE_CONSTRAINTS = {
+    "CONSTRAINT",
+    "PRIMARY",
+    "FOREIGN",
+    "UNIQUE",
+    "CHECK",
+    "EXCLUDE",
+    "KEY",
+    "INDEX",
+}
+
+
+class SchemaReplay:
+    """
+    Schema built by replaying DDL statements, without a database.
+
+    ``apply`` understands the schema-changing statements migrations are
+    made of: ``CREATE``/``DROP``/``ALTER TABLE`` (adding, dropping,
+    renaming and altering columns and foreign keys), ``RENAME TABLE`` and
+    ``CREATE``/``DROP``/``ALTER INDEX``. Other statements, such as DML,
+    views and functions, are ignored. Identifiers are matched case
+    insensitively and schema qualifiers are dropped, as in reflection.
+
+    Attributes:
+        tables: The tables built so far, by name. Change them through
+            ``apply`` only, so the case insensitive index stays in step.
+    """
+
+    def __init__(self, tables: dict[str, TableSnapshot] | None = None):
+        self.tables: dict[str, TableSnapshot] = dict(tables or {})
+        # Lowercased name to key of ``tables``, for case insensitive lookups.
+        self._keys: dict[str, str] = {}
+        for key in self.tables:
+            self._keys.setdefault(key.lower(), key)
+
+    def apply(self, statement: str) -> None:
+        """
+        Apply one SQL statement to the schema.
+
+        Args:
+            statement: The statement; unsupported statements are ignored.
+        """
+        statement = _COMMENT.sub("", statement).strip().rstrip(";").strip()
+
+        for pattern, handler in (
+            (_CREATE_TABLE, self._create_table),
+            (_DROP_TABLE, self._drop_table),
+            (_ALTER_TABLE, self._alter_table),
+            (_RENAME_TABLE, self._rename_tables),
+            (_CREATE_INDEX, self._create_index),
+            (_DROP_INDEX, self._drop_index),
+            (_ALTER_INDEX, self._rename_index),
+        ):
+            match = pattern.match(statement)
+            if match:
+                handler(match)
+                return
+
+    def table(self, name: str) -> TableSnapshot | None:
+        """Look up a table by name, case insensitively."""
+        key = self._key(name)
+        return self.tables.get(key) if key is not None else None
+
+    def _key(self, name: str) -> str | None:
+        if name in self.tables:
+            return name
+        return self._keys.get(name.lower())
+
+    def _add(self, table: TableSnapshot) -> None:
+        self.tables[table.name] = table
+        self._keys[table.name.lower()] = table.name
+
+    def _remove(self, key: str) -> TableSnapshot:
+        if self._keys.get(key.lower()) == key:
+            del self._keys[key.lower()]
+        return self.tables.pop(key)
+
+    def _create_table(self, match: re.Match) -> None:
+        temporary, name, rest = match.groups()
+        if temporary:
+            return
+
+        name = _name(name)
+        if self._key(name) is not None:
+            # CREATE TABLE IF NOT EXISTS of an existing table does nothing.
+            return
+
+        table = TableSnapshot(name=name)
+        if rest.startswith("("):
+            for part in _split(rest[1 : _closing_paren(rest)], ","):
+                _add_definition(table, part)
+        self._add(table)
+
+    def _drop_table(self, match: re.Match) -> None:
+        for name in _split(match.group(1), ","):
+            key = self._key(_name(name))
+            if key is not None:
+                self._remove(key)
+
+    def _rename_tables(self, match: re.Match) -> None:
+        for pair in _split(match.group(1), ","):
+            renamed = re.match(
+                rf"^({_QUALIFIED})\s+TO\s+({_QUALIFIED})$", pair, re.IGNORECASE
+            )
+            if renamed:
+                self._rename_table(_name(renamed.group(1)), _name(renamed.group(2)))
+
+    def _rename_table(self, old: str, new: str) -> None:
+        key = self._key(old)
+        if key is None:
+            return
+        table = self._remove(key)
+        table.name = new
+        self._add(table)
+        for other in self.tables.values():
+            for foreign_key in other.foreign_keys:
+                if foreign_key.referred_table.lower() == old.lower():
+                    foreign_key.referred_table = new
+
+    def _alter_table(self, match: re.Match) -> None:
+        name, actions = match.groups()
+        name = _name(name)
+        for action in _split(actions, ","):
+            table = self.table(name)
+            if table is None:
+                return
+
+            renamed = re.match(
+                rf"^RENAME\s+(?:TO|AS)\s+({_QUALIFIED})$", action, re.IGNORECASE
+            )
+            if renamed:
+                self._rename_table(table.name, _name(renamed.group(1)))
+                name = _name(renamed.group(1))
+                continue
+
+            _alter_table(table, action)
+
+    def _create_index(self, match: re.Match) -> None:
+        unique, name, table_name, rest = match.groups()
+        table = self.table(_name(table_name))
+        if table is None:
+            return
+
+        columns = rest[1 : _closing_paren(rest)]
+        name = _name(name) if name else None
+        if name is not None and any(index.name == name for index in table.indexes):
+            return
+        table.indexes.append(
+            IndexSnapshot(
+                name=name,
+                columns=[_index_column(column) for column in _split(columns, ",")],
+                unique=bool(unique),
+            )
+        )
+
+    def _drop_index(self, match: re.Match) -> None:
+        names, table_name = match.groups()
+        tables = list(self.tables.values())
+        if table_name:
+            table = self.table(_name(table_name))
+            tables = [table] if table is not None else []
+
+        for name in _split(names, ","):
+            name = _name(name).lower()
+            for table in tables:
+                table.indexes = [
+                    index
+                    for index in table.indexes
+                    if (index.name or "").lower() != name
+                ]
+
+    def _rename_index(self, match: re.Match) -> None:
+        old, new = _name(match.group(1)).lower(), _name(match.group(2))
+        for table in self.tables.values():
+            for index in table.indexes:
+                if (index.name or "").lower() == old:
+                    index.name = new
+
+
+def _alter_table(table: TableSnapshot, action: str) -> None:
+    """Apply one action of an ``ALTER TABLE`` statement to a table."""
+    keyword, _, rest = action.partition(" ")
+    keyword = keyword.upper()
+    rest = rest.strip()
+
+    if keyword == "ADD":
+        rest = re.sub(r"^COLUMN\s+", "", rest, flags=re.IGNORECASE)
+        rest = re.sub(r"^IF\s+NOT\s+EXISTS\s+", "", rest, flags=re.IGNORECASE)
+        _add_definition(table, rest, replace=False)
+    elif keyword == "DROP":
+        _drop(table, rest)
+    elif keyword == "RENAME":
+        renamed = re.match(
+            rf"^(?:COLUMN\s+)?({_IDENT})\s+TO\s+({_IDENT})$", rest, re.IGNORECASE
+        )
+        if renamed:
+            _rename_column(table, _name(renamed.group(1)), _name(renamed.group(2)))
+    elif keyword == "ALTER":
+        altered = re.match(
+            rf"^(?:COLUMN\s+)?({_IDENT})\s+(.*)$", rest, re.IGNORECASE | re.DOTALL
+        )
+        if altered:
+            _alter_column(table, _name(altered.group(1)), altered.group(2))
+    elif keyword == "MODIFY":
+        rest = re.sub(r"^COLUMN\s+", "", rest, flags=re.IGNORECASE)
+        _add_definition(table, rest)
+    elif keyword == "CHANGE":
+        rest = re.sub(r"^COLUMN\s+", "", rest, flags=re.IGNORECASE)
+        old, _, definition = rest.partition(" ")
+        column = _parse_column(definition.strip())
+        if column is not None:
+            _rename_column(table, _name(old), column.name)
+            _add_definition(table, definition.strip())
+
+
+def _add_definition(
+    table: TableSnapshot, definition: str, replace: bool = True
+) -> None:
+    """
+    Add a column or table constraint definition to a table.
+
+    Args:
+        table: The table.
+        definition: A column definition or a table constraint.
+        replace: Whether a column of the same name is replaced; otherwise
+            the definition is ignored, as ``ADD COLUMN IF NOT EXISTS``.
+    """
+    tokens = _tokens(definition)
+    if not tokens:
+        return
+
+    keyword = tokens[0].upper()
+    if keyword == "CONSTRAINT" or (
+        keyword in _TABLE_CONSTRAINTS
+        and any(token.startswith("(") for token in tokens[1:])
+    ):
+        _add_constraint(table, definition, tokens)
+        return
+
+    column = _parse_column(definition)
+    if column is None:
+        return
+
+    for position, existing in enumerate(table.columns):
+        if existing.name.lower() == column.name.lower():
+            if replace:
+                table.columns[position] = column
+            return
+    table.columns.append(column)
+
+    references = _inline_references(tokens)
+    if references is not None:
+        referred_table, referred_columns = references
+        table.foreign_keys.append(
+            ForeignKeySnapshot(
+                name=None,
+                columns=[column.name],
+                referred_table=referred_table,
+                referred_columns=referred_columns,
+            )
+        )
+
+
+def _add_constraint(table: TableSnapshot, definition: str, tokens: list[str]) -> None:
+    """Add a table constraint: foreign and primary keys, MySQL indexes."""
+    name = None
+    if tokens[0].upper() == "CONSTRAINT":
+        if len(tokens) < 3:
+            return
+        name = _name(tokens[1])
+        definition = re.sub(
+            rf"^CONSTRAINT\s+{_IDENT}\s+", "", definition, flags=re.IGNORECASE
+        )
+        tokens = tokens[2:]
+
+    keyword = tokens[0].upper()
+    if keyword == "FOREIGN":
+        match = _FOREIGN_KEY.match(definition)
+        if match:
+            columns, referred_table, referred_columns = match.groups()
+            table.foreign_keys.append(
+                ForeignKeySnapshot(
+                    name=name,
+                    columns=[_name(column) for column in _split(columns, ",")],
+                    referred_table=_name(referred_table),
+                    referred_columns=[
+                        _name(column) for column in _split(referred_columns or "", ",")
+                    ],
+                )
+            )
+    elif keyword == "PRIMARY":
+        group = next((token for token in tokens if token.startswith("(")), "")
+        keys = {_name(column).lower() for column in _split(group[1:-1], ",")}
+        for column in table.columns:
+            if column.name.lower() in keys:
+                column.nullable = False
+    elif keyword in ("KEY", "INDEX") or (
+        keyword == "UNIQUE"
+        and len(tokens) > 2
+        and tokens[1].upper() in ("KEY", "INDEX")
+    ):
+        words = [token for token in tokens if not token.startswith("(")]
+        group = next((token for token in tokens if token.startswith("(")), None)
+        if group is None:
+            return
+        index_name = words[-1] if words[-1].upper() not in ("KEY", "INDEX") else None
+        table.indexes.append(
+            IndexSnapshot(
+                name=_name(index_name) if index_name else name,
+                columns=[_index_column(column) for column in _split(group[1:-1], ",")],
+                unique=keyword == "UNIQUE",
+            )
+        )
+
+
+def _drop(table: TableSnapshot, rest: str) -> None:
+    """Apply the ``DROP ...`` action of an ``ALTER TABLE`` to a table."""
+    words = _tokens(rest)
+    if not words:
+        return
+
+    keyword = words[0].upper()
+    if keyword in ("CONSTRAINT", "FOREIGN", "INDEX", "KEY"):
+        names = [
+            word for word in words[1:] if word.upper() not in ("KEY", "IF", "EXISTS")
+        ]
+        if not names:
+            return
+        name = _name(names[0]).lower()
+        table.foreign_keys = [
+            fk for fk in table.foreign_keys if (fk.name or "").lower() != name
+        ]
+        table.indexes = [
+            index for index in table.indexes if (index.name or "").lower() != name
+        ]
+        return
+    if keyword == "PRIMARY":
+        return
+
+    if keyword == "COLUMN":
+        words = words[1:]
+    if len(words) >= 3 and words[0].upper() == "IF" and words[1].upper() == "EXISTS":
+        words = words[2:]
+    if not words:
+        return
+
+    name = _name(words[0]).lower()
+    table.columns = [column for column in table.columns if column.name.lower() != name]
+    table.indexes = [
+        index
+        for index in table.indexes
+        if name not in (column.lower() for column in index.columns)
+    ]
+    table.foreign_keys = [
+        fk
+        for fk in table.foreign_keys
+        if name not in (column.lower() for column in fk.columns)
+    ]
+
+
+def _rename_column(table: TableSnapshot, old: str, new: str) -> None:
+    """Rename a column wherever the table refers to it."""
+    lowered = old.lower()
+
+    def rename(columns: list[str]) -> list[str]:
+        return [new if column.lower() == lowered else column for column in columns]
+
+    for column in table.columns:
+        if column.name.lower() == lowered:
+            column.name = new
+    for index in table.indexes:
+        index.columns = rename(index.columns)
+    for foreign_key in table.foreign_keys:
+        foreign_key.columns = rename(foreign_key.columns)
+
+
+def _alter_column(table: TableSnapshot, name: str, change: str) -> None:
+    """Apply an ``ALTER COLUMN`` change: nullability, default or type."""
+    column = next(
+        (column for column in table.columns if column.name.lower() == name.lower()),
+        None,
+    )
+    if column is None:
+        return
+
+    words = change.split()
+    phrase = " ".join(words[:3]).upper()
+    if phrase.startswith("SET NOT NULL"):
+        column.nullable = False
+    elif phrase.startswith("DROP NOT NULL"):
+        column.nullable = True
+    elif phrase.startswith("SET DEFAULT"):
+        column.default = change.split(None, 2)[2].strip()
+    elif phrase.startswith("DROP DEFAULT"):
+        column.default = None
+    else:
+        typed = re.match(
+            r"^(?:SET\s+DATA\s+)?TYPE\s+(.*?)(?:\s+USING\s+.*)?$",
+            change,
+            re.IGNORECASE | re.DOTALL,
+        )
+        if typed:
+            column.type = _type(typed.group(1).split())
+
+
+def _parse_column(definition: str) -> ColumnSnapshot | None:
+    """Parse a column definition into a column."""
+    tokens = _tokens(definition)
+    if not tokens:
+        return None
+
+    type_tokens = []
+    position = 1
+    while (
+        position < len(tokens) and tokens[position].upper() not in _COLUMN_CONSTRAINTS
+    ):
+        type_tokens.append(tokens[position])
+        position += 1
+
+    nullable = True
+    default = None
+    constraints = [token.upper() for token in tokens[position:]]
+    for offset, word in enumerate(constraints):
+        following = constraints[offset + 1] if offset + 1 < len(constraints) else ""
+        if (word, following) in (("NOT", "NULL"), ("PRIMARY", "KEY")):
+            nullable = False
+        elif word == "DEFAULT" and following:
+            default = tokens[position + offset + 1]
+
+    return ColumnSnapshot(
+        name=_name(tokens[0]),
+        type=_type(type_tokens),
+        nullable=nullable,
+        default=default,
+    )
+
+
+def _inline_references(tokens: list[str]) -> tuple[str, list[str]] | None:
+    """The table and columns of a column's ``REFERENCES`` clause, if any."""
+    upper = [token.upper() for token in tokens]
+    if "REFERENCES" not in upper:
+        return None
+
+    clause = " ".join(tokens[upper.index("REFERENCES") + 1 :])
+    match = _REFERENCES.match(clause)
+    if match is None:
+        return None
+    referred_table, referred_columns = match.groups()
+    return _name(referred_table), [
+        _name(column) for column in _split(referred_columns or "", ",")
+    ]
+
+
+def _type(tokens: list[str]) -> str:
+    """Render the type of a column definition like reflection does."""
+    rendered = re.sub(r"\s+\(", "(", " ".join(tokens))
+    return rendered if "'" in rendered else rendered.upper()
+
+
+def _name(identifier: str) -> str:
+    """Unquoted last part of a possibly qualified identifier."""
+    parts = re.findall(_IDENT, identifier.strip())
+    if not parts:
+        return identifier.strip()
+    last = parts[-1]
+    if last[0] in '"`[':
+        return last[1:-1]
+    return last
+
+
+def _index_column(expression: str) -> str:
+    """Column of an index element, without ordering or operator class."""
+    tokens = _tokens(expression)
+    if not tokens or "(" in tokens[0]:
+        # An expression rather than a column.
+        return expression
+    return _name(tokens[0])
+
+
+def _closing_paren(text: str) -> int:
+    """Index of the parenthesis closing the one that starts ``text``."""
+    depth = 0
+    quote = None
+    for position, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(text)
+
+
+def _split(text: str, separator: str) -> list[str]:
+    """Split on a separator outside parentheses and quotes."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for position, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:position].strip())
+            start = position + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def _tokens(text: str) -> list[str]:
+    """Split on whitespace outside parentheses and quotes."""
+    tokens = []
+    depth = 0
+    quote = None
+    current = ""
+    for char in text:
+        if quote:
+            current += char
+            if char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+            current += char
+        elif char == "(":
+            depth += 1
+            current += char
+        elif char == ")":
+            depth -= 1
+            current += char
+        elif char.isspace() and depth == 0:
+            if current:
+                tokens.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+def replay_migrations(directory: str) -> dict[str, TableSnapshot]:
+    """
+    Build the schema the migrations of a directory produce.
+
+    The upgrade statements of the versioned migrations are replayed in
+    dependency order with ``SchemaReplay``, followed by the runs-always and
+    runs-on-change migrations. Statements come from the parse cache, and
+    the schema after the versioned migrations is kept in
+    ``<migrations_dir>/.dbwarden_cache`` together with the files it was
+    built from, so only migrations added since are replayed. Seed
+    migrations hold data and are skipped.
+
+    Args:
+        directory: Path to migrations directory.
+
+    Returns:
+        dict[str, TableSnapshot]: Tables by name.
+
+    Raises:
+        MigrationDependencyError: If dependencies are missing or circular.
+    """
+    from dbwarden.engine.parse_cache import get_migration_cache
+    from dbwarden.engine.version import (
+        get_runs_always_filepaths,
+        get_runs_on_change_filepaths,
+        resolve_migration_order,
+    )
+
+    cache = get_migration_cache(directory)
+    order = resolve_migration_order(directory, applied_versions=set())
+    files = [
+        [os.path.basename(filepath), cache.get(filepath).checksum]
+        for _, filepath, _, _ in order
+    ]
+
+    cache_path = os.path.join(directory, CACHE_DIR, REPLAY_CACHE_FILE)
+    replayed, tables = _load_replay(cache_path, files)
+    replay = SchemaReplay(tables)
+
+    for _, filepath, _, is_seed in order[replayed:]:
+        if is_seed:
+            continue
+        for statement in cache.get(filepath).upgrade_statements:
+            replay.apply(statement)
+
+    if replayed < len(files) or not os.path.exists(cache_path):
+        _save_replay(cache_path, files, replay.tables)
+
+    for filepath in get_runs_always_filepaths(directory) + get_runs_on_change_filepaths(
+        directory
+    ):
+        for statement in cache.get(filepath).upgrade_statements:
+            replay.apply(statement)
+    cache.save()
+
+    return replay.tables
+
+
+def _load_replay(
+    cache_path: str, files: list[list[str]]
+) -> tuple[int, dict[str, TableSnapshot]]:
+    """
+    Read the replayed schema cache.
+
+    Returns:
+        tuple[int, dict[str, TableSnapshot]]: How many of ``files`` the
+            cached schema was built from, and that schema; ``(0, {})`` if
+            the cache is missing or was built from other files.
+    """
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        cached_files = data["files"]
+        if (
+            data.get("format") != REPLAY_FORMAT_VERSION
+            or data.get("dbwarden_version") != DBWARDEN_VERSION
+            or files[: len(cached_files)] != cached_files
+        ):
+            return 0, {}
+        tables = {
+            table["name"]: TableSnapshot.from_dict(table) for table in data["tables"]
+        }
+        return len(cached_files), tables
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return 0, {}
+
+
+def _save_replay(
+    cache_path: str, files: list[list[str]], tables: dict[str, TableSnapshot]
+) -> None:
+    """Write the replayed schema cache file; failures are ignored."""
+    data = {
+        "format": REPLAY_FORMAT_VERSION,
+        "dbwarden_version": DBWARDEN_VERSION,
+        "files": files,
+        "tables": [asdict(table) for table in tables.values()],
+    }
+    write_json_atomic(cache_path, data)
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine.reflection import ObjectKind
+
+from dbwarden.config import DbwardenConfig
+from dbwarden.constants import CACHE_DIR, DBWARDEN_VERSION
+from dbwarden.database.connection import get_db_connection, get_db_session
+from dbwarden.engine.cache_files import write_json_atomic
+from dbwarden.models import (
+    ColumnSnapshot,
+    ForeignKeySnapshot,
+    IndexSnapshot,
+    SchemaDifference,
+    TableSnapshot,
+)
+from dbwarden.repositories.migrations_repo import get_migrations_state
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def reflect_schema(
+    connection: Connection,
+    schema: str | None = None,
+) -> dict[str, TableSnapshot]:
+    """
+    Reflect the tables of a schema with their columns, indexes and keys.
+
+    Uses SQLAlchemy's multi-object reflection, which on PostgreSQL and
+    MySQL reads each catalog for every table at once instead of issuing
+    one query per table. Dialects without batched reflection fall back
+    to per-table queries inside SQLAlchemy.
+
+    Args:
+        connection: Connection to reflect through.
+        schema: Schema to reflect; the connection's default schema if None.
+
+    Returns:
+        dict[str, TableSnapshot]: Tables by name, in name order.
+    """
+    inspector = inspect(connection)
+    columns = inspector.get_multi_columns(schema=schema, kind=ObjectKind.TABLE)
+    indexes = inspector.get_multi_indexes(schema=schema, kind=ObjectKind.TABLE)
+    foreign_keys = inspector.get_multi_foreign_keys(
+        schema=schema, kind=ObjectKind.TABLE
+    )
+
+    tables: dict[str, TableSnapshot] = {}
+    for key in sorted(columns, key=lambda key: key[1]):
+        table_name = key[1]
+        tables[table_name] = TableSnapshot(
+            name=table_name,
+            columns=[
+                ColumnSnapshot(
+                    name=column["name"],
+                    type=str(column["type"]),
+                    nullable=column["nullable"],
+                    default=column.get("default"),
+                )
+                for column in columns[key]
+            ],
+            indexes=[
+                IndexSnapshot(
+                    name=index["name"],
+                    columns=list(index["column_names"]),
+                    unique=index["unique"],
+                )
+                for index in indexes.get(key, [])
+            ],
+            foreign_keys=[
+                ForeignKeySnapshot(
+                    name=foreign_key["name"],
+                    columns=list(foreign_key["constrained_columns"]),
+                    referred_table=foreign_key["referred_table"],
+                    referred_columns=list(foreign_key["referred_columns"]),
+                )
+                for foreign_key in foreign_keys.get(key, [])
+            ],
+        )
+
+    return tables
+
+
+def get_schema_snapshot(
+    config: DbwardenConfig | None = None,
+    directory: str | None = None,
+    refresh: bool = False,
+) -> dict[str, TableSnapshot]:
+    """
+    Get the schema of the database, reusing the last reflection if possible.
+
+    The reflected schema is saved in ``<migrations_dir>/.dbwarden_cache``
+    together with a summary of ``dbwarden_migrations`` (see
+    ``get_migrations_state``). As long as no migration was applied or
+    rolled back since, the saved schema is returned without reflecting
+    the database. Changes made outside DBWarden are not detected; pass
+    ``refresh`` to reflect the database regardless.
+
+    Args:
+        config: Configuration to connect with instead of warden.toml.
+        directory: Migrations directory holding the cache; the schema is
+            not cached if None.
+        refresh: Reflect the database even if the saved schema is current.
+
+    Returns:
+        dict[str, TableSnapshot]: Tables by name, in name order.
+    """
+    with get_db_session(config=config) as session:
+        config = session.config
+        state = get_migrations_state()
+
+        cache_path = None
+        if directory is not None and state is not None:
+            cache_path = _snapshot_path(directory, config)
+            if not refresh:
+                tables = _load_snapshot(cache_path, state)
+                if tables is not None:
+                    return tables
+
+        with get_db_connection() as connection:
+            tables = reflect_schema(connection, config.postgres_schema)
+
+    if cache_path is not None:
+        _save_snapshot(cache_path, state, tables)
+    return tables
+
+
+def compare_schemas(
+    expected: dict[str, TableSnapshot],
+    actual: dict[str, TableSnapshot],
+) -> list[SchemaDifference]:
+    """
+    Compare the tables and columns of two schemas.
+
+    Names are compared case insensitively. DBWarden's own bookkeeping
+    tables are ignored. Column types are not compared, since every
+    source renders them differently.
+
+    Args:
+        expected: The schema that should exist, e.g. from the models.
+        actual: The schema that exists, e.g. from the database.
+
+    Returns:
+        list[SchemaDifference]: ``add_table`` and ``add_column`` for what
+            ``actual`` lacks, ``drop_table`` and ``drop_column`` for what
+            it has in excess.
+    """
+    differences = []
+    expected_tables = {name.lower(): table for name, table in expected.items()}
+    actual_tables = {
+        name.lower(): table
+        for name, table in actual.items()
+        if not name.lower().startswith("dbwarden_")
+    }
+
+    for key, table in expected_tables.items():
+        existing = actual_tables.get(key)
+        if existing is None:
+            differences.append(
+                SchemaDifference(type="add_table", table_name=table.name)
+            )
+            continue
+
+        existing_columns = existing.column_names()
+        for column in table.columns:
+            if column.name.lower() not in existing_columns:
+                differences.append(
+                    SchemaDifference(
+                        type="add_column",
+                        table_name=table.name,
+                        column_name=column.name,
+                    )
+                )
+
+        columns = table.column_names()
+        for column in existing.columns:
+            if column.name.lower() not in columns:
+                differences.append(
+                    SchemaDifference(
+                        type="drop_column",
+                        table_name=existing.name,
+                        column_name=column.name,
+                    )
+                )
+
+    for key, table in actual_tables.items():
+        if key not in expected_tables:
+            differences.append(
+                SchemaDifference(type="drop_table", table_name=table.name)
+            )
+
+    return differences
+
+
+def _snapshot_path(directory: str, config: DbwardenConfig) -> str:
+    """Cache file of the schema snapshot of one database and schema."""
+    key = f"{config.sqlalchemy_url}\n{config.postgres_schema or ''}"
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(directory, CACHE_DIR, f"schema_{digest}.json")
+
+
+def _load_snapshot(cache_path: str, state: str) -> dict[str, TableSnapshot] | None:
+    """Read a saved schema; None if missing, stale or unreadable."""
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        if (
+            data.get("format") != SNAPSHOT_FORMAT_VERSION
+            or data.get("dbwarden_version") != DBWARDEN_VERSION
+            or data.get("state") != state
+        ):
+            return None
+        return {
+            table["name"]: TableSnapshot.from_dict(table) for table in data["tables"]
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_snapshot(
+    cache_path: str, state: str, tables: dict[str, TableSnapshot]
+) -> None:
+    """Write the schema snapshot cache file; failures are ignored."""
+    data = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "dbwarden_version": DBWARDEN_VERSION,
+        "state": state,
+        "tables": [asdict(table) for table in tables.values()],
+    }
+    write_json_atomic(cache_path, data, default=str)
@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+
+from dbwarden.constants import CACHE_DIR, DBWARDEN_VERSION
+from dbwarden.engine.cache_files import (
+    copy_file_atomic,
+    ensure_cache_dir,
+    temporary_path,
+    write_json_atomic,
+)
+from dbwarden.engine.schema_snapshot import reflect_schema
+from dbwarden.logging import get_logger
+from dbwarden.models import TableSnapshot
+
+SCRATCH_DATABASE_FILE = "scratch.db"
+SCRATCH_STATE_FILE = "scratch.json"
+SCRATCH_FORMAT_VERSION = 1
+
+
+def replay_into_sqlite(directory: str) -> dict[str, TableSnapshot]:
+    """
+    Build the schema the migrations of a directory produce, on SQLite.
+
+    The upgrade statements of the versioned migrations are executed in
+    dependency order on a scratch SQLite database with journaling and
+    syncing turned off, followed by the runs-always and runs-on-change
+    migrations, and the result is reflected. Unlike ``replay_migrations``
+    the statements are run by a real database, so any DDL SQLite supports
+    is understood.
+
+    The database after the versioned migrations is kept in
+    ``<migrations_dir>/.dbwarden_cache`` together with the files it was
+    built from, so only migrations added since are executed. Seed
+    migrations hold data and are skipped. Statements SQLite rejects, e.g.
+    PostgreSQL-only DDL, are logged and skipped.
+
+    Args:
+        directory: Path to migrations directory.
+
+    Returns:
+        dict[str, TableSnapshot]: Tables by name, in name order.
+
+    Raises:
+        MigrationDependencyError: If dependencies are missing or circular.
+    """
+    from dbwarden.engine.parse_cache import get_migration_cache
+    from dbwarden.engine.version import (
+        get_runs_always_filepaths,
+        get_runs_on_change_filepaths,
+        resolve_migration_order,
+    )
+
+    cache = get_migration_cache(directory)
+    order = resolve_migration_order(directory, applied_versions=set())
+    files = [
+        [os.path.basename(filepath), cache.get(filepath).checksum]
+        for _, filepath, _, _ in order
+    ]
+
+    cache_dir = os.path.join(directory, CACHE_DIR)
+    database_path = os.path.join(cache_dir, SCRATCH_DATABASE_FILE)
+    state_path = os.path.join(cache_dir, SCRATCH_STATE_FILE)
+    ensure_cache_dir(cache_dir)
+
+    work_path = temporary_path(database_path, ".db")
+    replayed = _cached_prefix(state_path, database_path, files)
+    if replayed:
+        shutil.copyfile(database_path, work_path)
+    elif os.path.exists(work_path):
+        os.remove(work_path)
+
+    engine = _scratch_engine(work_path)
+    try:
+        with engine.connect() as connection:
+            for _, filepath, _, is_seed in order[replayed:]:
+                if not is_seed:
+                    _execute(
+                        connection, filepath, cache.get(filepath).upgrade_statements
+                    )
+
+        if replayed < len(files) or not os.path.exists(database_path):
+            _save_database(work_path, database_path, state_path, files)
+
+        repeatables = get_runs_always_filepaths(directory)
+        repeatables += get_runs_on_change_filepaths(directory)
+        with engine.connect() as connection:
+            for filepath in repeatables:
+                _execute(connection, filepath, cache.get(filepath).upgrade_statements)
+            tables = reflect_schema(connection)
+    finally:
+        engine.dispose()
+        os.remove(work_path)
+
+    cache.save()
+    return tables
+
+
+def _scratch_engine(path: str) -> Engine:
+    """Engine for a scratch SQLite file, tuned for speed over durability."""
+    engine = create_engine(
+        f"sqlite:///{path}", poolclass=NullPool, isolation_level="AUTOCOMMIT"
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=OFF")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    return engine
+
+
+def _execute(connection: Connection, filepath: str, statements: list[str]) -> None:
+    """Run the statements of a migration, skipping those SQLite rejects."""
+    for statement in statements:
+        try:
+            connection.exec_driver_sql(statement)
+        except DBAPIError as e:
+            get_logger().warning(
+                f"Skipped statement of {os.path.basename(filepath)} on the "
+                f"scratch SQLite database: {e.orig}"
+            )
+
+
+def _cached_prefix(state_path: str, database_path: str, files: list[list[str]]) -> int:
+    """How many of ``files`` the cached scratch database was built from."""
+    try:
+        with open(state_path, "r") as f:
+            data = json.load(f)
+        cached_files = data["files"]
+        if (
+            data.get("format") != SCRATCH_FORMAT_VERSION
+            or data.get("dbwarden_version") != DBWARDEN_VERSION
+            or files[: len(cached_files)] != cached_files
+            or not os.path.exists(database_path)
+        ):
+            return 0
+        return len(cached_files)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return 0
+
+
+def _save_database(
+    work_path: str, database_path: str, state_path: str, files: list[list[str]]
+) -> None:
+    """Keep a copy of the scratch database as the cache; failures are ignored."""
+    data = {
+        "format": SCRATCH_FORMAT_VERSION,
+        "dbwarden_version": DBWARDEN_VERSION,
+        "files": files,
+    }
+    # The state is removed first, so a crash cannot pair it with
+    # a database built from other files.
+    try:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+    except OSError:
+        return
+    if copy_file_atomic(work_path, database_path):
+        write_json_atomic(state_path, data)
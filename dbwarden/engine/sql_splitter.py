@@ -0,0 +1,221 @@
+import re
+from typing import Callable, Iterable, Iterator, Optional
+
+from dbwarden.constants import DEFAULT_DELIMITER
+
+UPGRADE_MARKER = "-- upgrade"
+ROLLBACK_MARKER = "-- rollback"
+
+_NORMAL = 0
+_QUOTED = 1
+_DOLLAR_QUOTED = 2
+_BLOCK_COMMENT = 3
+
+
+def _build_scanner(delimiter: str) -> re.Pattern:
+    """Build the pattern that finds the significant tokens in SQL code."""
+    return re.compile(
+        "|".join(
+            [
+                re.escape(delimiter),
+                "'",
+                '"',
+                "--",
+                r"/\*",
+                r"\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$",
+                # A line break before a blank, comment or marker line, or
+                # the end of the text; other line breaks are plain code.
+                r"\n(?=[^\S\n]*(?:--|\n|\Z))",
+            ]
+        )
+    )
+
+
+class StatementSplitter:
+    """
+    Streaming splitter for the statements of a migration file.
+
+    Text is fed in chunks of any size. The splitter jumps between
+    significant tokens, found by one pass of a compiled scanner over the
+    buffered text, instead of inspecting every character. It tracks
+    single and double quotes, dollar quotes (``$$``/``$tag$``) and block
+    comments, and ends a statement at the delimiter or at a blank line
+    outside of them. Only complete lines are processed, so every token is
+    seen whole regardless of where chunks are cut; work is linear in the
+    size of the input.
+
+    ``-- upgrade`` and ``-- rollback`` lines switch the current section and
+    ``--`` comments are dropped. Lines before the first section marker are
+    passed to ``on_header_line`` and produce no statements.
+
+    Backslash escapes inside string literals are not recognised.
+    """
+
+    def __init__(
+        self,
+        delimiter: str = DEFAULT_DELIMITER,
+        on_header_line: Optional[Callable[[str], None]] = None,
+    ):
+        self.section: Optional[str] = None
+        self.on_header_line = on_header_line
+        self._buffer = ""
+        self._parts: list[str] = []
+        self._mode = _NORMAL
+        self._closing = ""
+        self._line_start = True
+        self.set_delimiter(delimiter)
+
+    def set_delimiter(self, delimiter: str) -> None:
+        """Change the statement delimiter for the text that follows."""
+        self.delimiter = delimiter
+        self._scanner = _build_scanner(delimiter)
+
+    def feed(self, text: str) -> Iterator[tuple[str, str]]:
+        """
+        Feed a chunk of text.
+
+        Args:
+            text: The next chunk of the migration file.
+
+        Yields:
+            tuple[str, str]: (section marker, statement) for every statement
+                completed by the chunk.
+        """
+        self._buffer += text
+        end = self._buffer.rfind("\n") + 1
+        if end:
+            yield from self._process(end)
+            self._buffer = self._buffer[end:]
+
+    def close(self) -> Iterator[tuple[str, str]]:
+        """
+        Process the remaining text and flush the last statement.
+
+        Yields:
+            tuple[str, str]: (section marker, statement) for the remaining
+                statements.
+        """
+        yield from self._process(len(self._buffer))
+        self._buffer = ""
+        yield from self._flush()
+
+    def _flush(self) -> Iterator[tuple[str, str]]:
+        """Emit the buffered statement, if it has any content."""
+        statement = "".join(self._parts).strip()
+        self._parts.clear()
+        if statement and self.section is not None:
+            yield self.section, statement
+
+    def _process(self, end: int) -> Iterator[tuple[str, str]]:
+        """Split ``self._buffer[:end]``, which ends at a line boundary."""
+        buf = self._buffer
+        parts = self._parts
+        pos = 0
+
+        while pos < end:
+            if self._mode != _NORMAL:
+                close = buf.find(self._closing, pos, end)
+                if close == -1:
+                    parts.append(buf[pos:end])
+                    pos = end
+                    continue
+
+                close += len(self._closing)
+                if (
+                    self._mode == _QUOTED
+                    and close < end
+                    and buf[close] == self._closing
+                ):
+                    parts.append(buf[pos : close + 1])
+                    pos = close + 1
+                    continue
+
+                parts.append(buf[pos:close])
+                pos = close
+                self._mode = _NORMAL
+                self._line_start = False
+                continue
+
+            if self._line_start:
+                line_end = buf.find("\n", pos, end)
+                if line_end == -1:
+                    line_end = end
+                stripped = buf[pos:line_end].strip()
+                skip = True
+                if stripped == UPGRADE_MARKER or stripped == ROLLBACK_MARKER:
+                    yield from self._flush()
+                    self.section = stripped
+                elif self.section is None:
+                    if self.on_header_line is not None:
+                        self.on_header_line(stripped)
+                elif not stripped:
+                    yield from self._flush()
+                elif not stripped.startswith("--"):
+                    skip = False
+                if skip:
+                    pos = line_end + 1
+                    continue
+                self._line_start = False
+
+            # Lines of code are scanned in a single pass, up to the next
+            # quote, comment, or line that needs the checks above.
+            for match in self._scanner.finditer(buf, pos, end):
+                token = match.group()
+                start, token_end = match.span()
+
+                if token == "\n":
+                    parts.append(buf[pos:token_end])
+                    pos = token_end
+                    self._line_start = True
+                    break
+                if token == self.delimiter:
+                    parts.append(buf[pos:start])
+                    yield from self._flush()
+                    pos = token_end
+                    continue
+                if token == "--":
+                    parts.append(buf[pos:start])
+                    parts.append("\n")
+                    line_end = buf.find("\n", token_end, end)
+                    pos = end if line_end == -1 else line_end + 1
+                    self._line_start = True
+                    break
+
+                parts.append(buf[pos:token_end])
+                pos = token_end
+                if token == "/*":
+                    self._mode = _BLOCK_COMMENT
+                    self._closing = "*/"
+                elif token.startswith("$"):
+                    self._mode = _DOLLAR_QUOTED
+                    self._closing = token
+                else:
+                    self._mode = _QUOTED
+                    self._closing = token
+                break
+            else:
+                parts.append(buf[pos:end])
+                pos = end
+
+
+def split_statements(
+    chunks: Iterable[str],
+    delimiter: str = DEFAULT_DELIMITER,
+    on_header_line: Optional[Callable[[str], None]] = None,
+) -> Iterator[tuple[str, str]]:
+    """
+    Split migration text into statements.
+
+    Args:
+        chunks: The migration text, whole or in chunks.
+        delimiter: Statement delimiter.
+        on_header_line: Called with every stripped line before the first
+            section marker.
+
+    Yields:
+        tuple[str, str]: (section marker, statement) in file order.
+    """
+    splitter = StatementSplitter(delimiter, on_header_line)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
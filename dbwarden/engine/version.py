@@ -120,10 +120,10 @@ def get_runs_on_change_filepaths(
     Returns:
         list[str]: List of file paths for runs-on-change migrations.
     """
-    from dbwarden.engine.checksum import calculate_checksum
-    from dbwarden.repositories import (
-        get_existing_runs_on_change_filenames_to_checksums,
-    )
+    if changed_only:
+        return [
+            filepath for filepath, _ in get_changed_runs_on_change_migrations(directory)
+        ]
 
     filepaths = []
 
@@ -134,28 +134,64 @@ def get_runs_on_change_filepaths(
         match = RUNS_ON_CHANGE_PATTERN.match(filename)
         if match:
             filepath = os.path.join(directory, filename)
-            if changed_only:
-                existing_checksums = (
-                    get_existing_runs_on_change_filenames_to_checksums()
-                )
-                if filename in existing_checksums:
-                    with open(filepath, "r") as f:
-                        content = f.read()
-                    from dbwarden.engine.file_parser import parse_upgrade_statements
-
-                    statements = parse_upgrade_statements(filepath)
-                    current_checksum = calculate_checksum(statements)
-                    existing_checksum = existing_checksums[filename]
-                    if current_checksum != existing_checksum:
-                        filepaths.append(filepath)
-                else:
-                    filepaths.append(filepath)
-            else:
-                filepaths.append(filepath)
+            filepaths.append(filepath)
 
     return filepaths
 
 
+def get_changed_runs_on_change_migrations(
+    directory: str,
+) -> list[tuple[str, list[str]]]:
+    """
+    Get runs-on-change (ROC__) migrations that are new or changed since last run.
+
+    Stored checksums are fetched with a single query and every file is read
+    and parsed once, so the parsed statements can be executed directly. A
+    checksum recorded by an earlier version, which split statements
+    differently, still counts as unchanged.
+
+    Args:
+        directory: Path to migrations directory.
+
+    Returns:
+        list[tuple]: [(filepath, upgrade_statements), ...] for new or changed files.
+    """
+    from dbwarden.engine.file_parser import calculate_legacy_checksum
+    from dbwarden.engine.parse_cache import get_migration_cache
+    from dbwarden.repositories import (
+        get_existing_runs_on_change_filenames_to_checksums,
+    )
+
+    if not os.path.exists(directory):
+        return []
+
+    filenames = [
+        filename
+        for filename in sorted(os.listdir(directory))
+        if RUNS_ON_CHANGE_PATTERN.match(filename)
+    ]
+    if not filenames:
+        return []
+
+    existing_checksums = get_existing_runs_on_change_filenames_to_checksums()
+
+    cache = get_migration_cache(directory)
+    changed: list[tuple[str, list[str]]] = []
+    for filename in filenames:
+        filepath = os.path.join(directory, filename)
+        migration = cache.get(filepath)
+        stored = existing_checksums.get(filename)
+        if stored == migration.checksum:
+            continue
+        if stored is not None and stored == calculate_legacy_checksum(filepath):
+            # Recorded by a version that split statements differently.
+            continue
+        changed.append((filepath, cache.get_upgrade_statements(filepath)))
+    cache.save()
+
+    return changed
+
+
 def get_all_repeatable_filepaths(directory: str) -> dict[str, list[str]]:
     """
     Get all repeatable migration file paths (both RA__ and ROC__).
@@ -208,22 +244,24 @@ def get_all_migrations_with_metadata(
     Returns:
         list[tuple]: [(version, filepath, depends_on, is_seed), ...]
     """
-    from dbwarden.engine.file_parser import parse_migration_header
+    from dbwarden.engine.parse_cache import get_migration_cache
 
     migrations: list[tuple[str, str, list[str], bool]] = []
 
     if not os.path.exists(directory):
         return []
 
+    cache = get_migration_cache(directory)
     for filename in sorted(os.listdir(directory)):
         match = MIGRATION_PATTERN.match(filename)
         if match:
             version = match.group(1)
             filepath = os.path.join(directory, filename)
-            metadata = parse_migration_header(filepath)
+            metadata = cache.get(filepath).metadata
             migrations.append(
                 (version, filepath, metadata.depends_on, metadata.is_seed)
             )
+    cache.save()
 
     return migrations
 
@@ -240,39 +278,25 @@ def resolve_migration_order(
 
     Returns:
         list[tuple]: [(version, filepath, depends_on, is_seed), ...] in execution order.
+
+    Raises:
+        MigrationDependencyError: If dependencies are missing or circular.
     """
+    from dbwarden.engine.dependency_graph import MigrationGraph
+
     all_migrations = get_all_migrations_with_metadata(directory)
 
-    pending = [
-        (v, fp, deps, seed)
-        for v, fp, deps, seed in all_migrations
-        if v not in applied_versions
-    ]
+    pending = {
+        migration[0]: migration
+        for migration in all_migrations
+        if migration[0] not in applied_versions
+    }
 
-    resolved: list[tuple[str, str, list[str], bool]] = []
-    remaining = pending.copy()
-    iterations = 0
-    max_iterations = len(pending) * 2
-
-    while remaining and iterations < max_iterations:
-        iterations += 1
-        for migration in remaining[:]:
-            version, filepath, deps, seed = migration
-            deps_met = all(
-                d in applied_versions or d in [m[0] for m in resolved] for d in deps
-            )
-            if deps_met:
-                resolved.append(migration)
-                remaining.remove(migration)
-
-    if remaining:
-        unresolved_versions = [m[0] for m in remaining]
-        raise ValueError(
-            f"Cannot resolve migration dependencies. Unresolved migrations: {unresolved_versions}. "
-            f"Missing dependencies for: {[m[0] for m in remaining if not all(d in applied_versions or d in [mm[0] for mm in resolved] for d in m[2])]}"
-        )
+    graph = MigrationGraph()
+    for version, _, deps, _ in pending.values():
+        graph.add(version, deps)
 
-    return resolved
+    return [pending[v] for v in graph.topological_order(satisfied=applied_versions)]
 
 
 def parse_version_string(version: str) -> tuple[int, ...]:
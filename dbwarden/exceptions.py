@@ -44,3 +44,17 @@ class NoMigrationsError(DBWardenError):
     """Raised when no migrations are found."""
 
     pass
+
+
+class MigrationDependencyError(DBWardenError):
+    """Raised when migration dependencies are missing or circular."""
+
+    def __init__(
+        self,
+        message: str,
+        cycle: list[str] | None = None,
+        missing: dict[str, list[str]] | None = None,
+    ):
+        super().__init__(message)
+        self.cycle = cycle or []
+        self.missing = missing or {}
@@ -251,6 +251,10 @@ class DBWardenLogger:
         """Log database connection initialization."""
         self.info(f"Database connection initialized: {db_type}")
 
+    def log_execution_mode(self, mode: str) -> None:
+        """Log whether migrations run through the sync or asyncio engine."""
+        self.debug(f"Execution mode: {mode}")
+
     def log_pending_migrations(self, migrations: list[str]) -> None:
         """Log list of pending migrations."""
         if migrations:
@@ -300,20 +304,21 @@ class DBWardenLogger:
 _global_logger: Optional[DBWardenLogger] = None
 
 
-def get_logger(verbose: bool = False) -> DBWardenLogger:
+def get_logger(verbose: Optional[bool] = None) -> DBWardenLogger:
     """
     Get the global DBWarden logger instance.
 
     Args:
-        verbose: If True, sets logger to DEBUG level.
+        verbose: If True, sets logger to DEBUG level. If None, the current
+            verbosity is kept (INFO for a new logger).
 
     Returns:
         DBWardenLogger: The global logger instance.
     """
     global _global_logger
     if _global_logger is None:
-        _global_logger = DBWardenLogger(verbose=verbose)
-    elif _global_logger.verbose != verbose:
+        _global_logger = DBWardenLogger(verbose=bool(verbose))
+    elif verbose is not None and _global_logger.verbose != verbose:
         _global_logger.set_verbose(verbose)
     return _global_logger
 
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
@@ -80,3 +80,133 @@ class SchemaDifference:
     table_name: str
     column_name: str | None = None
     sql: str = ""
+
+
+@dataclass
+class ColumnSnapshot:
+    """
+    A column as reflected from the database.
+
+    Attributes:
+        name: Column name.
+        type: Column type, as rendered by SQLAlchemy.
+        nullable: Whether the column accepts NULL.
+        default: Server default expression, if any.
+    """
+
+    name: str
+    type: str
+    nullable: bool
+    default: str | None = None
+
+
+@dataclass
+class IndexSnapshot:
+    """
+    An index as reflected from the database.
+
+    Attributes:
+        name: Index name.
+        columns: Indexed columns, in index order.
+        unique: Whether the index is unique.
+    """
+
+    name: str | None
+    columns: list[str]
+    unique: bool = False
+
+
+@dataclass
+class ForeignKeySnapshot:
+    """
+    A foreign key as reflected from the database.
+
+    Attributes:
+        name: Constraint name.
+        columns: Referencing columns.
+        referred_table: Referenced table.
+        referred_columns: Referenced columns.
+    """
+
+    name: str | None
+    columns: list[str]
+    referred_table: str
+    referred_columns: list[str]
+
+
+@dataclass
+class TableSnapshot:
+    """
+    The reflected structure of one table.
+
+    Attributes:
+        name: Table name.
+        columns: Columns in table order.
+        indexes: Indexes on the table.
+        foreign_keys: Foreign keys of the table.
+    """
+
+    name: str
+    columns: list[ColumnSnapshot] = field(default_factory=list)
+    indexes: list[IndexSnapshot] = field(default_factory=list)
+    foreign_keys: list[ForeignKeySnapshot] = field(default_factory=list)
+
+    def column_names(self) -> set[str]:
+        """Lowercase names of the table's columns."""
+        return {column.name.lower() for column in self.columns}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TableSnapshot":
+        """Rebuild a snapshot from its ``dataclasses.asdict()`` form."""
+        return cls(
+            name=data["name"],
+            columns=[ColumnSnapshot(**column) for column in data["columns"]],
+            indexes=[IndexSnapshot(**index) for index in data["indexes"]],
+            foreign_keys=[ForeignKeySnapshot(**fk) for fk in data["foreign_keys"]],
+        )
+
+
+@dataclass
+class TargetResult:
+    """
+    Outcome of migrating one target with ``migrate --all-targets``.
+
+    Attributes:
+        name: Name of the target.
+        message: Outcome message, as printed by a single-target migrate.
+        duration: Wall time spent on the target, in seconds.
+        error: Error message if the target failed.
+    """
+
+    name: str
+    message: str
+    duration: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the target was migrated successfully."""
+        return self.error is None
+
+
+@dataclass
+class LockInfo:
+    """
+    State of the migration lock row.
+
+    Attributes:
+        locked: Whether the lock is held.
+        holder: Identity of the holder, as ``host:pid:run``.
+        acquired_at: When the lock was acquired.
+        expires_at: When the holder's lease runs out unless renewed; None
+            for locks the database releases itself (advisory locks).
+    """
+
+    locked: bool
+    holder: str | None = None
+    acquired_at: datetime | None = None
+    expires_at: datetime | None = None
+
+    def expired(self, now: datetime) -> bool:
+        """Whether the lease has run out and the lock can be taken over."""
+        return self.expires_at is not None and self.expires_at < now
@@ -6,14 +6,25 @@ from dbwarden.repositories.migrations_repo import (
     get_latest_versions,
     get_migration_records,
     get_migrated_versions,
+    get_migrations_state,
+    get_next_execution_seq,
     migrations_table_exists,
+    record_migrations,
     run_migration,
     run_repeatable_migration,
+    run_streaming_migration,
+)
+from dbwarden.repositories.fingerprint_repo import (
+    create_fingerprint_table_if_not_exists,
+    get_stored_fingerprint,
+    store_fingerprint,
 )
 from dbwarden.repositories.lock_repo import (
     acquire_lock,
     check_lock,
     create_lock_table_if_not_exists,
+    get_lock_backend,
+    get_lock_info,
     release_lock,
 )
 
@@ -25,11 +36,20 @@ __all__ = [
     "get_latest_versions",
     "get_migration_records",
     "get_migrated_versions",
+    "get_migrations_state",
+    "get_next_execution_seq",
     "migrations_table_exists",
+    "record_migrations",
     "run_migration",
     "run_repeatable_migration",
+    "run_streaming_migration",
+    "create_fingerprint_table_if_not_exists",
+    "get_stored_fingerprint",
+    "store_fingerprint",
     "acquire_lock",
     "check_lock",
     "create_lock_table_if_not_exists",
+    "get_lock_backend",
+    "get_lock_info",
     "release_lock",
 ]
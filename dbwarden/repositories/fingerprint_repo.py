@@ -0,0 +1,50 @@
+from sqlalchemy.exc import DBAPIError
+
+from dbwarden.database.connection import get_db_connection
+from dbwarden.database.queries import QueryMethod, queries_for
+
+
+def create_fingerprint_table_if_not_exists() -> None:
+    """Create the fingerprint table if it doesn't exist."""
+    with get_db_connection() as connection:
+        connection.execute(
+            queries_for(connection).statement(QueryMethod.CREATE_FINGERPRINT_TABLE)
+        )
+
+
+def get_stored_fingerprint() -> str | None:
+    """
+    Get the migrations fingerprint recorded by the last complete migrate.
+
+    Returns:
+        str | None: The fingerprint, or None if none is recorded.
+    """
+    try:
+        with get_db_connection() as connection:
+            result = connection.execute(
+                queries_for(connection).statement(QueryMethod.GET_FINGERPRINT)
+            )
+            return result.scalar_one_or_none()
+    except DBAPIError:
+        # The fingerprint table has not been created yet.
+        return None
+
+
+def store_fingerprint(fingerprint: str | None) -> None:
+    """
+    Record the fingerprint of a fully applied migrations directory.
+
+    Args:
+        fingerprint: The fingerprint, or None to clear the recorded one.
+    """
+    create_fingerprint_table_if_not_exists()
+
+    with get_db_connection() as connection:
+        queries = queries_for(connection)
+        if fingerprint is None:
+            connection.execute(queries.statement(QueryMethod.DELETE_FINGERPRINT))
+        else:
+            connection.execute(
+                queries.statement(QueryMethod.UPSERT_FINGERPRINT),
+                parameters={"fingerprint": fingerprint},
+            )
@@ -1,48 +1,403 @@
-from typing import Optional
+import hashlib
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import text
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
 
+from dbwarden.config import get_config
+from dbwarden.constants import LOCK_LEASE_DURATION
 from dbwarden.database.connection import get_db_connection
-from dbwarden.database.queries import SQL_QUERIES, QueryMethod
+from dbwarden.database.queries import QueryMethod, queries_for
+from dbwarden.database.session import get_active_session
+from dbwarden.models import LockInfo
 
 
-def get_query(method: QueryMethod, **kwargs) -> str:
-    """Get a SQL query by method."""
-    return SQL_QUERIES.get(method, "")
+def make_lock_holder() -> str:
+    """Identify this process as a lock holder, as ``host:pid:run``."""
+    holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    return holder[-255:]
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, as stored in the lock row."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class LockBackend(ABC):
+    """
+    Strategy for taking the migration lock on one database.
+
+    Every method runs on a connection supplied by the caller. Backends
+    based on session-level locks must be released on the same connection
+    they were acquired on, so callers keep one connection for the whole
+    migration, e.g. by holding a ``get_db_session()``.
+
+    Attributes:
+        name: Name of the backend, reported in lock wait metrics.
+        holder: Identity written to the lock row when the lock is taken.
+            A backend without a holder releases the lock whoever holds it.
+        renews_lease: Whether the lock expires unless ``renew`` is called
+            periodically while it is held.
+    """
+
+    name: str
+    renews_lease = False
+
+    def __init__(self, holder: str | None = None):
+        self.holder = holder
+        self.taken_over_from: str | None = None
+
+    @abstractmethod
+    def try_acquire(self, connection: Connection) -> bool:
+        """Take the lock without waiting; return whether it was taken."""
+
+    def renew(self, connection: Connection) -> bool:
+        """Extend the lease; return whether the lock is still held."""
+        return True
+
+    @abstractmethod
+    def release(self, connection: Connection) -> bool:
+        """Release the lock; return whether it was held."""
+
+    @abstractmethod
+    def is_locked(self, connection: Connection) -> bool:
+        """Return whether any process holds the lock."""
+
+
+class TableLockBackend(LockBackend):
+    """
+    Lease stored in the ``dbwarden_lock`` row, taken by compare-and-set.
+
+    The lock is taken by a single conditional ``UPDATE ... WHERE locked =
+    FALSE``, which the database applies atomically, so two processes can
+    never both see the update succeed. Used for SQLite, where the update
+    runs under the database write lock, and for any dialect without
+    native advisory locks.
+
+    Nothing releases the row if the holder dies, so the lock is a lease:
+    it expires ``lease_duration`` seconds after it was taken or last
+    renewed, and an expired lease can be taken over by the next process.
+    The takeover is a compare-and-set on the previous holder, so only one
+    waiting process wins it. Acquiring a free lock takes one statement.
+    """
+
+    name = "table"
+    renews_lease = True
+
+    def __init__(
+        self,
+        holder: str | None = None,
+        lease_duration: float = LOCK_LEASE_DURATION,
+    ):
+        super().__init__(holder)
+        self.lease_duration = lease_duration
+
+    def try_acquire(self, connection: Connection) -> bool:
+        queries = queries_for(connection)
+        self.holder = self.holder or make_lock_holder()
+        now = _utcnow()
+        parameters = {
+            "holder": self.holder,
+            "expires_at": now + timedelta(seconds=self.lease_duration),
+        }
+
+        result = connection.execute(
+            queries.statement(QueryMethod.ACQUIRE_LOCK), parameters=parameters
+        )
+        if result.rowcount == 1:
+            return True
+
+        previous = self.info(connection)
+        if previous is None:
+            connection.execute(queries.statement(QueryMethod.INSERT_LOCK_ROW))
+            result = connection.execute(
+                queries.statement(QueryMethod.ACQUIRE_LOCK), parameters=parameters
+            )
+            return result.rowcount == 1
+
+        if not previous.expired(now):
+            return False
+
+        result = connection.execute(
+            queries.statement(QueryMethod.TAKE_OVER_LOCK),
+            parameters={**parameters, "now": now, "previous_holder": previous.holder},
+        )
+        if result.rowcount != 1:
+            return False
+
+        self.taken_over_from = previous.holder or "unknown holder"
+        return True
+
+    def renew(self, connection: Connection) -> bool:
+        result = connection.execute(
+            queries_for(connection).statement(QueryMethod.RENEW_LOCK),
+            parameters={
+                "holder": self.holder,
+                "expires_at": _utcnow() + timedelta(seconds=self.lease_duration),
+            },
+        )
+        return result.rowcount == 1
+
+    def release(self, connection: Connection) -> bool:
+        if self.holder is None:
+            result = connection.execute(
+                queries_for(connection).statement(QueryMethod.FORCE_RELEASE_LOCK)
+            )
+        else:
+            result = connection.execute(
+                queries_for(connection).statement(QueryMethod.RELEASE_LOCK),
+                parameters={"holder": self.holder},
+            )
+        return result.rowcount == 1
+
+    def is_locked(self, connection: Connection) -> bool:
+        info = self.info(connection)
+        return info is not None and info.locked and not info.expired(_utcnow())
+
+    def info(self, connection: Connection) -> LockInfo | None:
+        """Read the lock row, or None if it does not exist yet."""
+        row = connection.execute(
+            queries_for(connection).statement(QueryMethod.GET_LOCK_INFO)
+        ).first()
+        if row is None:
+            return None
+        return LockInfo(
+            locked=bool(row.locked),
+            holder=row.holder,
+            acquired_at=row.acquired_at,
+            expires_at=row.expires_at,
+        )
+
+    def _mark_held(self, connection: Connection) -> None:
+        """Record a lock taken by other means in the lock row."""
+        self.holder = self.holder or make_lock_holder()
+        connection.execute(
+            queries_for(connection).statement(QueryMethod.MARK_LOCK_HELD),
+            parameters={"holder": self.holder},
+        )
+
+
+class PostgresAdvisoryLockBackend(TableLockBackend):
+    """
+    PostgreSQL session-level advisory lock.
+
+    The lock is released by the server when the holding connection goes
+    away, so a crashed process never leaves it behind. The lock row is
+    still updated so that ``lock-status`` reports the lock.
+    """
+
+    name = "pg_advisory_lock"
+    renews_lease = False
+
+    def __init__(self, scope: str = "", holder: str | None = None):
+        super().__init__(holder)
+        self.key = _lock_key(scope)
+
+    def try_acquire(self, connection: Connection) -> bool:
+        acquired = connection.execute(
+            queries_for(connection).statement(QueryMethod.PG_TRY_ADVISORY_LOCK),
+            parameters={"key": self.key},
+        ).scalar()
+        if acquired:
+            self._mark_held(connection)
+        return bool(acquired)
+
+    def renew(self, connection: Connection) -> bool:
+        return True
+
+    def release(self, connection: Connection) -> bool:
+        super().release(connection)
+        released = connection.execute(
+            queries_for(connection).statement(QueryMethod.PG_ADVISORY_UNLOCK),
+            parameters={"key": self.key},
+        ).scalar()
+        return bool(released)
+
+    def is_locked(self, connection: Connection) -> bool:
+        return bool(
+            connection.execute(
+                queries_for(connection).statement(QueryMethod.PG_ADVISORY_LOCK_HELD),
+                parameters={"key": self.key},
+            ).scalar()
+        )
+
+
+class MySQLNamedLockBackend(TableLockBackend):
+    """
+    MySQL/MariaDB named lock taken with ``GET_LOCK``.
+
+    Like PostgreSQL advisory locks, the lock belongs to the connection and
+    is dropped by the server if the process dies.
+    """
+
+    name = "mysql_get_lock"
+    renews_lease = False
+
+    def __init__(self, scope: str = "", holder: str | None = None):
+        super().__init__(holder)
+        self.lock_name = f"dbwarden:{scope}" if scope else "dbwarden"
+
+    def try_acquire(self, connection: Connection) -> bool:
+        acquired = connection.execute(
+            queries_for(connection).statement(QueryMethod.MYSQL_GET_LOCK),
+            parameters={"name": self.lock_name},
+        ).scalar()
+        if acquired == 1:
+            self._mark_held(connection)
+        return acquired == 1
+
+    def renew(self, connection: Connection) -> bool:
+        return True
+
+    def release(self, connection: Connection) -> bool:
+        super().release(connection)
+        released = connection.execute(
+            queries_for(connection).statement(QueryMethod.MYSQL_RELEASE_LOCK),
+            parameters={"name": self.lock_name},
+        ).scalar()
+        return released == 1
+
+    def is_locked(self, connection: Connection) -> bool:
+        return bool(
+            connection.execute(
+                queries_for(connection).statement(QueryMethod.MYSQL_IS_USED_LOCK),
+                parameters={"name": self.lock_name},
+            ).scalar()
+        )
+
+
+def _lock_key(scope: str) -> int:
+    """Derive a stable, non-negative 63-bit advisory lock key for a scope."""
+    digest = hashlib.sha256(f"dbwarden:{scope}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+def get_lock_backend(
+    connection: Connection,
+    scope: str | None = None,
+    holder: str | None = None,
+) -> LockBackend:
+    """
+    Choose the best lock backend for a connection's database.
+
+    Args:
+        connection: Connection the lock will be taken on.
+        scope: Distinguishes locks sharing a database; defaults to the
+            PostgreSQL schema being migrated, so every schema is locked
+            independently.
+        holder: Identity recorded for the lock; generated on acquisition if
+            None. Releasing through a backend without a holder releases
+            the lock whoever holds it.
+
+    Returns:
+        LockBackend: Advisory lock on PostgreSQL, ``GET_LOCK`` on MySQL and
+            MariaDB, and the compare-and-set lock row elsewhere.
+    """
+    if scope is None:
+        scope = _default_scope()
+
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return PostgresAdvisoryLockBackend(scope, holder)
+    if dialect in ("mysql", "mariadb"):
+        return MySQLNamedLockBackend(scope, holder)
+    return TableLockBackend(holder)
+
+
+def _default_scope() -> str:
+    """Lock scope of the active session's configuration, or warden.toml."""
+    session = get_active_session()
+    config = session.config if session is not None else get_config()
+    return config.postgres_schema or ""
 
 
 def create_lock_table_if_not_exists() -> None:
-    """Create the lock table if it doesn't exist."""
+    """
+    Create the lock table if it doesn't exist.
+
+    Lock tables created by earlier versions lack the lease columns, which
+    are added in place.
+    """
     with get_db_connection() as connection:
-        connection.execute(text(get_query(QueryMethod.CREATE_LOCK_TABLE)))
+        queries = queries_for(connection)
+        connection.execute(queries.statement(QueryMethod.CREATE_LOCK_TABLE))
 
+        columns = {
+            column["name"]
+            for column in inspect(connection).get_columns("dbwarden_lock")
+        }
+        if "holder" not in columns:
+            connection.execute(queries.statement(QueryMethod.ADD_LOCK_HOLDER_COLUMN))
+        if "expires_at" not in columns:
+            connection.execute(
+                queries.statement(QueryMethod.ADD_LOCK_EXPIRES_AT_COLUMN)
+            )
+
+
+def acquire_lock(backend: LockBackend | None = None) -> bool:
+    """
+    Attempt to acquire the migration lock without waiting.
+
+    Args:
+        backend: Lock backend; chosen from the database dialect if None.
+
+    Returns:
+        bool: True if the lock was acquired, False if it is held elsewhere.
+    """
+    with get_db_connection() as connection:
+        backend = backend or get_lock_backend(connection)
+        return backend.try_acquire(connection)
 
-def acquire_lock() -> bool:
-    """Attempt to acquire the migration lock."""
-    try:
-        with get_db_connection() as connection:
-            connection.execute(text(get_query(QueryMethod.ACQUIRE_LOCK)))
-        return True
-    except Exception:
-        return False
 
+def release_lock(backend: LockBackend | None = None) -> bool:
+    """
+    Release the migration lock.
 
-def release_lock() -> bool:
-    """Release the migration lock."""
+    Args:
+        backend: Lock backend; chosen from the database dialect if None.
+
+    Returns:
+        bool: True if a held lock was released.
+    """
+    with get_db_connection() as connection:
+        backend = backend or get_lock_backend(connection)
+        return backend.release(connection)
+
+
+def get_lock_info() -> LockInfo | None:
+    """
+    Read the state of the migration lock row.
+
+    Returns:
+        LockInfo | None: The lock row, or None if no lock was ever taken.
+    """
     try:
         with get_db_connection() as connection:
-            connection.execute(text(get_query(QueryMethod.RELEASE_LOCK)))
-        return True
-    except Exception:
-        return False
+            return TableLockBackend().info(connection)
+    except DBAPIError:
+        # The lock table has not been created yet.
+        return None
+
+
+def check_lock(backend: LockBackend | None = None) -> bool:
+    """
+    Check if migration lock is currently held.
 
+    Args:
+        backend: Lock backend; chosen from the database dialect if None.
 
-def check_lock() -> bool:
-    """Check if migration lock is currently held."""
+    Returns:
+        bool: True if the lock is held.
+    """
     try:
         with get_db_connection() as connection:
-            result = connection.execute(text(get_query(QueryMethod.CHECK_LOCK)))
-            locked = result.scalar_one_or_none()
-            return locked is True
-    except Exception:
+            backend = backend or get_lock_backend(connection)
+            return backend.is_locked(connection)
+    except DBAPIError:
+        # The lock table has not been created yet.
         return False
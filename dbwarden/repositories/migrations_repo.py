@@ -1,15 +1,22 @@
-from typing import Optional
+from itertools import islice
+from typing import Iterable, Optional
 
-from sqlalchemy import Result, Row, text
+from sqlalchemy import Result, Row, inspect, text
 
+from dbwarden.constants import SEED_BATCH_SIZE
 from dbwarden.database.connection import get_db_connection
-from dbwarden.database.queries import SQL_QUERIES, QueryMethod
+from dbwarden.database.session import get_active_session
+from dbwarden.database.queries import (
+    EXECUTION_SEQ_INDEX_NAME,
+    REPEATABLE_INDEX_NAME,
+    QueryMethod,
+    queries_for,
+)
 from dbwarden.models import MigrationRecord
 
-
-def get_query(method: QueryMethod, **kwargs) -> str:
-    """Get a SQL query by method."""
-    return SQL_QUERIES.get(method, "")
+# Drivers that send a query without parameters as a simple query, which
+# may hold several statements. asyncpg always prepares, so it cannot.
+MULTI_STATEMENT_DRIVERS = frozenset({"psycopg2", "psycopg"})
 
 
 def run_migration(
@@ -31,9 +38,9 @@ def run_migration(
             description = get_description_from_filename(filename)
             checksum = calculate_checksum(sql_statements)
 
-            connection.execute(
-                text(get_query(QueryMethod.INSERT_VERSION)),
-                parameters={
+            _insert_version(
+                connection,
+                {
                     "version": version,
                     "description": description,
                     "filename": filename,
@@ -43,18 +50,159 @@ def run_migration(
             )
         elif migration_operation == "rollback":
             connection.execute(
-                text(get_query(QueryMethod.DELETE_VERSION)),
+                queries_for(connection).statement(QueryMethod.DELETE_VERSION),
                 parameters={"version": version},
             )
 
 
+def run_streaming_migration(
+    sql_statements: Iterable[str],
+    version: Optional[str],
+    filename: str,
+    migration_type: str = "versioned",
+    batch_size: int = SEED_BATCH_SIZE,
+) -> int:
+    """
+    Execute statements from an iterable in batches and record the migration.
+
+    Statements are pulled ``batch_size`` at a time, so a generator over a
+    large seed file is never held in memory as a whole. They are executed
+    on the DBAPI cursor of the current transaction, skipping SQLAlchemy's
+    per-statement compilation; on PostgreSQL with a driver that accepts
+    several statements per query (see ``MULTI_STATEMENT_DRIVERS``) each
+    batch is sent as a single multi-statement execute. The checksum is
+    computed incrementally and matches ``calculate_checksum`` for the same
+    statements. Everything runs in one transaction.
+
+    Args:
+        sql_statements: Upgrade statements, typically a generator.
+        version: Migration version.
+        filename: Migration filename.
+        migration_type: Type of migration.
+        batch_size: Number of statements per batch.
+
+    Returns:
+        int: Number of statements executed.
+    """
+    from dbwarden.engine.checksum import StatementHasher
+    from dbwarden.engine.file_parser import get_description_from_filename
+
+    hasher = StatementHasher()
+    statements = hasher.consume(sql_statements)
+
+    with get_db_connection() as connection:
+        combine = (
+            connection.dialect.name == "postgresql"
+            and connection.dialect.driver in MULTI_STATEMENT_DRIVERS
+        )
+        cursor = connection.connection.cursor()
+
+        try:
+            while batch := list(islice(statements, batch_size)):
+                if combine:
+                    cursor.execute(";\n".join(batch))
+                else:
+                    for statement in batch:
+                        cursor.execute(statement)
+        finally:
+            cursor.close()
+
+        _insert_version(
+            connection,
+            {
+                "version": version,
+                "description": get_description_from_filename(filename),
+                "filename": filename,
+                "migration_type": migration_type,
+                "checksum": hasher.hexdigest(),
+            },
+        )
+
+    return hasher.count
+
+
+def _insert_version(connection, parameters: dict) -> None:
+    """
+    Record an applied migration.
+
+    The execution sequence number comes from the active session's
+    ``execution_seqs`` if it has one, since concurrent ``migrate --jobs``
+    workers would read the same ``MAX(execution_seq)``; otherwise the
+    database numbers the row.
+    """
+    session = get_active_session()
+    if session is None or session.execution_seqs is None:
+        connection.execute(
+            queries_for(connection).statement(QueryMethod.INSERT_VERSION),
+            parameters=parameters,
+        )
+        return
+
+    connection.execute(
+        queries_for(connection).statement(QueryMethod.INSERT_VERSION_AT_SEQ),
+        parameters={**parameters, "execution_seq": session.execution_seqs()},
+    )
+
+
+def get_next_execution_seq() -> int:
+    """Get the execution sequence number of the next recorded migration."""
+    with get_db_connection() as connection:
+        return connection.execute(
+            queries_for(connection).statement(QueryMethod.GET_NEXT_EXECUTION_SEQ)
+        ).scalar()
+
+
+def record_migrations(
+    migrations: Iterable[tuple[str, str, str]],
+    migration_type: str = "versioned",
+) -> int:
+    """
+    Record migrations as applied without executing them.
+
+    All rows are inserted with a single ``executemany`` in one transaction,
+    so either every migration is recorded or none is. Rows are inserted in
+    the order given and get consecutive execution sequence numbers.
+
+    Args:
+        migrations: ``(version, filename, checksum)`` of each migration.
+        migration_type: Type of the migrations.
+
+    Returns:
+        int: Number of migrations recorded.
+    """
+    from dbwarden.engine.file_parser import get_description_from_filename
+
+    parameters = [
+        {
+            "version": version,
+            "description": get_description_from_filename(filename),
+            "filename": filename,
+            "migration_type": migration_type,
+            "checksum": checksum,
+        }
+        for version, filename, checksum in migrations
+    ]
+    if not parameters:
+        return 0
+
+    with get_db_connection() as connection:
+        connection.execute(
+            queries_for(connection).statement(QueryMethod.INSERT_VERSION),
+            parameters,
+        )
+
+    return len(parameters)
+
+
 def fetch_latest_versioned_migration() -> Optional[MigrationRecord]:
     """Get the most recently applied versioned migration."""
     if not migrations_table_exists():
         return None
 
     with get_db_connection() as connection:
-        result = connection.execute(text(get_query(QueryMethod.GET_LATEST_VERSION)))
+        result = connection.execute(
+            queries_for(connection).statement(QueryMethod.GET_LATEST_VERSION)
+        )
         latest_migration = result.first()
 
     if not latest_migration:
@@ -71,16 +219,58 @@ def fetch_latest_versioned_migration() -> Optional[MigrationRecord]:
 
 
 def create_migrations_table_if_not_exists() -> None:
-    """Create the migrations table if it doesn't exist."""
+    """
+    Create the migrations table if it doesn't exist.
+
+    Repeatable migrations are upserted on a unique index over
+    ``(migration_type, filename)``, and history is ordered by the indexed
+    ``execution_seq`` column. Tables created by earlier versions are
+    upgraded in place:
+
+    - All but the latest row of any repeatable migration that was recorded
+      more than once are dropped before the unique index is created.
+    - ``execution_seq`` is added as a nullable column and numbered in
+      insertion order.
+
+    Once both indexes exist, this costs one reflection query per call.
+    """
     with get_db_connection() as connection:
-        connection.execute(text(get_query(QueryMethod.CREATE_MIGRATIONS_TABLE)))
+        queries = queries_for(connection)
+        connection.execute(queries.statement(QueryMethod.CREATE_MIGRATIONS_TABLE))
+
+        inspector = inspect(connection)
+        indexes = {
+            index["name"] for index in inspector.get_indexes("dbwarden_migrations")
+        }
+
+        if REPEATABLE_INDEX_NAME not in indexes:
+            connection.execute(
+                queries.statement(QueryMethod.DEDUPLICATE_REPEATABLE_MIGRATIONS)
+            )
+            connection.execute(queries.statement(QueryMethod.CREATE_REPEATABLE_INDEX))
+
+        if EXECUTION_SEQ_INDEX_NAME not in indexes:
+            columns = {
+                column["name"]
+                for column in inspector.get_columns("dbwarden_migrations")
+            }
+            if "execution_seq" not in columns:
+                connection.execute(
+                    queries.statement(QueryMethod.ADD_EXECUTION_SEQ_COLUMN)
+                )
+            connection.execute(queries.statement(QueryMethod.BACKFILL_EXECUTION_SEQ))
+            connection.execute(
+                queries.statement(QueryMethod.CREATE_EXECUTION_SEQ_INDEX)
+            )
 
 
 def migrations_table_exists() -> bool:
     """Check if migrations table exists."""
     with get_db_connection() as connection:
         result = connection.execute(
-            text(get_query(QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS))
+            queries_for(connection).statement(
+                QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS
+            )
         )
         return result.scalar_one_or_none() is not None
 
@@ -91,7 +281,9 @@ def get_migration_records() -> list[MigrationRecord]:
         return []
 
     with get_db_connection() as connection:
-        results = connection.execute(text(get_query(QueryMethod.GET_ALL_MIGRATIONS)))
+        results = connection.execute(
+            queries_for(connection).statement(QueryMethod.GET_ALL_MIGRATIONS)
+        )
         return [
             MigrationRecord(
                 order_executed=i,
@@ -106,35 +298,64 @@ def get_migration_records() -> list[MigrationRecord]:
         ]
 
 
+def get_migrations_state() -> str | None:
+    """
+    Summarise the applied migrations.
+
+    The summary changes whenever a migration is applied, re-applied or
+    rolled back, so it identifies the state of a schema that is only
+    changed through DBWarden.
+
+    Returns:
+        str | None: The summary, or None if the migrations table does not
+            exist.
+    """
+    if not migrations_table_exists():
+        return None
+
+    with get_db_connection() as connection:
+        row = connection.execute(
+            queries_for(connection).statement(QueryMethod.GET_MIGRATIONS_STATE)
+        ).one()
+    return f"{row.execution_seq}:{row.applied}:{row.applied_at}"
+
+
 def get_migrated_versions() -> list[str]:
     """Get all applied migration versions."""
     if not migrations_table_exists():
         return []
 
     with get_db_connection() as connection:
-        results = connection.execute(text(get_query(QueryMethod.GET_MIGRATED_VERSIONS)))
+        results = connection.execute(
+            queries_for(connection).statement(QueryMethod.GET_MIGRATED_VERSIONS)
+        )
         return [row.version for row in results.fetchall()]
 
 
 def get_latest_versions(
     limit: int | None = None, starting_version: str | None = None
 ) -> list[str]:
-    """Get recent migration versions."""
+    """
+    Get recently applied migration versions, most recent first.
+
+    Args:
+        limit: Number of versions to return.
+        starting_version: Return every version after this one instead.
+
+    Returns:
+        list[str]: Versions in reverse execution order.
+    """
     if limit:
         with get_db_connection() as connection:
             result = connection.execute(
-                text(
-                    f"SELECT version FROM dbwarden_migrations WHERE version IS NOT NULL ORDER BY applied_at DESC LIMIT :limit"
-                ),
+                queries_for(connection).statement(QueryMethod.GET_LATEST_VERSIONS),
                 parameters={"limit": limit},
             )
             return [row.version for row in result.fetchall()]
     elif starting_version:
         with get_db_connection() as connection:
             result = connection.execute(
-                text(
-                    "SELECT version FROM dbwarden_migrations WHERE version > :starting_version AND version IS NOT NULL ORDER BY applied_at ASC"
-                ),
+                queries_for(connection).statement(QueryMethod.GET_VERSIONS_AFTER),
                 parameters={"starting_version": starting_version},
             )
             return [row.version for row in result.fetchall()]
@@ -154,7 +375,7 @@ def get_existing_runs_on_change_filenames_to_checksums() -> dict[str, str]:
 
     with get_db_connection() as connection:
         results = connection.execute(
-            text(get_query(QueryMethod.GET_RUNS_ON_CHANGE_CHECKSUMS))
+            queries_for(connection).statement(QueryMethod.GET_RUNS_ON_CHANGE_CHECKSUMS)
         )
         return {row.filename: row.checksum for row in results.fetchall()}
 
@@ -171,7 +392,7 @@ def get_existing_runs_always_filenames() -> set[str]:
 
     with get_db_connection() as connection:
         results = connection.execute(
-            text(get_query(QueryMethod.GET_RUNS_ALWAYS_FILENAMES))
+            queries_for(connection).statement(QueryMethod.GET_RUNS_ALWAYS_FILENAMES)
         )
         return {row.filename for row in results.fetchall()}
 
@@ -182,10 +403,11 @@ def run_repeatable_migration(
     migration_type: str,
 ) -> None:
     """
-    Execute and update an existing repeatable migration record.
+    Execute a repeatable migration and record it.
 
-    Runs the SQL statements and updates the existing migration record
-    with a new checksum and applied_at timestamp.
+    Runs the SQL statements and upserts the migration record in a single
+    statement: the first run inserts it, later runs update its checksum
+    and applied_at timestamp.
 
     Args:
         sql_statements: List of SQL statements to execute.
@@ -203,7 +425,7 @@ def run_repeatable_migration(
             connection.execute(text(statement))
 
         connection.execute(
-            text(get_query(QueryMethod.UPSERT_REPEATABLE_MIGRATION)),
+            queries_for(connection).statement(QueryMethod.UPSERT_REPEATABLE_MIGRATION),
             parameters={
                 "description": description,
                 "filename": filename,
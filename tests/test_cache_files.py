@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+import threading
+
+from dbwarden.engine.cache_files import temporary_path, write_json_atomic
+
+
+class TestCacheFiles:
+    """Tests for writing cache files atomically."""
+
+    def test_write_json_atomic(self):
+        """Test the file is written whole and the directory is ignored by git."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = os.path.join(tmpdir, "cache", "data.json")
+
+            assert write_json_atomic(cache_path, {"a": [1, 2]}) == True
+            assert write_json_atomic(cache_path, {"b": object()}) == False
+
+            with open(cache_path) as f:
+                assert json.load(f) == {"a": [1, 2]}
+            assert sorted(os.listdir(os.path.dirname(cache_path))) == [
+                ".gitignore",
+                "data.json",
+            ]
+
+    def test_threads_use_their_own_temporary_files(self):
+        """Test concurrent writers of one cache file never share a work file."""
+        paths = []
+        # The threads are kept alive together, as idents of ended threads
+        # can be reused.
+        barrier = threading.Barrier(4)
+
+        def work():
+            paths.append(temporary_path("cache.json"))
+            barrier.wait()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(paths)) == 4
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import tempfile
+
+from dbwarden.engine.checksum import (
+    StatementHasher,
+    calculate_checksum,
+    calculate_file_checksum,
+)
+
+
+STATEMENTS = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY)",
+    "INSERT INTO users (id) VALUES (1)",
+    "INSERT INTO users (name) VALUES ('café')",
+]
+
+
+class TestChecksum:
+    """Tests for statement and file checksums."""
+
+    def test_checksum_matches_joined_statements(self):
+        """Test the digest is unchanged from hashing the joined statements."""
+        expected = hashlib.sha256(";".join(STATEMENTS).encode()).hexdigest()
+
+        assert calculate_checksum(STATEMENTS) == expected
+        assert calculate_checksum([]) == hashlib.sha256(b"").hexdigest()
+
+    def test_incremental_hasher(self):
+        """Test feeding statements one by one or through consume()."""
+        hasher = StatementHasher()
+        for statement in STATEMENTS:
+            hasher.update(statement)
+
+        consumer = StatementHasher()
+        assert list(consumer.consume(iter(STATEMENTS))) == STATEMENTS
+
+        assert hasher.hexdigest() == calculate_checksum(STATEMENTS)
+        assert consumer.hexdigest() == calculate_checksum(STATEMENTS)
+        assert consumer.count == 3
+
+    def test_update_bytes(self):
+        """Test raw bytes are hashed without separators."""
+        hasher = StatementHasher()
+        hasher.update_bytes(b"SELECT ")
+        hasher.update_bytes(memoryview(b"1"))
+
+        assert hasher.hexdigest() == hashlib.sha256(b"SELECT 1").hexdigest()
+
+    def test_file_checksum(self):
+        """Test a file is hashed from its raw bytes."""
+        content = b"-- upgrade\r\nSELECT 1;\r\n" * 50000
+
+        with tempfile.NamedTemporaryFile(suffix=".sql", delete=False) as f:
+            f.write(content)
+
+        try:
+            assert calculate_file_checksum(f.name) == (
+                hashlib.sha256(content).hexdigest()
+            )
+        finally:
+            os.unlink(f.name)
@@ -3,7 +3,7 @@ import tempfile
 import os
 from pathlib import Path
 
-from dbwarden.config import get_config
+from dbwarden.config import clear_config_cache, get_config
 from dbwarden.database.connection import is_async_enabled, get_mode
 from dbwarden.logging import get_logger, DBWardenLogger
 
@@ -101,6 +101,224 @@ class TestConfig:
             finally:
                 os.chdir(old_cwd)
 
+    def test_get_config_with_targets(self):
+        """Test migration targets default to the main URL."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                with open("warden.toml", "w") as f:
+                    f.write(
+                        "[warden]\n"
+                        'sqlalchemy_url = "postgresql://localhost/app"\n'
+                        "target_concurrency = 8\n"
+                        "[[warden.targets]]\n"
+                        'postgres_schema = "tenant_a"\n'
+                        "[[warden.targets]]\n"
+                        'name = "shard"\n'
+                        'sqlalchemy_url = "sqlite:///./shard.db"\n'
+                    )
+
+                config = get_config()
+
+                assert config.target_concurrency == 8
+                assert [t.name for t in config.targets] == ["tenant_a", "shard"]
+                assert config.targets[0].sqlalchemy_url == "postgresql://localhost/app"
+
+                shard = config.for_target(config.targets[1])
+                assert shard.sqlalchemy_url == "sqlite:///./shard.db"
+                assert shard.postgres_schema is None
+                assert shard.targets == ()
+            finally:
+                os.chdir(old_cwd)
+
+    def test_duplicate_target_names_raise_error(self):
+        """Test target names must be unique."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                with open("warden.toml", "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./test.db"\n')
+                    f.write('[[targets]]\nname = "a"\n[[targets]]\nname = "a"\n')
+
+                from dbwarden.exceptions import ConfigurationError
+
+                with pytest.raises(ConfigurationError):
+                    get_config()
+            finally:
+                os.chdir(old_cwd)
+
+    def test_config_is_cached_until_file_changes(self):
+        """Test warden.toml is parsed again only when it changes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                with open("warden.toml", "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./a.db"\n')
+
+                config = get_config()
+                assert get_config() is config
+
+                with open("warden.toml", "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./second.db"\n')
+
+                assert get_config().sqlalchemy_url == "sqlite:///./second.db"
+
+                config = get_config()
+                clear_config_cache()
+                assert get_config() is not config
+            finally:
+                os.chdir(old_cwd)
+
+    def test_closer_config_created_later_is_found(self):
+        """Test a warden.toml created below the cached one takes precedence."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.makedirs(os.path.join(tmpdir, "app", "sub"))
+            os.chdir(os.path.join(tmpdir, "app", "sub"))
+
+            try:
+                with open(os.path.join(tmpdir, "warden.toml"), "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./root.db"\n')
+                assert get_config().sqlalchemy_url == "sqlite:///./root.db"
+
+                with open(os.path.join(tmpdir, "app", "warden.toml"), "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./app.db"\n')
+                assert get_config().sqlalchemy_url == "sqlite:///./app.db"
+            finally:
+                os.chdir(old_cwd)
+
+    def test_cached_config_cannot_be_modified(self):
+        """Test the shared configuration is frozen and holds tuples."""
+        from dataclasses import FrozenInstanceError
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                with open("warden.toml", "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./test.db"\n')
+                    f.write('model_paths = ["models/"]\n')
+
+                config = get_config()
+                assert config.model_paths == ("models/",)
+                with pytest.raises(FrozenInstanceError):
+                    config.sqlalchemy_url = "sqlite:///./other.db"
+            finally:
+                os.chdir(old_cwd)
+
+    def test_removed_config_is_not_served_from_cache(self):
+        """Test a deleted warden.toml raises instead of using the cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                with open("warden.toml", "w") as f:
+                    f.write('sqlalchemy_url = "sqlite:///./test.db"\n')
+
+                get_config()
+                os.remove("warden.toml")
+
+                from dbwarden.exceptions import ConfigurationError
+
+                with pytest.raises(ConfigurationError):
+                    get_config()
+            finally:
+                os.chdir(old_cwd)
+
+
+class TestEngineOptions:
+    """Tests for the [warden.engine] options and the engine registry."""
+
+    def write_config(self, engine_table: str) -> None:
+        """Write a warden.toml with the given [warden.engine] table."""
+        with open("warden.toml", "w") as f:
+            f.write(
+                "[warden]\n"
+                'sqlalchemy_url = "postgresql://localhost/app"\n'
+                f"[warden.engine]\n{engine_table}"
+            )
+
+    def test_engine_options_are_parsed(self):
+        """Test engine options map to create_engine arguments."""
+        from sqlalchemy.pool import NullPool
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                self.write_config(
+                    'poolclass = "null"\n'
+                    "pool_pre_ping = true\n"
+                    "statement_timeout = 5000\n"
+                    'connect_args = { application_name = "dbwarden" }\n'
+                )
+
+                config = get_config()
+                kwargs = config.engine.engine_kwargs(config.sqlalchemy_url)
+
+                assert kwargs == {
+                    "poolclass": NullPool,
+                    "pool_pre_ping": True,
+                    "connect_args": {
+                        "application_name": "dbwarden",
+                        "options": "-c statement_timeout=5000",
+                    },
+                }
+            finally:
+                os.chdir(old_cwd)
+
+    def test_invalid_engine_options_raise_error(self):
+        """Test unknown options and pool sizing on a null pool are rejected."""
+        from dbwarden.exceptions import ConfigurationError
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            try:
+                for table in (
+                    "pool_sise = 5\n",
+                    'pool_size = "5"\n',
+                    'poolclass = "null"\npool_size = 5\n',
+                ):
+                    self.write_config(table)
+                    clear_config_cache()
+                    with pytest.raises(ConfigurationError):
+                        get_config()
+            finally:
+                os.chdir(old_cwd)
+
+    def test_engines_are_kept_per_url_and_options(self):
+        """Test engines are shared per URL and options until disposed."""
+        from dbwarden.config import DbwardenConfig, EngineOptions
+        from dbwarden.database import dispose_engines, get_engine
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = DbwardenConfig(sqlalchemy_url=f"sqlite:///{tmpdir}/a.db")
+            second = DbwardenConfig(sqlalchemy_url=f"sqlite:///{tmpdir}/b.db")
+            null_pool = DbwardenConfig(
+                sqlalchemy_url=f"sqlite:///{tmpdir}/a.db",
+                engine=EngineOptions(poolclass="null"),
+            )
+
+            engine = get_engine(first)
+            assert get_engine(first) is engine
+            assert get_engine(second) is not engine
+            assert get_engine(null_pool) is not engine
+
+            dispose_engines()
+            assert get_engine(first) is not engine
+            dispose_engines()
+
 
 class TestAsyncSyncDetection:
     """Tests for async/sync mode detection."""
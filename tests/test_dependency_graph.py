@@ -0,0 +1,162 @@
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from dbwarden.commands.migrate import _build_migration_graph
+from dbwarden.engine.dependency_graph import MigrationGraph
+from dbwarden.engine.file_parser import MigrationMetadata, ParsedMigration
+from dbwarden.engine.version import resolve_migration_order
+from dbwarden.exceptions import MigrationDependencyError
+
+
+class TestMigrationGraph:
+    """Tests for the migration dependency graph."""
+
+    def test_orders_by_version_when_independent(self):
+        """Test migrations without dependencies keep version order."""
+        graph = MigrationGraph()
+        for version in ["0003", "0001", "0002"]:
+            graph.add(version)
+
+        assert graph.topological_order() == ["0001", "0002", "0003"]
+
+    def test_dependencies_run_first(self):
+        """Test a migration is ordered after the ones it depends on."""
+        graph = MigrationGraph()
+        graph.add("0001", ["0003"])
+        graph.add("0002")
+        graph.add("0003", ["0002"])
+        graph.add("0004", ["0001", "0000"])
+
+        order = graph.topological_order(satisfied={"0000"})
+
+        assert order == ["0002", "0003", "0001", "0004"]
+        assert graph.dependents("0003") == ["0001"]
+
+    def test_missing_dependency(self):
+        """Test unknown dependencies are reported per migration."""
+        graph = MigrationGraph()
+        graph.add("0002", ["0001", "0009"])
+
+        with pytest.raises(MigrationDependencyError) as exc_info:
+            graph.topological_order(satisfied={"0001"})
+
+        assert exc_info.value.missing == {"0002": ["0009"]}
+
+    def test_cycle_is_reported(self):
+        """Test the actual cycle is named, not every blocked migration."""
+        graph = MigrationGraph()
+        graph.add("0001")
+        graph.add("0002", ["0004"])
+        graph.add("0003", ["0002"])
+        graph.add("0004", ["0003"])
+        graph.add("0005", ["0004"])
+
+        with pytest.raises(MigrationDependencyError) as exc_info:
+            graph.topological_order()
+
+        assert exc_info.value.cycle == ["0002", "0004", "0003", "0002"]
+        assert "0002 -> 0004 -> 0003 -> 0002" in str(exc_info.value)
+
+    def test_large_chain(self):
+        """Test a long dependency chain is resolved."""
+        graph = MigrationGraph()
+        versions = [f"{i:04d}" for i in range(1, 6001)]
+        for previous, version in zip([None] + versions, versions):
+            graph.add(version, [previous] if previous else [])
+
+        assert graph.topological_order() == versions
+
+    def test_run_parallel_overlaps_independent_branches(self):
+        """Test independent migrations run concurrently after their parent."""
+        graph = MigrationGraph()
+        graph.add("0001")
+        graph.add("0002", ["0001"])
+        graph.add("0003", ["0001"])
+        graph.add("0004", ["0002", "0003"])
+
+        both_running = threading.Barrier(2, timeout=5)
+
+        def execute(version):
+            if version in ("0002", "0003"):
+                both_running.wait()
+
+        completed = graph.run_parallel(execute, jobs=2)
+
+        assert completed[0] == "0001"
+        assert sorted(completed[1:3]) == ["0002", "0003"]
+        assert completed[3] == "0004"
+
+    def test_run_parallel_stops_on_first_failure(self):
+        """Test no new migrations are scheduled after a failure."""
+        graph = MigrationGraph()
+        graph.add("0001")
+        graph.add("0002")
+        graph.add("0003", ["0001"])
+        started = []
+
+        def execute(version):
+            started.append(version)
+            if version == "0001":
+                raise RuntimeError("boom")
+            time.sleep(0.05)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            graph.run_parallel(execute, jobs=2)
+
+        assert sorted(started) == ["0001", "0002"]
+
+
+class TestMigrateJobsGraph:
+    """Tests for the graph built by ``migrate --jobs``."""
+
+    @staticmethod
+    def migration(depends_on=None):
+        """Build a parsed migration with the given dependencies."""
+        return ParsedMigration(
+            filepath="",
+            metadata=MigrationMetadata(depends_on=depends_on),
+            upgrade_statements=[],
+            rollback_statements=[],
+            checksum="",
+        )
+
+    def test_undeclared_migrations_are_barriers(self):
+        """Test migrations without depends_on keep the serial order."""
+        graph = _build_migration_graph(
+            {
+                "0001": self.migration(),
+                "0002": self.migration(["0001"]),
+                "0003": self.migration(["0001"]),
+                "0004": self.migration(),
+                "0005": self.migration(),
+            }
+        )
+
+        assert graph.dependencies("0002") == ["0001"]
+        assert graph.dependencies("0003") == ["0001"]
+        assert graph.dependencies("0004") == ["0001", "0002", "0003"]
+        assert graph.dependencies("0005") == ["0004"]
+
+
+class TestResolveMigrationOrder:
+    """Tests for resolving pending migrations from a directory."""
+
+    def test_skips_applied_versions(self):
+        """Test applied migrations satisfy dependencies and are not returned."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = {
+                "0001_a.sql": "-- upgrade\nSELECT 1\n",
+                "0002_b.sql": '-- depends_on: ["0003"]\n-- upgrade\nSELECT 2\n',
+                "0003_c.sql": '-- depends_on: ["0001"]\n-- upgrade\nSELECT 3\n',
+            }
+            for filename, content in files.items():
+                with open(os.path.join(tmpdir, filename), "w") as f:
+                    f.write(content)
+
+            order = resolve_migration_order(tmpdir, applied_versions={"0001"})
+
+            assert [migration[0] for migration in order] == ["0003", "0002"]
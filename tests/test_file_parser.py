@@ -3,7 +3,10 @@ import tempfile
 import os
 from pathlib import Path
 
+from dbwarden.engine.checksum import calculate_checksum
 from dbwarden.engine.file_parser import (
+    iter_upgrade_statements,
+    parse_migration_file,
     parse_upgrade_statements,
     parse_rollback_statements,
     get_description_from_filename,
@@ -147,3 +150,57 @@ DROP TABLE users;
             assert "CREATE TABLE users" in statements[0]
 
             os.unlink(f.name)
+
+    def test_parse_migration_file_single_pass(self):
+        """Test header, both sections and checksum come from one parse."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".sql", delete=False) as f:
+            f.write("""-- seed
+-- depends_on: ["0001"]
+-- description: Seed users
+
+-- upgrade
+
+INSERT INTO users (id) VALUES (1)
+
+INSERT INTO users (id) VALUES (2)
+
+-- rollback
+
+DELETE FROM users
+""")
+            f.flush()
+
+            parsed = parse_migration_file(f.name)
+
+            assert parsed.metadata.is_seed == True
+            assert parsed.metadata.depends_on == ["0001"]
+            assert parsed.metadata.description == "Seed users"
+            assert len(parsed.upgrade_statements) == 2
+            assert parsed.rollback_statements == ["DELETE FROM users"]
+            assert parsed.checksum == calculate_checksum(parsed.upgrade_statements)
+
+            os.unlink(f.name)
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_iter_upgrade_statements_matches_parse(self, use_mmap):
+        """Test streamed statements match a full parse for any chunk size."""
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=".sql", delete=False) as f:
+            f.write(
+                "-- seed\r\n-- delimiter: $$\r\n-- upgrade\r\n"
+                "INSERT INTO t VALUES ('caf\u00e9;') $$\r\n"
+                "INSERT INTO t VALUES ('a\r\nb') $$\r\n"
+                "-- rollback\r\nDELETE FROM t $$\r\n".encode("utf-8")
+            )
+            f.flush()
+
+            expected = parse_migration_file(f.name).upgrade_statements
+            for chunk_size in (1, 3, 1024):
+                streamed = list(iter_upgrade_statements(f.name, use_mmap, chunk_size))
+                assert streamed == expected
+
+            assert expected == [
+                "INSERT INTO t VALUES ('caf\u00e9;')",
+                "INSERT INTO t VALUES ('a\nb')",
+            ]
+
+            os.unlink(f.name)
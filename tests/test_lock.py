@@ -0,0 +1,199 @@
+import os
+import tempfile
+import time
+
+import pytest
+from sqlalchemy import text
+
+from dbwarden.config import get_config
+from dbwarden.database.connection import get_db_connection, get_db_session
+from dbwarden.engine.lock import (
+    LeaseHeartbeat,
+    check_migration_lease,
+    get_active_lease,
+    migration_lock,
+)
+from dbwarden.exceptions import LockError
+from dbwarden.repositories import (
+    acquire_lock,
+    check_lock,
+    create_lock_table_if_not_exists,
+    get_lock_info,
+    release_lock,
+)
+from dbwarden.repositories.lock_repo import LockBackend, TableLockBackend
+
+
+class TestMigrationLock:
+    """Tests for the migration lock on SQLite (compare-and-set row)."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up a project with an SQLite database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/lock.db"\n')
+
+            yield tmpdir
+
+            os.chdir(old_cwd)
+
+    def test_acquire_is_compare_and_set(self, setup_env):
+        """Test a held lock cannot be acquired again until released."""
+        assert check_lock() == False
+
+        create_lock_table_if_not_exists()
+        assert acquire_lock() == True
+        assert acquire_lock() == False
+        assert check_lock() == True
+
+        assert release_lock() == True
+        assert release_lock() == False
+        assert acquire_lock() == True
+
+    def test_migration_lock_reports_wait_metrics(self, setup_env):
+        """Test the lock is held inside the block and released after it."""
+        with migration_lock() as stats:
+            assert check_lock() == True
+            assert stats.backend == "table"
+            assert stats.attempts == 1
+
+        assert check_lock() == False
+
+    def test_migration_lock_times_out_with_backoff(self, setup_env):
+        """Test waiting for a held lock retries and then fails."""
+        create_lock_table_if_not_exists()
+        acquire_lock()
+
+        with pytest.raises(LockError, match="attempts"):
+            with migration_lock(timeout=0.3):
+                pass
+
+        assert check_lock() == True
+
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test a backend missing a lock method fails when it is created."""
+
+        class AcquireOnly(LockBackend):
+            def try_acquire(self, connection):
+                return True
+
+        with pytest.raises(TypeError, match="release"):
+            AcquireOnly()
+
+    def test_lock_is_released_after_failure(self, setup_env):
+        """Test an exception inside the block still releases the lock."""
+        with get_db_session():
+            with pytest.raises(RuntimeError):
+                with migration_lock():
+                    raise RuntimeError("migration failed")
+
+        assert check_lock() == False
+
+
+class TestLockLease:
+    """Tests for lock leases, heartbeats and stale-lock takeover."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up a project with an SQLite database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/lease.db"\n')
+
+            yield tmpdir
+
+            os.chdir(old_cwd)
+
+    def test_expired_lease_is_taken_over(self, setup_env):
+        """Test a crashed holder's lease can be taken over once expired."""
+        create_lock_table_if_not_exists()
+        crashed = TableLockBackend(holder="pod-a:1:dead", lease_duration=0.1)
+        with get_db_connection() as connection:
+            assert crashed.try_acquire(connection) == True
+
+        assert check_lock() == True
+        time.sleep(0.2)
+        assert check_lock() == False
+        assert get_lock_info().holder == "pod-a:1:dead"
+
+        with migration_lock(timeout=1) as stats:
+            assert stats.taken_over_from == "pod-a:1:dead"
+            assert get_lock_info().holder == stats.holder
+
+        with get_db_connection() as connection:
+            assert crashed.renew(connection) == False
+            assert crashed.release(connection) == False
+
+    def test_live_lease_is_not_taken_over(self, setup_env):
+        """Test a lease that has not expired blocks other processes."""
+        create_lock_table_if_not_exists()
+        with get_db_connection() as connection:
+            assert TableLockBackend(holder="pod-a:1:live").try_acquire(connection)
+            assert TableLockBackend(holder="pod-b:2:wait").try_acquire(connection) == (
+                False
+            )
+
+    def test_heartbeat_renews_lease(self, setup_env):
+        """Test the heartbeat pushes the lease expiry forward."""
+        with migration_lock() as stats:
+            backend = TableLockBackend(holder=stats.holder, lease_duration=60)
+            heartbeat = LeaseHeartbeat(backend, get_config(), interval=0.05)
+            before = get_lock_info().expires_at
+
+            heartbeat.start()
+            time.sleep(0.3)
+            heartbeat.stop()
+
+            assert heartbeat.renewals > 0
+            assert heartbeat.lost == False
+            assert get_lock_info().expires_at > before
+
+    def test_sqlite_lease_renewed_between_migrations(self, setup_env):
+        """Test the lease is renewed on the session connection on SQLite."""
+        with migration_lock():
+            lease = get_active_lease()
+            before = get_lock_info().expires_at
+            time.sleep(0.01)
+
+            lease.interval = 0
+            check_migration_lease()
+
+            assert lease.renewals == 1
+            assert get_lock_info().expires_at > before
+
+        assert get_active_lease() is None
+
+    def test_lost_lease_stops_migrations(self, setup_env):
+        """Test a lease taken over by another process fails the lock block."""
+        with pytest.raises(LockError, match="taken over"):
+            with migration_lock():
+                with get_db_connection() as connection:
+                    connection.execute(
+                        text("UPDATE dbwarden_lock SET holder = 'pod-b:2:took'")
+                    )
+
+                get_active_lease().interval = 0
+                with pytest.raises(LockError, match="taken over"):
+                    check_migration_lease()
+
+        assert get_lock_info().holder == "pod-b:2:took"
+
+    def test_lease_columns_added_to_old_lock_table(self, setup_env):
+        """Test a lock table from an earlier version gains the lease columns."""
+        with get_db_connection() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE dbwarden_lock (id INTEGER PRIMARY KEY CHECK (id = 1), "
+                    "locked BOOLEAN DEFAULT FALSE, acquired_at TIMESTAMP)"
+                )
+            )
+
+        with migration_lock():
+            assert get_lock_info().holder is not None
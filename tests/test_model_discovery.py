@@ -3,9 +3,12 @@ import tempfile
 import os
 from pathlib import Path
 
+from dbwarden.constants import CACHE_DIR
 from dbwarden.engine.model_discovery import (
+    MODEL_CACHE_FILE,
     load_model_from_path,
     discover_models_in_directory,
+    get_all_model_tables,
     extract_column_info,
     generate_create_table_sql,
     generate_drop_table_sql,
@@ -91,6 +94,104 @@ class User(Base):
             assert files == []
 
 
+class TestModelTableCollection:
+    """Tests for collecting the tables of all model files."""
+
+    def test_shared_base_is_imported_once(self):
+        """Test a package sharing one base yields each table once."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            package = os.path.join(tmpdir, "shared_base_models")
+            os.makedirs(package)
+            files = {
+                "__init__.py": "",
+                "base.py": (
+                    "from sqlalchemy.orm import declarative_base\n"
+                    "Base = declarative_base()\n"
+                ),
+                "users.py": (
+                    "from sqlalchemy import Column, Integer\n"
+                    "from shared_base_models.base import Base\n"
+                    "class User(Base):\n"
+                    "    __tablename__ = 'users'\n"
+                    "    id = Column(Integer, primary_key=True)\n"
+                ),
+                "posts.py": (
+                    "from sqlalchemy import Column, ForeignKey, Integer\n"
+                    "from shared_base_models.base import Base\n"
+                    "from shared_base_models.users import User\n"
+                    "class Post(Base):\n"
+                    "    __tablename__ = 'posts'\n"
+                    "    id = Column(Integer, primary_key=True)\n"
+                    "    user_id = Column(Integer, ForeignKey('users.id'))\n"
+                ),
+            }
+            for filename, content in files.items():
+                with open(os.path.join(package, filename), "w") as f:
+                    f.write(content)
+
+            tables = get_all_model_tables([package])
+
+            assert [table.name for table in tables] == ["users", "posts"]
+            assert tables[1].columns[1].foreign_key == "users(id)"
+
+    def test_tables_are_cached_until_a_model_changes(self, monkeypatch):
+        """Test models are not loaded again while their files are unchanged."""
+        import dbwarden.engine.model_discovery as model_discovery
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            monkeypatch.chdir(tmpdir)
+            os.makedirs("migrations")
+            os.makedirs("models")
+            model_path = os.path.join("models", "tags.py")
+            with open(model_path, "w") as f:
+                f.write(
+                    "from sqlalchemy import Column, Integer\n"
+                    "from sqlalchemy.orm import declarative_base\n"
+                    "Base = declarative_base()\n"
+                    "class Tag(Base):\n"
+                    "    __tablename__ = 'tags'\n"
+                    "    id = Column(Integer, primary_key=True)\n"
+                )
+
+            loaded = []
+            load = model_discovery.load_model_from_path
+            monkeypatch.setattr(
+                model_discovery,
+                "load_model_from_path",
+                lambda path: loaded.append(path) or load(path),
+            )
+
+            assert [table.name for table in get_all_model_tables(["models"])] == [
+                "tags"
+            ]
+            assert [table.name for table in get_all_model_tables(["models"])] == [
+                "tags"
+            ]
+            assert len(loaded) == 1
+
+            with open(model_path, "a") as f:
+                f.write("    label = Column(Integer)\n")
+
+            tables = get_all_model_tables(["models"])
+
+            assert len(loaded) == 2
+            assert [column.name for column in tables[0].columns] == ["id", "label"]
+
+    def test_failed_model_file_is_not_cached(self, monkeypatch):
+        """Test tables are not cached while a model file fails to import."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            monkeypatch.chdir(tmpdir)
+            os.makedirs("migrations")
+            os.makedirs("models")
+            with open(os.path.join("models", "broken.py"), "w") as f:
+                f.write("import os\nDATABASE = os.environ['UNSET_MODEL_VARIABLE']\n")
+
+            assert get_all_model_tables(["models"]) == []
+            assert not os.path.exists(
+                os.path.join("migrations", CACHE_DIR, MODEL_CACHE_FILE)
+            )
+
+
 class TestModelColumn:
     """Tests for ModelColumn class."""
 
@@ -231,3 +332,47 @@ class TestColumnExtraction:
 
         assert col is not None
         assert col.nullable == False
+
+
+class TestSchemaReflection:
+    """Tests for bulk reflection of the live schema."""
+
+    def test_reflect_tables_with_indexes_and_foreign_keys(self):
+        """Test every table is reflected with its columns, indexes and keys."""
+        from sqlalchemy import create_engine, text
+
+        from dbwarden.engine.schema_snapshot import reflect_schema
+
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(
+                text("CREATE TABLE users (id INTEGER PRIMARY KEY, Email TEXT)")
+            )
+            connection.execute(
+                text(
+                    "CREATE TABLE posts (id INTEGER PRIMARY KEY, "
+                    "user_id INTEGER NOT NULL REFERENCES users(id), "
+                    "title TEXT DEFAULT 'untitled')"
+                )
+            )
+            connection.execute(
+                text("CREATE UNIQUE INDEX ix_posts_title ON posts (title)")
+            )
+
+            tables = reflect_schema(connection)
+
+        engine.dispose()
+
+        assert list(tables) == ["posts", "users"]
+        assert tables["users"].column_names() == {"id", "email"}
+
+        posts = tables["posts"]
+        assert [column.name for column in posts.columns] == ["id", "user_id", "title"]
+        assert posts.columns[1].nullable is False
+        assert posts.columns[2].default == "'untitled'"
+        assert [
+            (index.name, index.columns, index.unique) for index in posts.indexes
+        ] == [("ix_posts_title", ["title"], True)]
+        assert posts.foreign_keys[0].columns == ["user_id"]
+        assert posts.foreign_keys[0].referred_table == "users"
+        assert posts.foreign_keys[0].referred_columns == ["id"]
@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+from dbwarden.constants import CACHE_DIR
+from dbwarden.engine.checksum import calculate_checksum, calculate_file_checksum
+from dbwarden.engine.file_parser import parse_migration_file
+from dbwarden.engine.parse_cache import (
+    CACHE_FILE,
+    MigrationCache,
+    get_migration_cache,
+    clear_migration_caches,
+)
+
+
+MIGRATION = """-- depends_on: ["0001"]
+-- upgrade
+
+CREATE TABLE users (id INTEGER PRIMARY KEY)
+
+-- rollback
+
+DROP TABLE users
+"""
+
+
+class TestMigrationCache:
+    """Tests for the on-disk parsed migration cache."""
+
+    @pytest.fixture
+    def migrations_dir(self):
+        """Create a migrations directory with one migration file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "0002_users.sql"), "w") as f:
+                f.write(MIGRATION)
+            clear_migration_caches()
+            yield tmpdir
+            clear_migration_caches()
+
+    def test_parses_and_persists(self, migrations_dir):
+        """Test a parsed file is written to the cache directory."""
+        cache = MigrationCache(migrations_dir)
+        migration = cache.get(os.path.join(migrations_dir, "0002_users.sql"))
+        cache.save()
+
+        assert migration.upgrade_statements == [
+            "CREATE TABLE users (id INTEGER PRIMARY KEY)"
+        ]
+        assert migration.rollback_statements == ["DROP TABLE users"]
+        assert migration.metadata.depends_on == ["0001"]
+
+        with open(os.path.join(migrations_dir, CACHE_DIR, CACHE_FILE)) as f:
+            entries = json.load(f)["entries"]
+        assert "0002_users.sql" in entries
+
+    def test_unchanged_stat_skips_reading(self, migrations_dir):
+        """Test an entry is served from the cache when the stat matches."""
+        filepath = os.path.join(migrations_dir, "0002_users.sql")
+        cache = MigrationCache(migrations_dir)
+        cache.get(filepath)
+        cache.save()
+
+        stat = os.stat(filepath)
+        with open(filepath, "w") as f:
+            f.write(MIGRATION.replace("users", "USERS"))
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        migration = MigrationCache(migrations_dir).get(filepath)
+        assert "users" in migration.upgrade_statements[0]
+
+    def test_changed_content_is_reparsed(self, migrations_dir):
+        """Test a modified file invalidates its entry."""
+        filepath = os.path.join(migrations_dir, "0002_users.sql")
+        cache = MigrationCache(migrations_dir)
+        cache.get(filepath)
+        cache.save()
+
+        with open(filepath, "w") as f:
+            f.write(MIGRATION.replace("users", "accounts"))
+        os.utime(filepath, ns=(0, 0))
+
+        migration = MigrationCache(migrations_dir).get(filepath)
+        assert "accounts" in migration.upgrade_statements[0]
+
+    def test_miss_reads_file_once(self, migrations_dir, monkeypatch):
+        """Test a cache miss hashes and parses the bytes of a single read."""
+        filepath = os.path.join(migrations_dir, "0002_users.sql")
+        with open(filepath, "wb") as f:
+            f.write(MIGRATION.replace("\n", "\r\n").encode())
+        cache = MigrationCache(migrations_dir)
+
+        opened = []
+        real_open = open
+
+        def counting_open(file, *args, **kwargs):
+            opened.append(file)
+            return real_open(file, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", counting_open)
+        migration = cache.get(filepath)
+        monkeypatch.undo()
+
+        assert opened == [filepath]
+        expected = parse_migration_file(filepath)
+        assert migration.upgrade_statements == expected.upgrade_statements
+        assert migration.checksum == expected.checksum
+        entry = cache._entries["0002_users.sql"]
+        assert entry["content_hash"] == calculate_file_checksum(filepath)
+
+    def test_deleted_files_are_evicted(self, migrations_dir):
+        """Test entries for deleted files are dropped on save."""
+        filepath = os.path.join(migrations_dir, "0002_users.sql")
+        cache = get_migration_cache(migrations_dir)
+        cache.get(filepath)
+        cache.save()
+
+        os.unlink(filepath)
+        with open(os.path.join(migrations_dir, "0003_posts.sql"), "w") as f:
+            f.write(MIGRATION.replace("users", "posts"))
+        cache.get(os.path.join(migrations_dir, "0003_posts.sql"))
+        cache.save()
+
+        with open(os.path.join(migrations_dir, CACHE_DIR, CACHE_FILE)) as f:
+            entries = json.load(f)["entries"]
+        assert list(entries) == ["0003_posts.sql"]
+
+    def test_seed_statements_are_not_cached(self, migrations_dir):
+        """Test seed entries keep the checksum but not the upgrade statements."""
+        filepath = os.path.join(migrations_dir, "0003_seed.sql")
+        with open(filepath, "w") as f:
+            f.write(
+                "-- seed\n-- upgrade\nINSERT INTO users VALUES (1);\n"
+                "INSERT INTO users VALUES (2);\n-- rollback\nDELETE FROM users;\n"
+            )
+
+        cache = MigrationCache(migrations_dir)
+        migration = cache.get(filepath)
+
+        statements = ["INSERT INTO users VALUES (1)", "INSERT INTO users VALUES (2)"]
+        assert migration.metadata.is_seed == True
+        assert migration.upgrade_statements == []
+        assert migration.rollback_statements == ["DELETE FROM users"]
+        assert migration.checksum == calculate_checksum(statements)
+        assert cache.get_upgrade_statements(filepath) == statements
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from dbwarden.database.queries import (
+    QueryMethod,
+    get_query,
+    get_query_registry,
+)
+
+
+class TestQueryRegistry:
+    """Tests for the per-dialect query registry."""
+
+    def test_dialect_specific_queries(self):
+        """Test each dialect gets its own table check and upsert syntax."""
+        exists = QueryMethod.CHECK_IF_MIGRATIONS_TABLE_EXISTS
+        upsert = QueryMethod.UPSERT_REPEATABLE_MIGRATION
+
+        assert "sqlite_master" in get_query(exists)
+        assert "to_regclass" in get_query(exists, "postgresql")
+        assert "information_schema" in get_query(exists, "mysql")
+
+        assert "ON CONFLICT (migration_type, filename)" in get_query(
+            upsert, "postgresql"
+        )
+        assert "ON DUPLICATE KEY UPDATE" in get_query(upsert, "mariadb")
+        assert "INSERT OR REPLACE" not in get_query(upsert)
+
+    def test_shared_queries_and_fallback(self):
+        """Test shared queries are the same everywhere and unknown dialects use SQLite."""
+        assert get_query(QueryMethod.GET_MIGRATED_VERSIONS, "postgresql") == (
+            get_query(QueryMethod.GET_MIGRATED_VERSIONS, "mysql")
+        )
+        assert get_query_registry("mariadb").dialect == "mysql"
+        assert get_query_registry("mssql").dialect == "sqlite"
+        assert get_query(QueryMethod.PG_TRY_ADVISORY_LOCK) == ""
+
+    def test_statements_are_cached(self):
+        """Test a statement is built once and typed datetime parameters are bound."""
+        registry = get_query_registry("sqlite")
+        statement = registry.statement(QueryMethod.TAKE_OVER_LOCK)
+
+        assert registry.statement(QueryMethod.TAKE_OVER_LOCK) is statement
+        assert statement._bindparams["now"].type.__class__.__name__ == "DateTime"
+        assert statement._bindparams["holder"].type.__class__.__name__ == "NullType"
+
+
+class TestRepeatableBookkeeping:
+    """Tests for upserted repeatable migration records."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up a project with an SQLite database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/repeat.db"\n')
+
+            yield os.path.join(tmpdir, "repeat.db")
+
+            os.chdir(old_cwd)
+
+    def test_repeatable_migration_is_recorded_once(self, setup_env):
+        """Test running a repeatable migration again updates its record."""
+        from dbwarden.repositories import (
+            create_migrations_table_if_not_exists,
+            run_repeatable_migration,
+        )
+
+        create_migrations_table_if_not_exists()
+        for statement in ("SELECT 1", "SELECT 2"):
+            run_repeatable_migration(
+                sql_statements=[statement],
+                filename="RA__refresh.sql",
+                migration_type="runs_always",
+            )
+
+        conn = sqlite3.connect(setup_env)
+        rows = conn.execute(
+            "SELECT filename, checksum FROM dbwarden_migrations"
+        ).fetchall()
+        conn.close()
+
+        assert len(rows) == 1
+        assert rows[0][0] == "RA__refresh.sql"
+
+    def test_duplicates_are_removed_on_upgrade(self, setup_env):
+        """Test an old table with duplicate repeatable rows gets the unique index."""
+        from dbwarden.repositories import create_migrations_table_if_not_exists
+
+        conn = sqlite3.connect(setup_env)
+        conn.execute(
+            "CREATE TABLE dbwarden_migrations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "version VARCHAR(255) UNIQUE, description VARCHAR(500), "
+            "filename VARCHAR(500), migration_type VARCHAR(50), "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, checksum VARCHAR(128))"
+        )
+        conn.executemany(
+            "INSERT INTO dbwarden_migrations (version, filename, migration_type, "
+            "checksum) VALUES (?, ?, ?, ?)",
+            [
+                ("0001", "0001_users.sql", "versioned", "a"),
+                (None, "RA__refresh.sql", "runs_always", "old"),
+                (None, "RA__refresh.sql", "runs_always", "new"),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        create_migrations_table_if_not_exists()
+
+        conn = sqlite3.connect(setup_env)
+        rows = conn.execute(
+            "SELECT filename, checksum FROM dbwarden_migrations ORDER BY id"
+        ).fetchall()
+        indexes = conn.execute("PRAGMA index_list(dbwarden_migrations)").fetchall()
+        conn.close()
+
+        assert rows == [("0001_users.sql", "a"), ("RA__refresh.sql", "new")]
+        assert any(
+            index[1] == "ux_dbwarden_migrations_type_filename" for index in indexes
+        )
@@ -0,0 +1,204 @@
+import json
+import os
+import sqlite3
+import tempfile
+
+from dbwarden.constants import CACHE_DIR
+from dbwarden.engine.schema_replay import (
+    REPLAY_CACHE_FILE,
+    SchemaReplay,
+    replay_migrations,
+)
+from dbwarden.engine.schema_snapshot import compare_schemas
+from dbwarden.models import TableSnapshot
+from dbwarden.engine.scratch_schema import SCRATCH_DATABASE_FILE, replay_into_sqlite
+
+
+class TestSchemaReplay:
+    """Tests for replaying DDL statements in memory."""
+
+    def test_create_table(self):
+        """Test columns, constraints and foreign keys of a new table."""
+        replay = SchemaReplay()
+        replay.apply("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        replay.apply(
+            'CREATE TABLE IF NOT EXISTS "public"."posts" (\n'
+            "    id SERIAL,\n"
+            "    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,\n"
+            "    title varchar (200) DEFAULT 'untitled',\n"
+            "    CONSTRAINT pk_posts PRIMARY KEY (id)\n"
+            ");"
+        )
+
+        posts = replay.tables["posts"]
+        assert [column.name for column in posts.columns] == ["id", "user_id", "title"]
+        assert posts.columns[0].nullable is False
+        assert posts.columns[2].type == "VARCHAR(200)"
+        assert posts.columns[2].default == "'untitled'"
+        assert posts.foreign_keys[0].columns == ["user_id"]
+        assert posts.foreign_keys[0].referred_table == "users"
+
+    def test_alter_and_rename(self):
+        """Test ALTER TABLE actions and renames update the schema."""
+        replay = SchemaReplay()
+        for statement in [
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)",
+            "CREATE TABLE posts (id INTEGER, user_id INTEGER REFERENCES users(id))",
+            "CREATE UNIQUE INDEX ix_users_name ON users (name)",
+            "ALTER TABLE users ADD COLUMN email TEXT NOT NULL, DROP COLUMN age",
+            "ALTER TABLE users ALTER COLUMN name SET NOT NULL",
+            "ALTER TABLE users RENAME COLUMN name TO full_name",
+            "ALTER TABLE users RENAME TO members",
+        ]:
+            replay.apply(statement)
+
+        members = replay.tables["members"]
+        assert list(replay.tables) == ["posts", "members"]
+        assert [column.name for column in members.columns] == [
+            "id",
+            "full_name",
+            "email",
+        ]
+        assert members.columns[1].nullable is False
+        assert members.indexes[0].columns == ["full_name"]
+        assert members.indexes[0].unique is True
+        assert replay.tables["posts"].foreign_keys[0].referred_table == "members"
+
+    def test_identifiers_match_case_insensitively(self):
+        """Test tables are found whatever the case they are referred by."""
+        replay = SchemaReplay({"Audit": TableSnapshot(name="Audit")})
+        for statement in [
+            'CREATE TABLE "Users" (id INTEGER)',
+            "ALTER TABLE USERS ADD COLUMN email TEXT",
+            "ALTER TABLE users RENAME TO Members",
+            "CREATE TABLE MEMBERS (id INTEGER)",
+            "DROP TABLE audit",
+        ]:
+            replay.apply(statement)
+
+        assert list(replay.tables) == ["Members"]
+        assert replay.table("members").column_names() == {"id", "email"}
+
+    def test_drops_and_ignored_statements(self):
+        """Test drops are applied and non-DDL statements are ignored."""
+        replay = SchemaReplay()
+        for statement in [
+            "CREATE TABLE users (id INTEGER, email TEXT)",
+            "CREATE INDEX ix_users_email ON users (email)",
+            "CREATE TEMPORARY TABLE scratch (id INTEGER)",
+            "INSERT INTO users (id, email) VALUES (1, 'a@example.com')",
+            "CREATE VIEW active_users AS SELECT * FROM users",
+            "DROP INDEX IF EXISTS ix_users_email",
+            "CREATE TABLE old (id INTEGER)",
+            "DROP TABLE IF EXISTS old CASCADE",
+        ]:
+            replay.apply(statement)
+
+        assert list(replay.tables) == ["users"]
+        assert replay.tables["users"].indexes == []
+
+
+class TestReplayMigrations:
+    """Tests for building the schema of a migrations directory."""
+
+    def test_replay_is_incremental(self):
+        """Test only migrations added since the last replay are replayed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "0001_users.sql"), "w") as f:
+                f.write("-- upgrade\n\nCREATE TABLE users (id INTEGER, name TEXT);\n")
+
+            assert list(replay_migrations(tmpdir)) == ["users"]
+
+            cache_path = os.path.join(tmpdir, CACHE_DIR, REPLAY_CACHE_FILE)
+            with open(cache_path) as f:
+                data = json.load(f)
+            # A replay from scratch would not see this table.
+            data["tables"].append(
+                {"name": "cached", "columns": [], "indexes": [], "foreign_keys": []}
+            )
+            with open(cache_path, "w") as f:
+                json.dump(data, f)
+
+            with open(os.path.join(tmpdir, "0002_email.sql"), "w") as f:
+                f.write("-- upgrade\n\nALTER TABLE users ADD COLUMN email TEXT;\n")
+
+            tables = replay_migrations(tmpdir)
+
+            assert set(tables) == {"users", "cached"}
+            assert tables["users"].column_names() == {"name", "id", "email"}
+
+    def test_models_compared_with_migrations(self):
+        """Test the replayed schema shows what models add or remove."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "0001_users.sql"), "w") as f:
+                f.write(
+                    "-- upgrade\n\nCREATE TABLE users (id INTEGER, legacy TEXT);\n"
+                    "CREATE TABLE audit (id INTEGER);\n"
+                )
+
+            migrations = replay_migrations(tmpdir)
+            models = SchemaReplay()
+            models.apply("CREATE TABLE users (id INTEGER, email TEXT)")
+            models.apply("CREATE TABLE tags (id INTEGER)")
+
+            differences = compare_schemas(models.tables, migrations)
+
+            assert [(d.type, d.table_name, d.column_name) for d in differences] == [
+                ("add_column", "users", "email"),
+                ("drop_column", "users", "legacy"),
+                ("add_table", "tags", None),
+                ("drop_table", "audit", None),
+            ]
+
+
+class TestReplayIntoSqlite:
+    """Tests for building the schema of migrations on a scratch SQLite."""
+
+    def test_scratch_database_is_incremental(self):
+        """Test the cached database is reused and only new files are run."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "0001_users.sql"), "w") as f:
+                f.write(
+                    "-- upgrade\n\nCREATE TABLE users (id INTEGER PRIMARY KEY);\n"
+                    "CREATE INDEX ix_users_id ON users (id);\n"
+                )
+
+            tables = replay_into_sqlite(tmpdir)
+            assert list(tables) == ["users"]
+            assert tables["users"].indexes[0].name == "ix_users_id"
+
+            # A replay from scratch would not see this table.
+            cached = sqlite3.connect(
+                os.path.join(tmpdir, CACHE_DIR, SCRATCH_DATABASE_FILE)
+            )
+            cached.execute("CREATE TABLE cached (id INTEGER)")
+            cached.commit()
+            cached.close()
+
+            with open(os.path.join(tmpdir, "0002_email.sql"), "w") as f:
+                f.write("-- upgrade\n\nALTER TABLE users ADD COLUMN email TEXT;\n")
+
+            tables = replay_into_sqlite(tmpdir)
+
+            assert list(tables) == ["cached", "users"]
+            assert tables["users"].column_names() == {"id", "email"}
+            assert sorted(os.listdir(os.path.join(tmpdir, CACHE_DIR))) == [
+                ".gitignore",
+                "parsed_migrations.json",
+                "scratch.db",
+                "scratch.json",
+            ]
+
+    def test_unsupported_statements_are_skipped(self):
+        """Test statements SQLite rejects do not stop the replay."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "0001_users.sql"), "w") as f:
+                f.write(
+                    "-- upgrade\n\nCREATE TABLE users (id INTEGER);\n"
+                    "CREATE EXTENSION IF NOT EXISTS pgcrypto;\n"
+                    "ALTER TABLE users ADD COLUMN name TEXT;\n"
+                )
+
+            tables = replay_into_sqlite(tmpdir)
+
+            assert tables["users"].column_names() == {"id", "name"}
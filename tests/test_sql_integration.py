@@ -12,16 +12,19 @@ from sqlalchemy import (
     ForeignKey,
     Table,
     MetaData,
+    inspect,
 )
 from sqlalchemy.orm import declarative_base
 
-from dbwarden.database.connection import get_db_connection
+from dbwarden.database.connection import get_db_connection, get_db_session
 from dbwarden.repositories import (
     create_migrations_table_if_not_exists,
     migrations_table_exists,
     run_migration,
+    run_streaming_migration,
     get_migration_records,
     fetch_latest_versioned_migration,
+    get_latest_versions,
 )
 
 
@@ -132,6 +135,493 @@ class TestDatabaseOperations:
         records = get_migration_records()
         assert len(records) == 0
 
+    def test_history_follows_execution_order(self, setup_env):
+        """Test history is ordered by execution, not version or timestamp."""
+        create_migrations_table_if_not_exists()
+
+        for version in ("3", "1", "2"):
+            run_migration(
+                sql_statements=[],
+                version=version,
+                migration_operation="upgrade",
+                filename=f"V{version}__m.sql",
+            )
+
+        assert [r.version for r in get_migration_records()] == ["3", "1", "2"]
+        assert get_latest_versions(limit=2) == ["2", "1"]
+        assert fetch_latest_versioned_migration().version == "2"
+
+    def test_execution_seq_added_to_old_table(self, setup_env):
+        """Test an old migrations table gets a backfilled execution_seq."""
+        conn = sqlite3.connect(setup_env["db_path"])
+        conn.execute(
+            "CREATE TABLE dbwarden_migrations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "version VARCHAR(255) UNIQUE, description VARCHAR(500), "
+            "filename VARCHAR(500), migration_type VARCHAR(50), "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, checksum VARCHAR(128))"
+        )
+        conn.executemany(
+            "INSERT INTO dbwarden_migrations (version, filename, migration_type) "
+            "VALUES (?, ?, 'versioned')",
+            [("0001", "0001_a.sql"), ("0002", "0002_b.sql")],
+        )
+        conn.commit()
+        conn.close()
+
+        create_migrations_table_if_not_exists()
+        run_migration(
+            sql_statements=[],
+            version="0003",
+            migration_operation="upgrade",
+            filename="0003_c.sql",
+        )
+
+        conn = sqlite3.connect(setup_env["db_path"])
+        rows = conn.execute(
+            "SELECT version, execution_seq FROM dbwarden_migrations ORDER BY id"
+        ).fetchall()
+        conn.close()
+
+        assert rows == [("0001", 1), ("0002", 2), ("0003", 3)]
+
+    def test_run_streaming_migration(self, setup_env):
+        """Test a generator of statements is executed in batches."""
+        from dbwarden.engine.checksum import calculate_checksum
+
+        create_migrations_table_if_not_exists()
+
+        statements = ["CREATE TABLE seeds (id INTEGER PRIMARY KEY)"] + [
+            f"INSERT INTO seeds (id) VALUES ({i})" for i in range(7)
+        ]
+
+        executed = run_streaming_migration(
+            sql_statements=(statement for statement in statements),
+            version="1",
+            filename="V1__seeds.sql",
+            batch_size=3,
+        )
+
+        assert executed == 8
+        records = get_migration_records()
+        assert records[0].checksum == calculate_checksum(statements)
+
+        conn = sqlite3.connect(setup_env["db_path"])
+        assert conn.execute("SELECT COUNT(*) FROM seeds").fetchone()[0] == 7
+        conn.close()
+
+
+class TestMigrationSession:
+    """Tests for the single-connection migration session."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up environment for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/session.db"\n')
+
+            yield tmpdir
+
+            os.chdir(old_cwd)
+
+    def test_session_reuses_one_connection(self, setup_env):
+        """Test repository calls inside a session share its connection."""
+        with get_db_session() as session:
+            create_migrations_table_if_not_exists()
+            assert migrations_table_exists() == True
+
+            with get_db_connection() as connection:
+                assert connection is session.connection
+
+        assert session.reused_checkouts == 3
+        assert session.checkouts_saved == 2
+
+    def test_failed_migration_keeps_earlier_ones(self, setup_env):
+        """Test each migration in a session commits independently."""
+        with get_db_session():
+            create_migrations_table_if_not_exists()
+            run_migration(
+                sql_statements=["CREATE TABLE users (id INTEGER PRIMARY KEY)"],
+                version="0001",
+                migration_operation="upgrade",
+                filename="0001_users.sql",
+            )
+
+            with pytest.raises(Exception):
+                run_migration(
+                    sql_statements=["CREATE TABLE broken ("],
+                    version="0002",
+                    migration_operation="upgrade",
+                    filename="0002_broken.sql",
+                )
+
+        records = get_migration_records()
+        assert [r.version for r in records] == ["0001"]
+
+    def test_parallel_migrations_get_distinct_execution_seqs(self, setup_env):
+        """Test migrate --jobs numbers concurrently recorded migrations apart."""
+        from sqlalchemy import event
+
+        from dbwarden.commands.migrate import _apply_migrations
+        from dbwarden.config import get_config
+        from dbwarden.database import get_engine
+        from dbwarden.logging import get_logger
+
+        os.makedirs("migrations")
+        with open("migrations/0001_base.sql", "w") as f:
+            f.write("-- upgrade\n\nCREATE TABLE base (id INTEGER PRIMARY KEY)\n")
+        for version in ("0002", "0003", "0004", "0005"):
+            with open(f"migrations/{version}_t{version}.sql", "w") as f:
+                f.write(
+                    '-- depends_on: ["0001"]\n-- upgrade\n\n'
+                    f"CREATE TABLE t{version} (id INTEGER PRIMARY KEY)\n"
+                )
+
+        inserted = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith("INSERT INTO dbwarden_migrations"):
+                inserted.append(parameters)
+
+        # migrate ignores --jobs on SQLite, so the parallel path is run
+        # directly; the lock is not needed with a single process.
+        engine = get_engine(get_config())
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            with get_db_session():
+                _apply_migrations(
+                    migrations_dir=os.path.join(setup_env, "migrations"),
+                    count=None,
+                    to_version=None,
+                    baseline=False,
+                    logger=get_logger(),
+                    jobs=3,
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        conn = sqlite3.connect(os.path.join(setup_env, "session.db"))
+        rows = conn.execute(
+            "SELECT version, execution_seq FROM dbwarden_migrations"
+        ).fetchall()
+        conn.close()
+
+        assert len(rows) == 5
+        assert sorted(seq for _, seq in rows) == [1, 2, 3, 4, 5]
+        assert dict(rows)["0001"] == 1
+        # Every worker passed its sequence number instead of reading MAX().
+        assert sorted(parameters[-1] for parameters in inserted) == [1, 2, 3, 4, 5]
+
+    def test_search_path_set_once_per_connection(self, setup_env):
+        """Test search_path is only set when a pooled connection needs it."""
+        from sqlalchemy import event
+
+        from dbwarden.config import DbwardenConfig
+        from dbwarden.database import get_engine
+
+        url = f"sqlite:///{setup_env}/session.db"
+        tenant = DbwardenConfig(sqlalchemy_url=url, postgres_schema="tenant")
+        verified = DbwardenConfig(
+            sqlalchemy_url=url, postgres_schema="tenant", verify_search_path=True
+        )
+        public = DbwardenConfig(sqlalchemy_url=url)
+        executed = []
+
+        # SQLite has no search_path; record the statements and run no-ops.
+        def rewrite(conn, cursor, statement, parameters, context, executemany):
+            if "search_path" in statement or "current_schema" in statement:
+                executed.append(statement)
+                return "SELECT 'tenant'", ()
+            return statement, parameters
+
+        engine = get_engine(public)
+        event.listen(engine, "before_cursor_execute", rewrite, retval=True)
+        try:
+            for config in (tenant, tenant, public, public, verified, verified):
+                with get_db_session(config=config):
+                    create_migrations_table_if_not_exists()
+        finally:
+            event.remove(engine, "before_cursor_execute", rewrite)
+
+        assert executed == [
+            "SELECT set_config('search_path', ?, false)",
+            "SET search_path TO DEFAULT",
+            "SELECT set_config('search_path', ?, false)",
+            "SELECT current_schema()",
+        ]
+
+
+class TestMigrateTargets:
+    """Tests for migrating several configured targets at once."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up a project with two SQLite shards and one broken target."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/main.db"\n')
+                for name in ("shard1", "shard2"):
+                    f.write(f'[[targets]]\nname = "{name}"\n')
+                    f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/{name}.db"\n')
+                f.write('[[targets]]\nname = "broken"\n')
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/missing/x.db"\n')
+
+            os.makedirs("migrations")
+            with open("migrations/0001_users.sql", "w") as f:
+                f.write("-- upgrade\n\nCREATE TABLE users (id INTEGER PRIMARY KEY)\n")
+
+            yield tmpdir
+
+            os.chdir(old_cwd)
+
+    def test_each_target_is_migrated(self, setup_env):
+        """Test every target gets its own result and failures stay isolated."""
+        from dbwarden.commands.migrate import migrate_targets_cmd
+
+        results = migrate_targets_cmd(target_jobs=3)
+
+        assert [r.name for r in results] == ["shard1", "shard2", "broken"]
+        assert [r.ok for r in results] == [True, True, False]
+        for name in ("shard1", "shard2"):
+            conn = sqlite3.connect(os.path.join(setup_env, f"{name}.db"))
+            versions = conn.execute("SELECT version FROM dbwarden_migrations")
+            assert versions.fetchall() == [("0001",)]
+            conn.close()
+        assert not os.path.exists(os.path.join(setup_env, "main.db"))
+
+        results = migrate_targets_cmd(target_names=["shard2"])
+        assert [(r.name, r.message) for r in results] == [
+            ("shard2", "Migrations are up to date.")
+        ]
+
+    def test_async_mode_is_reported_and_ignored(self, setup_env, monkeypatch):
+        """Test targets run synchronously with a warning in async mode."""
+        from dbwarden.commands.migrate import migrate_targets_cmd
+        from dbwarden.logging import DBWardenLogger
+
+        warnings = []
+        monkeypatch.setattr(
+            DBWardenLogger, "warning", lambda self, msg, **kw: warnings.append(msg)
+        )
+        monkeypatch.setenv("DBWARDEN_ASYNC", "1")
+
+        results = migrate_targets_cmd(target_names=["shard1"])
+
+        assert [r.ok for r in results] == [True]
+        assert any("Async mode is not supported" in w for w in warnings)
+
+    def test_failures_without_message_are_reported(self, setup_env, monkeypatch):
+        """Test an exception with an empty message still gets a report line."""
+        import dbwarden.commands.migrate as migrate
+        from dbwarden.commands import handle_migrate_targets
+        from dbwarden.exceptions import LockError
+
+        def fail(**kwargs):
+            raise LockError()
+
+        monkeypatch.setattr(migrate, "_migrate_database", fail)
+
+        results = migrate.migrate_targets_cmd(target_names=["shard1"])
+        assert results[0].error == "LockError"
+        assert handle_migrate_targets(["shard1"], None, None, False) is False
+
+        with pytest.raises(ValueError, match="target_jobs"):
+            migrate.migrate_targets_cmd(target_jobs=0)
+
+
+class TestUpToDateCheck:
+    """Tests for the migrations fingerprint fast path."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up a project with one versioned migration."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/fast.db"\n')
+
+            os.makedirs("migrations")
+            with open("migrations/0001_users.sql", "w") as f:
+                f.write(
+                    "-- upgrade\n\nCREATE TABLE users (id INTEGER PRIMARY KEY)\n"
+                    "-- rollback\n\nDROP TABLE users\n"
+                )
+
+            yield os.path.join(tmpdir, "migrations")
+
+            os.chdir(old_cwd)
+
+    def test_fingerprint_tracks_migrations(self, setup_env):
+        """Test the database is current only after a complete migrate."""
+        from dbwarden.commands.migrate import migrate_cmd, migrations_up_to_date
+        from dbwarden.commands.rollback import rollback_cmd
+
+        assert migrations_up_to_date() == False
+
+        migrate_cmd()
+        assert migrations_up_to_date() == True
+
+        with open(os.path.join(setup_env, "0002_posts.sql"), "w") as f:
+            f.write("-- upgrade\n\nCREATE TABLE posts (id INTEGER PRIMARY KEY)\n")
+        assert migrations_up_to_date() == False
+
+        migrate_cmd(if_needed=True)
+        assert migrations_up_to_date() == True
+
+        rollback_cmd()
+        assert migrations_up_to_date() == False
+
+    def test_runs_always_is_never_skipped(self, setup_env):
+        """Test a directory with runs-always migrations is never current."""
+        from dbwarden.commands.migrate import migrate_cmd, migrations_up_to_date
+
+        with open(os.path.join(setup_env, "RA__refresh.sql"), "w") as f:
+            f.write("-- upgrade\n\nSELECT 1\n")
+
+        migrate_cmd()
+        assert migrations_up_to_date() == False
+
+    def test_rollback_reverts_latest_migration_only(self, setup_env):
+        """Test a default rollback reverts only the last applied migration."""
+        from dbwarden.commands.migrate import migrate_cmd
+        from dbwarden.commands.rollback import rollback_cmd
+
+        with open(os.path.join(setup_env, "0002_posts.sql"), "w") as f:
+            f.write(
+                "-- upgrade\n\nCREATE TABLE posts (id INTEGER PRIMARY KEY)\n"
+                "-- rollback\n\nDROP TABLE posts\n"
+            )
+
+        migrate_cmd()
+        rollback_cmd()
+
+        with get_db_session():
+            assert [r.version for r in get_migration_records()] == ["0001"]
+
+    def test_baseline_records_without_executing(self, setup_env):
+        """Test a baseline only records migrations, with their checksums."""
+        from dbwarden.commands.migrate import migrate_cmd
+        from dbwarden.engine.parse_cache import get_migration_cache
+
+        for version in ("0002", "0003"):
+            with open(os.path.join(setup_env, f"{version}_t{version}.sql"), "w") as f:
+                f.write(f"-- upgrade\n\nCREATE TABLE t{version} (id INTEGER)\n")
+
+        migrate_cmd(to_version="0001")
+        migrate_cmd(baseline=True, to_version="0002")
+
+        with get_db_session():
+            records = get_migration_records()
+            with get_db_connection() as connection:
+                tables = set(inspect(connection).get_table_names())
+
+        cache = get_migration_cache(setup_env)
+        assert [r.version for r in records] == ["0001", "0002"]
+        assert (
+            records[1].checksum
+            == cache.get(os.path.join(setup_env, "0002_t0002.sql")).checksum
+        )
+        assert "users" in tables
+        assert "t0002" not in tables
+
+        migrate_cmd()
+        with get_db_session():
+            assert [r.version for r in get_migration_records()][-1] == "0003"
+
+    def test_schema_snapshot_tracks_migrations(self, setup_env):
+        """Test the cached schema is reused until a migration is applied."""
+        from dbwarden.commands.migrate import migrate_cmd
+        from dbwarden.engine.schema_snapshot import get_schema_snapshot
+
+        migrate_cmd()
+        assert "users" in get_schema_snapshot(directory=setup_env)
+
+        with get_db_session():
+            with get_db_connection() as connection:
+                connection.exec_driver_sql("CREATE TABLE outside (id INTEGER)")
+
+        assert "outside" not in get_schema_snapshot(directory=setup_env)
+        assert "outside" in get_schema_snapshot(directory=setup_env, refresh=True)
+
+        with open(os.path.join(setup_env, "0002_posts.sql"), "w") as f:
+            f.write("-- upgrade\n\nCREATE TABLE posts (id INTEGER PRIMARY KEY)\n")
+        migrate_cmd()
+
+        tables = get_schema_snapshot(directory=setup_env)
+        assert {"users", "posts", "outside"} <= set(tables)
+        assert tables["posts"].column_names() == {"id"}
+
+
+class TestRunsOnChangeDetection:
+    """Tests for batched runs-on-change change detection."""
+
+    @pytest.fixture
+    def setup_env(self):
+        """Set up a project with one runs-on-change migration."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            old_cwd = os.getcwd()
+            os.chdir(tmpdir)
+
+            with open("warden.toml", "w") as f:
+                f.write(f'sqlalchemy_url = "sqlite:///{tmpdir}/roc.db"\n')
+
+            os.makedirs("migrations")
+            with open("migrations/ROC__view.sql", "w") as f:
+                f.write("-- upgrade\n\nCREATE VIEW v_one AS SELECT 1 AS one\n")
+
+            yield os.path.join(tmpdir, "migrations")
+
+            os.chdir(old_cwd)
+
+    def test_only_changed_files_are_returned(self, setup_env):
+        """Test unchanged ROC__ files are skipped and changed ones re-parsed."""
+        from dbwarden.commands.migrate import migrate_cmd
+        from dbwarden.engine.version import get_changed_runs_on_change_migrations
+
+        changed = get_changed_runs_on_change_migrations(setup_env)
+        assert len(changed) == 1
+        assert changed[0][1] == ["CREATE VIEW v_one AS SELECT 1 AS one"]
+
+        migrate_cmd()
+        assert get_changed_runs_on_change_migrations(setup_env) == []
+
+        with open(os.path.join(setup_env, "ROC__view.sql"), "w") as f:
+            f.write("-- upgrade\n\nCREATE VIEW v_two AS SELECT 2 AS two\n")
+
+        changed = get_changed_runs_on_change_migrations(setup_env)
+        assert [fp.split("/")[-1] for fp, _ in changed] == ["ROC__view.sql"]
+
+    def test_checksums_of_earlier_versions_are_recognised(self, setup_env):
+        """Test a checksum recorded with the old splitting counts as unchanged."""
+        from dbwarden.commands.migrate import migrate_cmd
+        from dbwarden.engine.checksum import calculate_checksum
+        from dbwarden.engine.version import get_changed_runs_on_change_migrations
+
+        filepath = os.path.join(setup_env, "ROC__view.sql")
+        with open(filepath, "w") as f:
+            f.write("-- upgrade\n\nCREATE VIEW v_one AS SELECT 1 AS one;\n")
+        migrate_cmd()
+
+        conn = sqlite3.connect(os.path.join(os.path.dirname(setup_env), "roc.db"))
+        legacy = calculate_checksum(["CREATE VIEW v_one AS SELECT 1 AS one;"])
+        conn.execute("UPDATE dbwarden_migrations SET checksum = ?", (legacy,))
+        conn.commit()
+        conn.close()
+
+        assert get_changed_runs_on_change_migrations(setup_env) == []
+
+        with open(filepath, "w") as f:
+            f.write("-- upgrade\n\nCREATE VIEW v_two AS SELECT 2 AS two;\n")
+        assert len(get_changed_runs_on_change_migrations(setup_env)) == 1
+
 
 class TestMigrationExecution:
     """Tests for migration execution with SQL."""
@@ -0,0 +1,119 @@
+import pytest
+
+from dbwarden.engine.sql_splitter import split_statements
+
+
+def upgrade_statements(content: str, **kwargs) -> list[str]:
+    """Split content and return the upgrade statements."""
+    return [
+        statement
+        for section, statement in split_statements([content], **kwargs)
+        if section == "-- upgrade"
+    ]
+
+
+class TestStatementSplitter:
+    """Tests for the streaming SQL statement splitter."""
+
+    def test_splits_on_delimiter_within_a_line(self):
+        """Test several statements on consecutive lines and one line."""
+        content = """-- upgrade
+CREATE TABLE a (id INTEGER);
+CREATE TABLE b (id INTEGER); CREATE TABLE c (id INTEGER);
+"""
+        assert upgrade_statements(content) == [
+            "CREATE TABLE a (id INTEGER)",
+            "CREATE TABLE b (id INTEGER)",
+            "CREATE TABLE c (id INTEGER)",
+        ]
+
+    def test_blank_line_still_ends_a_statement(self):
+        """Test statements without delimiters separated by blank lines."""
+        content = """-- upgrade
+
+CREATE TABLE a (id INTEGER)
+
+CREATE TABLE b (id INTEGER)
+"""
+        assert upgrade_statements(content) == [
+            "CREATE TABLE a (id INTEGER)",
+            "CREATE TABLE b (id INTEGER)",
+        ]
+
+    def test_multi_line_statements_with_comment_and_blank_lines(self):
+        """Test comment lines inside a statement and whitespace-only lines."""
+        content = (
+            "-- upgrade\nCREATE TABLE a (\n    id INTEGER,\n    -- the name\n"
+            "    name TEXT\n)\n   \t\nSELECT 1\n"
+        )
+        assert upgrade_statements(content) == [
+            "CREATE TABLE a (\n    id INTEGER,\n    name TEXT\n)",
+            "SELECT 1",
+        ]
+
+    def test_dollar_quoted_body(self):
+        """Test a PL/pgSQL body with semicolons, blank lines and markers."""
+        body = """CREATE FUNCTION touch() RETURNS trigger AS $body$
+BEGIN
+    NEW.updated_at = now();
+
+-- rollback
+    RETURN NEW;
+END;
+$body$ LANGUAGE plpgsql"""
+        content = f"-- upgrade\n{body};\nSELECT 1;\n-- rollback\nDROP FUNCTION touch;\n"
+
+        statements = list(split_statements([content]))
+
+        assert statements == [
+            ("-- upgrade", body),
+            ("-- upgrade", "SELECT 1"),
+            ("-- rollback", "DROP FUNCTION touch"),
+        ]
+
+    def test_literals_and_comments(self):
+        """Test quotes containing comment markers and delimiters."""
+        content = """-- upgrade
+-- leading comment
+INSERT INTO t VALUES ('a -- b; c', 'it''s'); -- trailing
+INSERT INTO "odd;name" VALUES (/* x; y */ 1);
+"""
+        assert upgrade_statements(content) == [
+            "INSERT INTO t VALUES ('a -- b; c', 'it''s')",
+            'INSERT INTO "odd;name" VALUES (/* x; y */ 1)',
+        ]
+
+    def test_custom_delimiter(self):
+        """Test a configurable delimiter."""
+        content = "-- upgrade\nSELECT 1 $$\nSELECT 'a;b' $$\n"
+        assert upgrade_statements(content, delimiter="$$") == [
+            "SELECT 1",
+            "SELECT 'a;b'",
+        ]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 64])
+    def test_chunked_input_matches_whole_input(self, chunk_size):
+        """Test the result does not depend on how the input is chunked."""
+        content = """-- upgrade
+CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql;
+INSERT INTO t VALUES ('x''y;z', "q""r"); /* c;
+   d */ SELECT 2;
+
+-- rollback
+DROP FUNCTION f;
+"""
+        chunks = [
+            content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
+        ]
+
+        assert list(split_statements(chunks)) == list(split_statements([content]))
+
+    def test_header_lines_are_reported(self):
+        """Test lines before the first marker go to the header callback."""
+        header: list[str] = []
+        content = "-- seed\n-- depends_on: []\n-- upgrade\nSELECT 1\n"
+
+        statements = upgrade_statements(content, on_header_line=header.append)
+
+        assert statements == ["SELECT 1"]
+        assert header == ["-- seed", "-- depends_on: []"]
@@ -10,8 +10,11 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from dbwarden.config import get_config
 from dbwarden.database.connection import (
     is_async_enabled,
+    get_async_db_connection,
+    get_async_db_session,
     get_mode,
     get_db_connection,
+    run_in_session,
 )
 from dbwarden.repositories import (
     create_migrations_table_if_not_exists,
@@ -135,6 +138,39 @@ class TestSyncConnection:
             value = result.scalar()
             assert value == 1
 
+    def test_connection_init_logged_once_across_threads(
+        self, setup_sync_db, monkeypatch
+    ):
+        """Test concurrent first connections log the init message once."""
+        import threading
+        import time
+
+        from dbwarden.database.connection import reset_connection_logging
+        from dbwarden.logging import DBWardenLogger
+
+        logged = []
+
+        def slow_log(self, db_type):
+            time.sleep(0.01)
+            logged.append(db_type)
+
+        monkeypatch.setattr(DBWardenLogger, "log_connection_init", slow_log)
+        reset_connection_logging()
+        barrier = threading.Barrier(8)
+
+        def connect():
+            barrier.wait()
+            with get_db_connection() as conn:
+                conn.execute(text("SELECT 1"))
+
+        threads = [threading.Thread(target=connect) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert logged == ["sync"]
+
     def test_create_table_sync(self, setup_sync_db):
         """Test creating a table in sync mode."""
         with get_db_connection() as conn:
@@ -213,6 +249,87 @@ class TestAsyncConnection:
         assert cursor.fetchone() is not None
         conn.close()
 
+    @pytest.mark.asyncio
+    async def test_migrate_async(self, setup_async_db):
+        """Test migrations are applied and recorded through the async engine."""
+        from dbwarden.commands.migrate import migrate_async
+
+        os.makedirs("migrations")
+        with open("migrations/0001_users.sql", "w") as f:
+            f.write("-- upgrade\n\nCREATE TABLE users (id INTEGER PRIMARY KEY)\n")
+
+        message = await migrate_async()
+        assert message == "Migrations completed successfully: 1 migrations applied."
+        assert await migrate_async(if_needed=True) == "Migrations are up to date."
+
+        async with get_async_db_connection() as conn:
+            result = await conn.execute(text("SELECT version FROM dbwarden_migrations"))
+            assert result.scalars().all() == ["0001"]
+
+    @pytest.mark.asyncio
+    async def test_async_lock_excludes_other_processes(self, setup_async_db):
+        """Test the async lock blocks other holders and renews its lease."""
+        from dbwarden.engine.lock import AsyncLeaseHeartbeat, async_migration_lock
+        from dbwarden.repositories.lock_repo import TableLockBackend
+
+        config = get_config()
+
+        async with get_async_db_session(config) as conn:
+            async with async_migration_lock(conn, config) as stats:
+                backend = TableLockBackend(holder=stats.holder)
+                heartbeat = AsyncLeaseHeartbeat(backend, config, interval=0.05)
+                heartbeat.start()
+                await asyncio.sleep(0.3)
+                await heartbeat.stop()
+
+                other = TableLockBackend(holder="pod-b:2:wait")
+                acquired = await run_in_session(
+                    conn, config, lambda: _try_acquire(other)
+                )
+
+        assert heartbeat.renewals > 0
+        assert heartbeat.lost == False
+        assert acquired == False
+
+    @pytest.mark.asyncio
+    async def test_async_session_sets_schema_without_set_parameter(
+        self, setup_async_db
+    ):
+        """Test the schema is set with set_config(), which asyncpg can prepare."""
+        from dataclasses import replace
+
+        from sqlalchemy import event
+
+        from dbwarden.database.connection import get_async_engine
+
+        config = replace(get_config(), postgres_schema="tenant")
+        engine = get_async_engine(config).sync_engine
+        executed = []
+
+        # SQLite has no search_path; record the statement and run a no-op.
+        def rewrite(conn, cursor, statement, parameters, context, executemany):
+            if "search_path" in statement:
+                executed.append((statement, parameters))
+                return "SELECT 'tenant'", ()
+            return statement, parameters
+
+        event.listen(engine, "before_cursor_execute", rewrite, retval=True)
+        try:
+            async with get_async_db_session(config) as conn:
+                await run_in_session(
+                    conn, config, create_migrations_table_if_not_exists
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", rewrite)
+
+        assert executed == [("SELECT set_config('search_path', ?, false)", ("tenant",))]
+
+
+def _try_acquire(backend):
+    """Try to take the lock with a backend on the session connection."""
+    with get_db_connection() as connection:
+        return backend.try_acquire(connection)
+
 
 class TestConfigReload:
     """Tests for configuration reloading."""